@@ -1,15 +1,20 @@
-import csv
-import io
-from datetime import datetime
-from io import TextIOWrapper
+from datetime import timedelta
+from itertools import islice
 
 from django.contrib import admin, messages
-from django.core.files.base import ContentFile
+from django.core.exceptions import PermissionDenied
 from django.db import transaction
-from django.utils.timezone import make_aware
+from django.http import JsonResponse
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils import timezone
+from django.utils.html import format_html
 
-from .forms import NetworkEventImportForm
-from .models import NetworkEvent, NetworkEventImport
+from .db import write_batch
+from .forms import NetworkEventBatchImportForm, NetworkEventImportForm
+from .models import DailyHostDowntime, Host, NetworkEvent, NetworkEventImport
+from .search import search_events
 
 
 @admin.register(NetworkEventImport)
@@ -19,7 +24,10 @@ class NetworkEventImportAdmin(admin.ModelAdmin):
         "csv_file",
         "uploaded_at",
         "processing_status",
+        "progress_display",
         "processed_rows",
+        "rows_per_second",
+        "eta_display",
         "created_events",
         "updated_events",  # Added updated events display
         "duplicate_events",
@@ -29,6 +37,10 @@ class NetworkEventImportAdmin(admin.ModelAdmin):
     readonly_fields = [
         "uploaded_at",
         "processed_rows",
+        "total_rows",
+        "rows_per_second",
+        "started_at",
+        "finished_at",
         "created_events",
         "updated_events",  # Added updated events as readonly
         "duplicate_events",
@@ -36,197 +48,130 @@ class NetworkEventImportAdmin(admin.ModelAdmin):
         "error_message",
         "skipped_rows_file",
     ]
+    actions = ["requeue_imports"]
+    change_list_template = "admin/base/networkeventimport/change_list.html"
+
+    class Media:
+        js = ("js/import_progress.js",)
 
     def save_model(self, request, obj, form, change):
-        # First, save the import object and the uploaded file to disk.
-        obj.processing_status = "processing"
+        # Only store the file and queue it; the import worker
+        # (`manage.py process_imports`) parses and upserts it.
+        if not change:
+            obj.processing_status = "pending"
         super().save_model(request, obj, form, change)
+        if not change:
+            self.message_user(
+                request,
+                f"{obj.csv_file.name} was queued for import. "
+                f"Progress is shown in the import list.",
+                level=messages.SUCCESS,
+            )
 
-        try:
-            # Open the file from disk in BINARY read mode ('rb').
-            with obj.csv_file.open(mode="rb") as binary_file:
-                # Wrap the binary file with TextIOWrapper to handle UTF-8 decoding.
-                text_file = TextIOWrapper(binary_file, encoding="utf-8")
-                reader = csv.DictReader(text_file)
-
-                # Helper function for parsing datetime
-                def parse_datetime(value):
-                    if not value:
-                        return None
-                    try:
-                        dt = datetime.strptime(value.strip(), "%m/%d/%Y %H:%M:%S")
-                        return make_aware(
-                            dt
-                        )  # Converts naive datetime to timezone-aware
-                    except (ValueError, TypeError):
-                        return None
-
-                row_count = 0
-                created_count = 0
-                updated_count = 0
-                duplicate_count = 0
-                skipped_data = []
-
-                def log_skipped_row(reason, row_number, row, problem_value=""):
-                    """A helper to capture skipped row details consistently."""
-                    info = {
-                        "row_number": row_number,
-                        "name": row.get("MPLS/Switch", "N/A").strip(),
-                        "type": row.get("Type", "N/A").strip(),
-                        "date": row.get("Date", "N/A").strip(),
-                        "reason": reason,
-                        "problem_value": problem_value,
-                    }
-                    skipped_data.append(info)
-
-                # Process each row using the new create_or_update logic
-                with transaction.atomic():
-                    for row_number, row in enumerate(
-                        reader, 2
-                    ):  # Start at 2 to account for header
-                        row_count += 1
-                        name = row.get("MPLS/Switch", "").strip()
-                        if not name:
-                            continue
-                        down_time_str = row.get("Down Time", "")
-                        down_time = parse_datetime(down_time_str)
-
-                        if not down_time:
-                            # --- NEW: Capture skipped row info ---
-                            log_skipped_row(
-                                "Invalid Down Time", row_number, row, down_time_str
-                            )
-                            continue  # Skip processing this row
-                        up_time_str = row.get("Up Time", "").strip()
-                        up_time = None  # Assume no valid up_time yet
-
-                        # Only try to parse if there's actually text in the cell
-                        if up_time_str:
-                            up_time = parse_datetime(up_time_str)
-
-                            # Check for MALFORMED Up Time
-                            if not up_time:
-                                log_skipped_row(
-                                    "Malformed Up Time", row_number, row, up_time_str
-                                )
-                                continue
-
-                        # Check for ILLOGICAL Up Time (only if up_time is a valid date)
-                        if up_time and up_time < down_time:
-                            log_skipped_row(
-                                "Illogical Up Time (before Down Time)",
-                                row_number,
-                                row,
-                                f"Up: {up_time_str}, Down: {down_time_str}",
-                            )
-                            continue
-
-                        # Prepare event data
-                        event_data = {
-                            "name": name,
-                            "down_time": down_time,
-                            "up_time": parse_datetime(row.get("Up Time")),
-                            "date": row.get("Date", "").strip(),
-                            "type": row.get("Type", "").strip(),
-                            "region": row.get("Region", "").strip(),
-                            "reason": row.get("Reason/Issue", "").strip(),
-                            "solar": row.get("Full SOLAR POP", "").strip(),
-                            "remarks": row.get("Remarks(from mail if any)", "").strip(),
-                            "category": row.get("Category", "").strip(),
-                            "down_count": (
-                                int(row.get("down_count", 0))
-                                if row.get("down_count", "").isdigit()
-                                else 0
-                            ),
-                        }
-
-                        # Use the new create_or_update_event method
-                        event, created, updated = NetworkEvent.create_or_update_event(
-                            **event_data
-                        )
-
-                        if created:
-                            created_count += 1
-                        elif updated:
-                            updated_count += 1
-                        else:
-                            duplicate_count += 1
-                if skipped_data:
-                    # Use io.StringIO as an in-memory text file
-                    csv_buffer = io.StringIO()
-                    writer = csv.writer(csv_buffer)
-
-                    # Write header
-                    writer.writerow(
-                        [
-                            "Row Number",
-                            "Name",
-                            "Type",
-                            "Date",
-                            "Reason",
-                            "Problematic Value",
-                        ]
-                    )
-
-                    for item in skipped_data:
-                        writer.writerow(
-                            [
-                                item["row_number"],
-                                item["name"],
-                                item["type"],
-                                item["date"],
-                                item["reason"],
-                                item["problem_value"],
-                            ]
-                        )
-                    # Create a Django ContentFile from the in-memory buffer
-                    file_name = f"skipped_rows_import_{obj.id}.csv"
-                    skipped_file = ContentFile(csv_buffer.getvalue().encode("utf-8"))
-
-                    # Save the file to the model field (do not save the model itself yet)
-                    obj.skipped_rows_file.save(file_name, skipped_file, save=False)
-
-                # Update import statistics
-                obj.processed_rows = row_count
-                obj.created_events = created_count
-                obj.updated_events = updated_count
-                obj.duplicate_events = duplicate_count
-                obj.processing_status = "completed"
-                obj.error_message = ""  # Clear any previous error
-                obj.save()
-
-                # Create success message with all statistics
-                message_parts = [
-                    f"CSV processing complete! Processed {row_count} rows."
-                ]
-                if created_count > 0:
-                    message_parts.append(f"Created {created_count} new events.")
-                if updated_count > 0:
-                    message_parts.append(f"Updated {updated_count} existing events.")
-                if duplicate_count > 0:
-                    message_parts.append(f"Skipped {duplicate_count} duplicates.")
-                if skipped_data:
-                    message_parts.append(
-                        f"Skipped {len(skipped_data)} rows due to errors. "
-                        f"See the 'Skipped Rows Log' for details."
-                    )
-
+    def get_urls(self):
+        urls = [
+            path(
+                "progress/",
+                self.admin_site.admin_view(self.progress_view),
+                name="base_networkeventimport_progress",
+            ),
+            path(
+                "upload/",
+                self.admin_site.admin_view(self.batch_upload_view),
+                name="base_networkeventimport_batch_upload",
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def batch_upload_view(self, request):
+        """Queue several CSVs (or zips of them) at once, one import per CSV."""
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+        if request.method == "POST":
+            form = NetworkEventBatchImportForm(request.POST, request.FILES)
+            if form.is_valid():
+                for csv_file in form.cleaned_data["files"]:
+                    event_import = NetworkEventImport(processing_status="pending")
+                    event_import.csv_file.save(csv_file.name, csv_file)
                 self.message_user(
                     request,
-                    " ".join(message_parts),
+                    f"{len(form.cleaned_data['files'])} files were queued for import. "
+                    f"Progress is shown in the import list.",
                     level=messages.SUCCESS,
                 )
+                return redirect("admin:base_networkeventimport_changelist")
+        else:
+            form = NetworkEventBatchImportForm()
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": "Upload several CSV files",
+            "form": form,
+        }
+        return TemplateResponse(
+            request, "admin/base/networkeventimport/batch_upload.html", context
+        )
 
-        except Exception as e:
-            # This will catch errors from opening the file or processing it.
-            obj.processing_status = "failed"
-            obj.error_message = f"An error occurred during processing: {e}"
-            obj.save()
-            self.message_user(
-                request,
-                f"An error occurred during processing: {e}",
-                level=messages.ERROR,
-            )
+    def progress_view(self, request):
+        """JSON progress of the requested imports, polled by the changelist."""
+        ids = [i for i in request.GET.get("ids", "").split(",") if i.isdigit()]
+        imports = NetworkEventImport.objects.filter(pk__in=ids)
+        return JsonResponse(
+            {
+                str(obj.pk): {
+                    "status": obj.processing_status,
+                    "percent": obj.progress_percent,
+                    "processed_rows": obj.processed_rows,
+                    "rows_per_second": obj.rows_per_second,
+                    "eta": self.eta_display(obj),
+                    "created_events": obj.created_events,
+                    "updated_events": obj.updated_events,
+                    "duplicate_events": obj.duplicate_events,
+                }
+                for obj in imports
+            }
+        )
+
+    def progress_display(self, obj):
+        return format_html(
+            '<span class="import-progress" data-import-id="{}" data-status="{}">{}%</span>',
+            obj.pk,
+            obj.processing_status,
+            obj.progress_percent,
+        )
+
+    progress_display.short_description = "Progress"
+
+    def eta_display(self, obj):
+        eta = obj.eta_seconds
+        return "-" if eta is None else str(timedelta(seconds=eta))
+
+    eta_display.short_description = "ETA"
+
+    def requeue_imports(self, request, queryset):
+        count = queryset.exclude(processing_status="processing").update(
+            processing_status="pending",
+            processed_rows=0,
+            rows_per_second=0,
+            started_at=None,
+            finished_at=None,
+            error_message="",
+        )
+        self.message_user(
+            request,
+            f"Queued {count} imports again.",
+            level=messages.SUCCESS,
+        )
+
+    requeue_imports.short_description = "Queue selected imports again"
+
+
+@admin.register(Host)
+class HostAdmin(admin.ModelAdmin):
+    list_display = ["name", "type", "region", "solar", "last_seen"]
+    list_filter = ["type", "region", "solar"]
+    search_fields = ["name"]
+    readonly_fields = ["last_seen"]
 
 
 @admin.register(NetworkEvent)
@@ -254,10 +199,20 @@ class NetworkEventAdmin(admin.ModelAdmin):
         "updated_at",
     ]
 
+    def get_search_results(self, request, queryset, search_term):
+        # search_fields through the full-text index instead of LIKE scans
+        if not search_term.strip():
+            return queryset, False
+        return search_events(queryset, search_term, self.search_fields), False
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_duration()
+
     def duration_display(self, obj):
         return obj.duration()
 
     duration_display.short_description = "Duration"
+    duration_display.admin_order_field = "live_duration_seconds"
 
     def last_updated(self, obj):
         return obj.updated_at.strftime("%Y-%m-%d %H:%M") if obj.updated_at else "-"
@@ -268,12 +223,20 @@ class NetworkEventAdmin(admin.ModelAdmin):
     actions = [
         "delete_selected_events",
         "recalculate_hashes",
+        "refresh_open_durations",
         "find_potential_updates",  # New action to find records that might need updates
     ]
 
+    def delete_queryset(self, request, queryset):
+        # Bulk deletes bypass NetworkEvent.delete(), so refresh derived data here
+        spans = DailyHostDowntime.spans_for(queryset)
+        with transaction.atomic():
+            queryset.delete()
+            NetworkEvent.events_changed(spans)
+
     def delete_selected_events(self, request, queryset):
         count = queryset.count()
-        queryset.delete()
+        self.delete_queryset(request, queryset)
         self.message_user(
             request,
             f"Successfully deleted {count} network events.",
@@ -283,10 +246,21 @@ class NetworkEventAdmin(admin.ModelAdmin):
     delete_selected_events.short_description = "Delete selected events"
 
     def recalculate_hashes(self, request, queryset):
+        # The computed fields only; nothing the rollups depend on changes,
+        # so this is a chunked bulk_update instead of a save() per event.
+        now = timezone.now()
+        fields = ["unique_hash", "duration_seconds", "bs_year", "bs_month", "bs_day"]
+        events = queryset.order_by("pk").iterator(chunk_size=NetworkEvent.BULK_BATCH_SIZE)
         count = 0
-        for event in queryset:
-            event.save()  # This will regenerate both hashes
-            count += 1
+        while True:
+            chunk = list(islice(events, NetworkEvent.BULK_BATCH_SIZE))
+            if not chunk:
+                break
+            for event, unique_hash in zip(chunk, NetworkEvent.unique_hashes(chunk)):
+                event.refresh_computed_fields(now, unique_hash)
+            with write_batch():
+                NetworkEvent.objects.bulk_update(chunk, fields)
+            count += len(chunk)
         self.message_user(
             request,
             f"Successfully recalculated hashes for {count} events.",
@@ -295,6 +269,16 @@ class NetworkEventAdmin(admin.ModelAdmin):
 
     recalculate_hashes.short_description = "Recalculate hashes"
 
+    def refresh_open_durations(self, request, queryset):
+        count = queryset.refresh_open_durations()
+        self.message_user(
+            request,
+            f"Refreshed the stored duration of {count} ongoing events.",
+            level=messages.SUCCESS,
+        )
+
+    refresh_open_durations.short_description = "Refresh durations of ongoing events"
+
     def find_potential_updates(self, request, queryset):
         """Find records that might have updates based on base_hash"""
         base_hashes = queryset.values_list("base_hash", flat=True)
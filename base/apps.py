@@ -1,6 +1,18 @@
 from django.apps import AppConfig
+from django.db import connections
+from django.db.models.signals import post_migrate
+
+
+def _ensure_search_index(sender, using, **kwargs):
+    # SQLite table rebuilds in later migrations drop the index's triggers
+    from .search import ensure_search_index
+
+    ensure_search_index(connections[using])
 
 
 class BaseConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "base"
+
+    def ready(self):
+        post_migrate.connect(_ensure_search_index, sender=self)
@@ -0,0 +1,136 @@
+# base/buckets.py
+"""
+Time buckets for the charts of a reporting window.
+
+A window is split into the finest of hours, days, weeks (Sunday to
+Saturday, as the week runs in Nepal) and BS months that gives at most
+MAX_POINTS buckets, so a year-long range draws a dozen monthly bars rather
+than hundreds of daily ones. Buckets start on local (Asia/Kathmandu) hours,
+days and months.
+
+Events are sorted into buckets in SQL by a CASE over the bucket edges:
+plain comparisons on the stored down_time, where SQLite's Trunc* functions
+would call back into Python for every row.
+"""
+
+import bisect
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.db.models import Case, IntegerField, Value, When
+from django.utils import timezone
+
+from . import nepali_calendar
+
+MAX_POINTS = 40
+
+HOUR, DAY, WEEK, BS_MONTH = "hour", "day", "week", "bs_month"
+UNITS = (HOUR, DAY, WEEK, BS_MONTH)
+
+# Sunday, in date.weekday() numbering
+WEEK_START = 6
+
+# Bucket lengths, to skip units that can't fit before building their edges
+_LENGTHS = {HOUR: timedelta(hours=1), DAY: timedelta(days=1), WEEK: timedelta(days=7)}
+
+
+class Buckets:
+    """
+    Consecutive buckets of one unit covering a window: bucket ``i`` runs from
+    ``edges[i]`` up to, not including, ``edges[i + 1]``.
+    """
+
+    def __init__(self, unit, edges):
+        self.unit = unit
+        self.edges = edges
+
+    def __len__(self):
+        return len(self.edges) - 1
+
+    @property
+    def labels(self):
+        return [_label(self.unit, edge) for edge in self.edges[:-1]]
+
+    def index(self, value):
+        """Bucket number of a datetime, or of the start of a (local) date."""
+        if not isinstance(value, datetime):
+            value = _local_midnight(value)
+        return bisect.bisect_right(self.edges, value) - 1
+
+    def expression(self, field):
+        """
+        Bucket number of a datetime field as a database expression, for rows
+        already limited to the window.
+        """
+        return Case(
+            *(
+                When(**{f"{field}__lt": edge}, then=Value(number))
+                for number, edge in enumerate(self.edges[1:])
+            ),
+            output_field=IntegerField(),
+        )
+
+
+def buckets_for(start, end, max_points=MAX_POINTS):
+    """
+    The finest Buckets over [start, end] with at most ``max_points``
+    buckets; BS months when nothing finer fits, however many that takes.
+    """
+    for unit in UNITS[:-1]:
+        if (end - start) / _LENGTHS[unit] > max_points:
+            continue
+        edges = _edges(start, end, unit, limit=max_points)
+        if edges is not None:
+            return Buckets(unit, edges)
+    return Buckets(BS_MONTH, _edges(start, end, BS_MONTH))
+
+
+def _local_midnight(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _floor(value, unit):
+    local = timezone.localtime(value)
+    if unit == HOUR:
+        return local.replace(minute=0, second=0, microsecond=0)
+    day = local.date()
+    if unit == WEEK:
+        day -= timedelta(days=(day.weekday() - WEEK_START) % 7)
+    elif unit == BS_MONTH:
+        bs_date = nepali_calendar.to_bs(day)
+        day = nepali_calendar.to_ad(bs_date.year, bs_date.month, 1)
+    return _local_midnight(day)
+
+
+def _next(edge, unit):
+    if unit == HOUR:
+        # In UTC, so an hour is an hour even across a DST change
+        return timezone.localtime(edge.astimezone(dt_timezone.utc) + timedelta(hours=1))
+    day = edge.date()
+    if unit == DAY:
+        day += timedelta(days=1)
+    elif unit == WEEK:
+        day += timedelta(days=7)
+    else:
+        bs_date = nepali_calendar.to_bs(day)
+        day = nepali_calendar.month_range(bs_date.year, bs_date.month)[1] + timedelta(days=1)
+    return _local_midnight(day)
+
+
+def _edges(start, end, unit, limit=None):
+    """Edges of the ``unit`` buckets covering [start, end], or None past ``limit`` buckets."""
+    edges = [_floor(start, unit)]
+    while edges[-1] <= end:
+        if limit is not None and len(edges) > limit:
+            return None
+        edges.append(_next(edges[-1], unit))
+    return edges
+
+
+def _label(unit, edge):
+    if unit == HOUR:
+        return edge.strftime("%Y-%m-%d %H:00")
+    if unit == BS_MONTH:
+        bs_date = nepali_calendar.to_bs(edge.date())
+        return f"{nepali_calendar.MONTH_NAMES[bs_date.month - 1]} {bs_date.year}"
+    # Days, and weeks by their first day
+    return edge.strftime("%Y-%m-%d")
@@ -0,0 +1,100 @@
+# base/cache.py
+
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+DATA_VERSION_KEY = "noc:data-version"
+
+# Query parameters that change the chart payloads; everything else is ignored.
+CACHED_PARAMS = ("name", "type", "start_date", "end_date", "date_query")
+
+
+def get_data_version():
+    """Current data version; part of every cache key, so bumping it invalidates them all."""
+    version = cache.get(DATA_VERSION_KEY)
+    if version is None:
+        cache.add(DATA_VERSION_KEY, 1, timeout=None)
+        version = cache.get(DATA_VERSION_KEY, 1)
+    return version
+
+
+def bump_data_version():
+    """Invalidate every cached chart payload. Called after events are written."""
+    try:
+        cache.incr(DATA_VERSION_KEY)
+    except ValueError:
+        # Key missing (evicted or never set): start a fresh version
+        cache.set(DATA_VERSION_KEY, get_data_version() + 1, timeout=None)
+
+
+def normalized_params(request):
+    """The cache-relevant GET parameters, stripped, lower-cased where it doesn't matter and sorted."""
+    params = []
+    for param in CACHED_PARAMS:
+        value = request.GET.get(param, "").strip()
+        if not value:
+            continue
+        if param in ("type", "date_query"):
+            value = value.lower()
+        params.append(f"{param}={value}")
+    return "&".join(params)
+
+
+def cache_key(request, view_name, *args):
+    digest = hashlib.sha256(
+        "|".join([view_name, *map(str, args), normalized_params(request)]).encode("utf-8")
+    ).hexdigest()
+    return f"noc:json:{get_data_version()}:{digest}"
+
+
+def cached_json_view(view_func):
+    """
+    Cache a JSON API view's successful responses, keyed by the view, its URL
+    arguments and the normalized filter parameters. Works on sync and async
+    views.
+    """
+    if iscoroutinefunction(view_func):
+        return _async_cached_json_view(view_func)
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if request.method != "GET":
+            return view_func(request, *args, **kwargs)
+
+        key = cache_key(request, view_func.__name__, *args, *sorted(kwargs.items()))
+        content = cache.get(key)
+        if content is not None:
+            return HttpResponse(content, content_type="application/json")
+
+        response = view_func(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.content, timeout=settings.CHART_CACHE_TIMEOUT)
+        return response
+
+    return wrapper
+
+
+def _async_cached_json_view(view_func):
+    @wraps(view_func)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != "GET":
+            return await view_func(request, *args, **kwargs)
+
+        key = await sync_to_async(cache_key)(
+            request, view_func.__name__, *args, *sorted(kwargs.items())
+        )
+        content = await cache.aget(key)
+        if content is not None:
+            return HttpResponse(content, content_type="application/json")
+
+        response = await view_func(request, *args, **kwargs)
+        if response.status_code == 200:
+            await cache.aset(key, response.content, timeout=settings.CHART_CACHE_TIMEOUT)
+        return response
+
+    return wrapper
@@ -0,0 +1,40 @@
+# base/concurrency.py
+"""
+Running independent ORM queries of one request at the same time.
+
+Async views hand their blocking query functions to run_concurrently(), which
+runs each in a thread of its own. Every thread uses its own database
+connection, and SQLite in WAL mode serves readers in parallel (the sqlite3
+module releases the GIL while a statement runs), so a view waits for its
+slowest query instead of the sum of them.
+"""
+
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+
+from .middleware import track_queries
+
+
+def _in_own_connection(func):
+    try:
+        # Counted into the request's metrics like queries on its own thread
+        with track_queries():
+            return func()
+    finally:
+        # Like the end of a request: the thread may be reused, or be gone
+        close_old_connections()
+
+
+async def run_concurrently(*funcs):
+    """
+    Call the zero-argument functions concurrently, each in its own thread and
+    database connection, and return their results in order.
+
+    Whatever the functions get from the request (querysets, filters) must be
+    built before, e.g. with filters.aget_filters().
+    """
+    return await asyncio.gather(
+        *(sync_to_async(_in_own_connection, thread_sensitive=False)(func) for func in funcs)
+    )
@@ -0,0 +1,58 @@
+# base/db.py
+
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.db import connection, connections, transaction
+from django.test.utils import override_settings
+
+# Ingest writers in this process take turns here; writers in other
+# processes (import workers, the sync command) queue on SQLite's own write
+# lock, which IMMEDIATE transactions take as soon as they begin.
+_write_lock = threading.RLock()
+
+
+@contextmanager
+def write_batch(using=None):
+    """
+    One short ingest write transaction.
+
+    Everything inside (including the reads an upsert diffs against) runs
+    while this process is the database's only writer, so batches never
+    interleave. Keep the block to one chunk of rows: WAL readers are not
+    blocked by it, but every other writer waits for it to commit.
+    """
+    with _write_lock:
+        with transaction.atomic(using=using):
+            yield
+
+
+@contextmanager
+def scratch_database(cache_backend="django.core.cache.backends.locmem.LocMemCache"):
+    """
+    Point the default connection at a throw-away migrated SQLite file for the
+    duration of the block, with MEDIA_ROOT and the cache swapped out too, so
+    load tests and benchmarks never touch the real data. Yields the scratch
+    directory.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # A file database (WAL needs one) built like the test runner does.
+        # Both names are put back after, for whatever else the process runs.
+        old_name = connection.settings_dict["NAME"]
+        test_settings = connection.settings_dict["TEST"]
+        test_name = test_settings["NAME"]
+        test_settings["NAME"] = str(Path(tmp_dir) / "scratch.sqlite3")
+        try:
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                with override_settings(
+                    MEDIA_ROOT=tmp_dir, CACHES={"default": {"BACKEND": cache_backend}}
+                ):
+                    yield tmp_dir
+            finally:
+                connections.close_all()
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+        finally:
+            test_settings["NAME"] = test_name
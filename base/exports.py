@@ -0,0 +1,238 @@
+# base/exports.py
+
+import csv
+import re
+import zipfile
+from datetime import datetime, timedelta
+from xml.sax.saxutils import escape
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+EXPORT_CHUNK_SIZE = 2000
+
+EVENT_EXPORT_COLUMNS = [
+    ("date", "Date"),
+    ("name", "Host"),
+    ("type", "Type"),
+    ("region", "Region"),
+    ("down_time", "Down Time"),
+    ("up_time", "Up Time"),
+    ("duration_seconds", "Duration"),
+    ("reason", "Reason"),
+    ("solar", "Solar"),
+    ("category", "Category"),
+    ("remarks", "Remarks"),
+]
+
+HOST_EXPORT_COLUMNS = ["Host", "Type", "Count", "Total Duration", "Reason", "Uptime (%)"]
+
+# Control characters XML 1.0 does not allow, even escaped
+_XML_ILLEGAL_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+class _Echo:
+    """File-like object that hands back what is written, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+class _ChunkBuffer:
+    """
+    Write-only file for zipfile: collects the compressed bytes until they are
+    drained. It cannot seek, so zipfile writes data descriptors instead of
+    going back to patch headers, and the archive can be sent as it is built.
+    """
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def format_duration(seconds):
+    """Seconds as H:MM:SS, the way the dashboard shows durations."""
+    return str(timedelta(seconds=int(seconds))) if seconds is not None else ""
+
+
+def format_value(value):
+    if isinstance(value, datetime):
+        return timezone.localtime(value).strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, timedelta):
+        return str(value)
+    return "" if value is None else value
+
+
+def event_rows(events):
+    """
+    Export rows for an events queryset, read as tuples in chunks so memory
+    stays flat however many events match.
+    """
+    # Durations come from the query, so ongoing outages run up to now
+    fields = [
+        "live_duration_seconds" if field == "duration_seconds" else field
+        for field, _ in EVENT_EXPORT_COLUMNS
+    ]
+    duration_index = fields.index("live_duration_seconds")
+
+    rows = events.with_duration().values_list(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    for values in rows:
+        values = list(values)
+        values[duration_index] = format_duration(values[duration_index])
+        yield [format_value(value) for value in values]
+
+
+def host_rows(host_details):
+    for host in host_details:
+        yield [
+            host["name"],
+            host["type"],
+            host["count"],
+            str(host["duration"]),
+            host["reason"],
+            host["uptime"],
+        ]
+
+
+def stream_csv(header, rows):
+    """CSV text in chunks of EXPORT_CHUNK_SIZE rows."""
+    writer = csv.writer(_Echo())
+    chunk = [writer.writerow(header)]
+    for count, row in enumerate(rows, start=1):
+        chunk.append(writer.writerow(row))
+        if count % EXPORT_CHUNK_SIZE == 0:
+            yield "".join(chunk)
+            chunk = []
+    yield "".join(chunk)
+
+
+def _xlsx_cell(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        text = escape(_XML_ILLEGAL_CHARS.sub("", str(value)))
+        return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+    return f"<c><v>{value}</v></c>"
+
+
+def _xlsx_row(values):
+    return "<row>" + "".join(_xlsx_cell(value) for value in values) + "</row>"
+
+
+_XLSX_STATIC_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        "</Types>"
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        "</Relationships>"
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        "</Relationships>"
+    ),
+}
+
+
+def stream_xlsx(header, rows, sheet_title="Export"):
+    """
+    Minimal single-sheet XLSX, written row by row into a zip that is sent
+    while it is being built. Cells are inline strings or numbers, so no
+    shared-strings table has to be kept in memory.
+    """
+    buffer = _ChunkBuffer()
+    with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _XLSX_STATIC_PARTS.items():
+            archive.writestr(name, content)
+        archive.writestr(
+            "xl/workbook.xml",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets><sheet name="{escape(sheet_title[:31])}" sheetId="1" r:id="rId1"/></sheets>'
+            "</workbook>",
+        )
+        yield buffer.drain()
+
+        with archive.open("xl/worksheets/sheet1.xml", mode="w", force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                b"<sheetData>"
+            )
+            sheet.write(_xlsx_row(header).encode("utf-8"))
+            for count, row in enumerate(rows, start=1):
+                sheet.write(_xlsx_row(row).encode("utf-8"))
+                if count % EXPORT_CHUNK_SIZE == 0:
+                    yield buffer.drain()
+            sheet.write(b"</sheetData></worksheet>")
+    yield buffer.drain()
+
+
+_END = object()
+
+
+async def _async_chunks(chunks):
+    """
+    The chunks of a sync stream as an async iterator, each one built in the
+    request's sync thread, where the stream's database cursor lives. Under
+    ASGI, StreamingHttpResponse would otherwise read a sync stream into a
+    list before sending any of it.
+    """
+    next_chunk = sync_to_async(next)
+    try:
+        while (chunk := await next_chunk(chunks, _END)) is not _END:
+            yield chunk
+    finally:
+        # Also when the client goes away mid-download, to free the cursor
+        await sync_to_async(chunks.close)()
+
+
+def streaming_export(request, header, rows, file_format, filename):
+    """
+    StreamingHttpResponse sending ``rows`` as a CSV or XLSX download: an
+    async stream under ASGI, a sync one under WSGI.
+    """
+    if file_format == "xlsx":
+        content = stream_xlsx(header, rows, sheet_title=filename)
+    else:
+        file_format = "csv"
+        content = stream_csv(header, rows)
+    if isinstance(request, ASGIRequest):
+        content = _async_chunks(content)
+
+    response = StreamingHttpResponse(content, content_type=EXPORT_FORMATS[file_format])
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{file_format}"'
+    return response
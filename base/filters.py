@@ -0,0 +1,142 @@
+# base/filters.py
+
+from asgiref.sync import sync_to_async
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.utils.functional import cached_property
+
+from .models import DailyHostDowntime, NetworkEvent
+from .search import search_events
+from .utils import default_time_range, get_time_range
+
+# Columns the dashboard search box looks in
+DASHBOARD_SEARCH_COLUMNS = ("name", "reason", "date")
+
+
+class RequestFilters:
+    """
+    The dashboard filters of one request, resolved once.
+
+    The events queryset, the reporting window and the rollup queryset are
+    built on first access and kept for the rest of the request, so a view,
+    its helpers and its templates all share them (including the events'
+    result cache once the queryset has been evaluated). Use
+    ``get_filters(request)`` instead of creating one directly.
+    """
+
+    def __init__(self, request):
+        self.name_query = request.GET.get("name", None)
+        # Malformed dates are ignored rather than failing the whole page
+        self.start_date = _parse_date(request.GET.get("start_date"))
+        self.end_date = _parse_date(request.GET.get("end_date"))
+        self.type_query = request.GET.get("type", None)
+        self.request = request
+
+    @cached_property
+    def _matching(self):
+        """Events matching the search and type filters, any time."""
+        queryset = NetworkEvent.objects.all()
+
+        # Text search over name, reason and the Nepali date (full-text index)
+        if self.name_query:
+            queryset = search_events(queryset, self.name_query, DASHBOARD_SEARCH_COLUMNS)
+
+        if self.type_query:
+            queryset = queryset.filter(type__iexact=self.type_query)
+
+        return queryset
+
+    @cached_property
+    def events(self):
+        """Filtered NetworkEvent queryset, ordered by down_time."""
+        queryset = self._matching
+
+        if self.start_date:
+            queryset = queryset.filter(down_time__date__gte=self.start_date)
+
+        if self.end_date:
+            queryset = queryset.filter(down_time__date__lte=self.end_date)
+
+        return queryset.order_by("down_time")
+
+    @cached_property
+    def outages(self):
+        """
+        Matching events whose outage overlaps the reporting window, including
+        those that went down before it: what downtime is swept from
+        (utils.merged_downtime_by_host clips them to the window). Unordered.
+        """
+        start_time, end_time = self.time_range
+        return self._matching.filter(down_time__lt=end_time).filter(
+            Q(up_time__isnull=True) | Q(up_time__gt=start_time)
+        )
+
+    @cached_property
+    def time_range(self):
+        """
+        (start_time, end_time) of the reporting window, timezone-aware.
+
+        An explicit start/end date pair wins, then ``date_query``; otherwise
+        the window runs from 1st Baisakh of the current BS year until now,
+        taken from the Nepali calendar rather than from the events.
+        """
+        start_time, end_time = get_time_range(self.request)
+        if start_time is None or end_time is None:
+            # Unparseable dates: fall back to the default window
+            start_time, end_time = default_time_range()
+        return _aware(start_time), _aware(end_time)
+
+    @cached_property
+    def rollups(self):
+        """
+        DailyHostDowntime rows matching the filters, or None when the text
+        search is used: it matches reasons and dates of single events, which
+        the daily rollup cannot answer.
+        """
+        if self.name_query:
+            return None
+
+        queryset = DailyHostDowntime.objects.all()
+        if self.start_date:
+            queryset = queryset.filter(day__gte=self.start_date)
+        if self.end_date:
+            queryset = queryset.filter(day__lte=self.end_date)
+        if self.type_query:
+            queryset = queryset.filter(type__iexact=self.type_query)
+        return queryset
+
+    def resolve(self):
+        """
+        Build the querysets and the window now rather than on first use, so
+        async views can share them with the threads that run their queries.
+        Building the events may query the database (see search_available).
+        """
+        self.events, self.time_range, self.outages, self.rollups
+        return self
+
+
+def _parse_date(value):
+    try:
+        return parse_date(value.strip()) if value else None
+    except ValueError:
+        return None
+
+
+def _aware(value):
+    if timezone.is_naive(value):
+        return timezone.make_aware(value)
+    return value
+
+
+def get_filters(request):
+    """The request's RequestFilters, created on first use."""
+    filters = getattr(request, "_event_filters", None)
+    if filters is None:
+        filters = request._event_filters = RequestFilters(request)
+    return filters
+
+
+async def aget_filters(request):
+    """get_filters() for async views, resolved."""
+    return await sync_to_async(get_filters(request).resolve)()
@@ -0,0 +1,142 @@
+# base/live.py
+"""
+Server-Sent Events stream of outage changes for the dashboard.
+
+Imports and Sheet syncs add EventNotification rows in the transactions that
+write the events. Every open dashboard tails that table by id and is sent
+the changes of the events matching its own filters, so script.js can patch
+the pending-outages list and the counters instead of reloading the page.
+
+Served through host_report/asgi.py, a stream is an async generator: an
+open wallboard costs one mostly sleeping coroutine and a primary-key range
+query every POLL_SECONDS, not a worker thread. Under WSGI (runserver) a
+stream ends after WSGI_STREAM_SECONDS and the browser reconnects with the
+id of the last message it got.
+"""
+
+import asyncio
+import json
+import time
+from functools import partial
+
+from django.core.handlers.asgi import ASGIRequest
+from django.utils import formats, timezone
+
+from .concurrency import run_concurrently
+from .filters import aget_filters, get_filters
+from .models import EventNotification
+
+POLL_SECONDS = 2
+KEEPALIVE_SECONDS = 15
+WSGI_STREAM_SECONDS = 30
+RECONNECT_MILLISECONDS = 3000
+BATCH_SIZE = 500
+
+# Keeps proxies from closing an idle stream, and tells the page it is
+# still connected (it reloads after a gap longer than the retention)
+PING = "event: ping\ndata: {}\n\n"
+
+EVENT_FIELDS = ("pk", "name", "date", "type", "reason", "remarks", "down_time", "up_time")
+
+
+def _display(value):
+    """A datetime the way the templates render it."""
+    return formats.localize(timezone.localtime(value)) if value else ""
+
+
+def message(notification_id, kind, event):
+    data = {
+        "kind": kind,
+        "id": event["pk"],
+        "name": event["name"],
+        "date": event["date"],
+        "type": event["type"],
+        "reason": event["reason"],
+        "remarks": event["remarks"] or "",
+        "down_time": event["down_time"].isoformat() if event["down_time"] else None,
+        "down_time_display": _display(event["down_time"]),
+        "up_time": event["up_time"].isoformat() if event["up_time"] else None,
+    }
+    return f"id: {notification_id}\nevent: outage\ndata: {json.dumps(data)}\n\n"
+
+
+def first_id(request):
+    """
+    Where a stream starts: after the Last-Event-ID the browser reconnects
+    with, else after the ``after`` id the page was rendered with, else now.
+    """
+    value = request.headers.get("Last-Event-ID") or request.GET.get("after")
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return EventNotification.latest_id()
+
+
+def poll(request, after):
+    """
+    SSE messages for the notifications after id ``after`` whose events match
+    the request's dashboard filters, and the id to continue after.
+    """
+    notifications = list(
+        EventNotification.objects.filter(pk__gt=after)
+        .order_by("pk")
+        .values_list("pk", "kind", "event_id")[:BATCH_SIZE]
+    )
+    if not notifications:
+        return [], after
+    events = {
+        event["pk"]: event
+        for event in get_filters(request).events
+        .filter(pk__in={event_id for _, _, event_id in notifications})
+        .order_by()
+        .values(*EVENT_FIELDS)
+    }
+    messages = [
+        message(pk, kind, events[event_id])
+        for pk, kind, event_id in notifications
+        if event_id in events
+    ]
+    return messages, notifications[-1][0]
+
+
+def _sync_stream(request, after):
+    yield f"retry: {RECONNECT_MILLISECONDS}\n\n"
+    deadline = time.monotonic() + WSGI_STREAM_SECONDS
+    idle = 0
+    while time.monotonic() < deadline:
+        messages, after = poll(request, after)
+        if messages:
+            yield "".join(messages)
+            idle = 0
+        elif idle >= KEEPALIVE_SECONDS:
+            yield PING
+            idle = 0
+        time.sleep(POLL_SECONDS)
+        idle += POLL_SECONDS
+
+
+async def _async_stream(request, after):
+    yield f"retry: {RECONNECT_MILLISECONDS}\n\n"
+    # The filters are built once, then each poll runs in a thread of its own
+    # (thread_sensitive=False) rather than queueing every wallboard's polls
+    # on the single shared sync thread
+    await aget_filters(request)
+    idle = 0
+    while True:
+        [(messages, after)] = await run_concurrently(partial(poll, request, after))
+        if messages:
+            yield "".join(messages)
+            idle = 0
+        elif idle >= KEEPALIVE_SECONDS:
+            yield PING
+            idle = 0
+        await asyncio.sleep(POLL_SECONDS)
+        idle += POLL_SECONDS
+
+
+def event_stream(request):
+    """The SSE body for a dashboard: async under ASGI, time-boxed under WSGI."""
+    after = first_id(request)
+    if isinstance(request, ASGIRequest):
+        return _async_stream(request, after)
+    return _sync_stream(request, after)
@@ -0,0 +1,238 @@
+# base/management/commands/benchmark.py
+
+import json
+import platform
+import sqlite3
+import statistics
+import subprocess
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from base.db import scratch_database
+from base.models import NetworkEvent
+from base.services import process_network_event_import, sync_network_events_from_google_sheet
+from base.synthetic import SyntheticWorksheet, make_synthetic_import
+from base.utils import classify_reason, find_likely_root_causes
+
+# The synthetic data covers BS 2082 (mid-April 2025 onwards) so the default
+# dashboard window, the current BS year, is not what's measured.
+DATA_START = datetime(2025, 4, 14)
+DATA_DAYS = 365
+WINDOW = {"start_date": "2025-04-14", "end_date": "2026-04-13"}
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the CSV import, the sheet sync, the dashboard pages, the chart "
+        "APIs and root-cause classification on synthetic events, and write the "
+        "timings as JSON. Runs against a throw-away database, never the real one."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            type=int,
+            nargs="+",
+            default=[10000],
+            help="Event counts to benchmark, e.g. --rows 10000 100000 1000000.",
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Synthetic data seed.")
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Runs of each read benchmark (imports and syncs run once).",
+        )
+        parser.add_argument(
+            "--only", nargs="+", help="Run only the benchmarks with these names."
+        )
+        parser.add_argument("--output", help="Write the results to this JSON file.")
+        parser.add_argument(
+            "--compare", help="A previous --output file to compare the medians against."
+        )
+
+    def handle(self, *args, **options):
+        if options["repeat"] < 1:
+            raise CommandError("--repeat must be at least 1.")
+        baseline = None
+        if options["compare"]:
+            with open(options["compare"], encoding="utf-8") as f:
+                baseline = json.load(f)
+
+        self.only = set(options["only"] or [])
+        self.repeat = options["repeat"]
+        results = []
+        for rows in options["rows"]:
+            self.stdout.write(f"{rows} rows")
+            # Uncached: every view computes its payload
+            with scratch_database("django.core.cache.backends.dummy.DummyCache"):
+                results.extend(self.run_scale(rows, options["seed"]))
+
+        report = {"environment": self.environment(options), "results": results}
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+        else:
+            self.stdout.write(json.dumps(report, indent=2))
+
+        if baseline:
+            self.print_comparison(baseline, report)
+
+    def environment(self, options):
+        try:
+            commit = subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {
+            "commit": commit,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "machine": platform.machine(),
+            "seed": options["seed"],
+            "repeat": options["repeat"],
+        }
+
+    def measure(self, results, name, rows, func, repeat=None, setup=False):
+        if self.only and name not in self.only:
+            # Setup steps still run, the later benchmarks need their data
+            return func() if setup else None
+        seconds = []
+        value = None
+        for _ in range(repeat or self.repeat):
+            started = time.perf_counter()
+            value = func()
+            seconds.append(time.perf_counter() - started)
+        median = statistics.median(seconds)
+        results.append({
+            "benchmark": name,
+            "rows": rows,
+            "runs": len(seconds),
+            "min_seconds": round(min(seconds), 6),
+            "median_seconds": round(median, 6),
+            "rows_per_second": round(rows / median, 1) if median else None,
+        })
+        self.stdout.write(f"  {name:<28} {median * 1000:>12.1f} ms")
+        return value
+
+    def run_scale(self, rows, seed):
+        results = []
+        sheet_rows = max(rows // 10, 1)
+        event_import = make_synthetic_import(rows, seed, start=DATA_START, days=DATA_DAYS)
+        worksheet = SyntheticWorksheet(sheet_rows, seed + 1, start=DATA_START, days=DATA_DAYS)
+
+        # Writes run once, in order: the import loads the data everything
+        # else reads. The sync adds 10% on top, then re-reads the unchanged sheet.
+        self.measure(
+            results, "csv_import", rows,
+            lambda: process_network_event_import(event_import), repeat=1, setup=True,
+        )
+        self.measure(
+            results, "sheet_sync", sheet_rows,
+            lambda: sync_network_events_from_google_sheet(worksheet=worksheet),
+            repeat=1, setup=True,
+        )
+        self.measure(
+            results, "sheet_sync_unchanged", sheet_rows,
+            lambda: sync_network_events_from_google_sheet(worksheet=worksheet), repeat=1,
+        )
+
+        total = NetworkEvent.objects.count()
+        busiest_host = (
+            NetworkEvent.objects.values("host_id").annotate(n=Count("id")).order_by("-n")
+            .values_list("host_id", flat=True).first()
+        )
+        client = Client()
+
+        def get(url, params=None):
+            def request():
+                response = client.get(url, {**WINDOW, **(params or {})})
+                if response.status_code != 200:
+                    raise CommandError(f"GET {url} returned {response.status_code}.")
+                if response.streaming:
+                    for _ in response.streaming_content:
+                        pass
+                else:
+                    response.content
+            return request
+
+        pages = [
+            ("display", reverse("index"), None),
+            ("display_search", reverse("index"), {"name": "sw1"}),
+            ("monthly_view", reverse("monthview"), {"year": 2082}),
+            ("api_host_summary", reverse("api-host-summary"), {"kind": "hosts"}),
+            ("api_aggregate_uptime", reverse("api-aggregate-uptime"), None),
+            ("api_daily_event_trend", reverse("daily_event_trend_api"), None),
+            ("api_dashboard", reverse("api-dashboard"), None),
+            ("api_host_charts", reverse("host-charts", args=[busiest_host]), None),
+            ("host_details", reverse("host-details", args=[busiest_host]), None),
+            ("export_events_csv", reverse("export-events"), None),
+        ]
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            for name, url, params in pages:
+                self.measure(results, name, total, get(url, params))
+
+        reasons = list(NetworkEvent.objects.values_list("name", "reason"))
+
+        def classify_events():
+            classify_reason.cache_clear()
+            for _, reason in reasons:
+                classify_reason(reason or "")
+
+        def root_causes():
+            classify_reason.cache_clear()
+            counts = defaultdict(Counter)
+            for name, reason in reasons:
+                if reason:
+                    counts[name][reason] += 1
+            return find_likely_root_causes(counts)
+
+        self.measure(results, "classify_reasons", total, classify_events)
+        self.measure(results, "root_causes", total, root_causes)
+
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            journal_mode = cursor.fetchone()[0]
+        for result in results:
+            result["journal_mode"] = journal_mode
+        return results
+
+    def print_comparison(self, baseline, report):
+        before = {
+            (r["benchmark"], r["rows"]): r["median_seconds"] for r in baseline["results"]
+        }
+        environment = baseline.get("environment", {})
+        self.stdout.write(
+            f"\nAgainst {environment.get('commit') or environment.get('created_at')}:"
+        )
+        for result in report["results"]:
+            old = before.get((result["benchmark"], result["rows"]))
+            if not old:
+                continue
+            ratio = result["median_seconds"] / old
+            line = (
+                f"  {result['benchmark']:<28} {result['rows']:>8} rows "
+                f"{old * 1000:>10.1f} -> {result['median_seconds'] * 1000:>10.1f} ms "
+                f"({ratio:.2f}x)"
+            )
+            if ratio > 1.1:
+                line = self.style.WARNING(line)
+            elif ratio < 0.9:
+                line = self.style.SUCCESS(line)
+            self.stdout.write(line)
+
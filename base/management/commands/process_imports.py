@@ -0,0 +1,80 @@
+# base/management/commands/process_imports.py
+
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from base.services import run_import_batch, run_next_import
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Process queued NetworkEventImport CSV uploads. Runs as a worker loop; "
+        "start several to process imports concurrently."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Process the imports that are queued right now, then exit.",
+        )
+        parser.add_argument(
+            "--parallel",
+            type=int,
+            default=1,
+            metavar="N",
+            help=(
+                "Parse up to N queued files at a time in a process pool "
+                "(one writer applies them). Default: one file at a time."
+            ),
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=2.0,
+            help="Seconds to wait between polls when the queue is empty.",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Import worker started.")
+        while True:
+            close_old_connections()
+            try:
+                if options["parallel"] > 1:
+                    processed = run_import_batch(options["parallel"])
+                else:
+                    event_import = run_next_import()
+                    processed = [event_import] if event_import else []
+            except Exception as e:
+                # Keep the worker alive on database hiccups; the import stays queued.
+                self.stderr.write(f"An error occurred while claiming an import: {e}")
+                logger.exception("Import worker poll failed.")
+                processed = []
+
+            for event_import in processed:
+                style = (
+                    self.style.SUCCESS
+                    if event_import.processing_status == "completed"
+                    else self.style.ERROR
+                )
+                self.stdout.write(
+                    style(
+                        f"Import {event_import.pk} ({event_import.csv_file.name}): "
+                        f"{event_import.processing_status}. Processed: "
+                        f"{event_import.processed_rows}, Created: "
+                        f"{event_import.created_events}, Updated: "
+                        f"{event_import.updated_events}, Duplicates: "
+                        f"{event_import.duplicate_events}."
+                    )
+                )
+            if processed:
+                continue
+
+            if options["once"]:
+                break
+            time.sleep(options["poll_interval"])
@@ -0,0 +1,14 @@
+# base/management/commands/rebuild_rollups.py
+
+from django.core.management.base import BaseCommand
+
+from base.models import DailyHostDowntime
+
+
+class Command(BaseCommand):
+    help = "Recompute the daily per-host downtime rollup table from all NetworkEvent rows."
+
+    def handle(self, *args, **kwargs):
+        self.stdout.write("Rebuilding daily host downtime rollups...")
+        created = DailyHostDowntime.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {created} rollup rows."))
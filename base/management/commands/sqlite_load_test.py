@@ -0,0 +1,150 @@
+# base/management/commands/sqlite_load_test.py
+
+import json
+import statistics
+import threading
+import time
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections
+from django.utils import timezone
+
+from base.db import scratch_database
+from base.models import DailyHostDowntime, NetworkEvent
+from base.services import process_network_event_import
+from base.synthetic import make_synthetic_import
+from base.views import get_host_summary
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test: run a synthetic CSV import while reader threads query the "
+        "dashboard, and report read latencies and lock errors. Runs against a "
+        "throw-away copy of the schema, never the real database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=25000, help="Rows in the import.")
+        parser.add_argument("--readers", type=int, default=4, help="Reader threads.")
+        parser.add_argument("--seed", type=int, default=0, help="Synthetic data seed.")
+        parser.add_argument(
+            "--preload",
+            type=int,
+            default=5000,
+            help="Events imported before the test so the readers have data to query.",
+        )
+        parser.add_argument(
+            "--max-read-ms",
+            type=float,
+            default=2000,
+            help="Fail if any read takes longer than this many milliseconds.",
+        )
+        parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("The load test is for the SQLite backend.")
+
+        with scratch_database():
+            report = self.run_load_test(options)
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            for key, value in report.items():
+                self.stdout.write(f"{key}: {value}")
+
+        if report["reader_errors"]:
+            raise CommandError(f"{report['reader_errors']} reads failed while the import ran.")
+        if report["read_ms_max"] > options["max_read_ms"]:
+            raise CommandError(
+                f"Slowest read took {report['read_ms_max']} ms "
+                f"(limit {options['max_read_ms']} ms)."
+            )
+        self.stdout.write(self.style.SUCCESS("Readers were never blocked by the import."))
+
+    def run_load_test(self, options):
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            journal_mode = cursor.fetchone()[0]
+
+        if options["preload"]:
+            process_network_event_import(
+                make_synthetic_import(
+                    options["preload"], options["seed"] + 1, start=datetime(2025, 1, 1), days=120
+                )
+            )
+        event_import = make_synthetic_import(
+            options["rows"], options["seed"], start=datetime(2025, 5, 1), days=120
+        )
+
+        start_time = timezone.make_aware(datetime(2025, 1, 1))
+        end_time = start_time + timedelta(days=365)
+
+        def read_dashboard():
+            events = NetworkEvent.objects.all()
+            events.count()
+            list(events.filter(up_time__isnull=True)[:100])
+            get_host_summary(events, start_time, end_time, DailyHostDowntime.objects.all())
+
+        latencies = []
+        errors = []
+        stop = threading.Event()
+
+        def reader():
+            try:
+                while not stop.is_set():
+                    started = time.monotonic()
+                    try:
+                        read_dashboard()
+                    except OperationalError as e:
+                        errors.append(str(e))
+                        continue
+                    latencies.append((time.monotonic() - started) * 1000)
+            finally:
+                connections.close_all()
+
+        writer_result = {}
+
+        def writer():
+            try:
+                started = time.monotonic()
+                writer_result["summary"] = process_network_event_import(event_import)
+                writer_result["seconds"] = time.monotonic() - started
+            except Exception as e:
+                writer_result["error"] = repr(e)
+            finally:
+                connections.close_all()
+
+        readers = [threading.Thread(target=reader) for _ in range(options["readers"])]
+        writer_thread = threading.Thread(target=writer)
+        for thread in readers:
+            thread.start()
+        writer_thread.start()
+        writer_thread.join()
+        stop.set()
+        for thread in readers:
+            thread.join()
+
+        if "error" in writer_result:
+            raise CommandError(f"The import failed: {writer_result['error']}")
+
+        latencies.sort()
+        return {
+            "journal_mode": journal_mode,
+            "rows": options["rows"],
+            "import_seconds": round(writer_result["seconds"], 2),
+            "import_rows_per_second": round(options["rows"] / writer_result["seconds"], 1),
+            "import_created": writer_result["summary"]["created"],
+            "reads": len(latencies),
+            "reader_errors": len(errors),
+            "first_error": errors[0] if errors else None,
+            "read_ms_p50": round(statistics.median(latencies), 1) if latencies else None,
+            "read_ms_p95": (
+                round(latencies[max(int(len(latencies) * 0.95) - 1, 0)], 1)
+                if latencies
+                else None
+            ),
+            "read_ms_max": round(latencies[-1], 1) if latencies else 0,
+        }
@@ -2,25 +2,41 @@
 
 import logging
 from django.core.management.base import BaseCommand
-from base.services import sync_network_events_from_google_sheet
+from base.services import CSVWorksheet, sync_network_events_from_google_sheet
 
 logger = logging.getLogger(__name__)
 
 class Command(BaseCommand):
     help = "Sync data from Google Sheet and update/create NetworkEvent model entries."
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Re-process every row, even rows unchanged since the last sync.",
+        )
+        parser.add_argument(
+            "--csv",
+            dest="csv_path",
+            help="Sync from a local CSV export of the 'Total' worksheet instead of Google Sheets.",
+        )
+
     def handle(self, *args, **kwargs):
         self.stdout.write("Starting Google Sheet sync to DB...")
         try:
-            summary = sync_network_events_from_google_sheet()
-            
+            worksheet = CSVWorksheet(kwargs["csv_path"]) if kwargs["csv_path"] else None
+            summary = sync_network_events_from_google_sheet(
+                worksheet=worksheet, full=kwargs["full"]
+            )
+
             if summary.get("message"):
                 self.stdout.write(summary["message"])
                 return
 
             summary_str = (
                 f"\nSync summary: Created: {summary['created']}, Updated: {summary['updated']}, "
-                f"Duplicates: {summary['duplicates']}, Skipped: {summary['skipped']}."
+                f"Duplicates: {summary['duplicates']}, Skipped: {summary['skipped']}, "
+                f"Unchanged: {summary['unchanged']}."
             )
             self.stdout.write(self.style.SUCCESS(summary_str))
 
@@ -0,0 +1,229 @@
+# base/metrics.py
+"""
+In-process metrics in the Prometheus text format.
+
+Counters, gauges and histograms live in this process only: each web worker
+reports its own requests, and Prometheus adds them up across workers. The
+CSV import queue is read from NetworkEventImport when the metrics are
+scraped instead, because the imports run in the separate worker process.
+"""
+
+import bisect
+import threading
+from collections import defaultdict
+
+from django.db.models import Count, Sum
+
+from .models import NetworkEventImport
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds, for request wall time and SQL time
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+ROW_BUCKETS = (10, 100, 1000, 10000, 100000, 1000000)
+SIZE_BUCKETS = (1024, 10240, 102400, 1048576, 10485760)
+INGEST_DURATION_BUCKETS = (0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 3600)
+
+_registry = []
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ""
+    escaped = (
+        (name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in pairs
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes the labels {self.labelnames}, got {tuple(labels)}.")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        with self._lock:
+            lines.extend(self._samples())
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values = defaultdict(int)
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] += amount
+
+    def _samples(self):
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DURATION_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [per-bucket counts (+Inf last), sum]
+        self._values = {}
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0)
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._values[key] = (counts, total + value)
+
+    def _samples(self):
+        for key, (counts, total) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, [("le", _format_value(bound))])
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(float(total))}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+# --- HTTP requests (recorded by base.middleware.RequestMetricsMiddleware) ---
+
+REQUESTS = Counter(
+    "noc_http_requests_total", "HTTP requests by view, method and status.",
+    ["view", "method", "status"],
+)
+REQUEST_DURATION = Histogram(
+    "noc_http_request_duration_seconds", "Wall time of a request, including streaming.",
+    ["view"],
+)
+REQUEST_QUERIES = Histogram(
+    "noc_http_request_sql_queries", "SQL queries run by a request.",
+    ["view"], buckets=QUERY_COUNT_BUCKETS,
+)
+REQUEST_SQL_DURATION = Histogram(
+    "noc_http_request_sql_duration_seconds", "Time a request spent in SQL.", ["view"],
+)
+REQUEST_SQL_ROWS = Histogram(
+    "noc_http_request_sql_rows", "Rows a request fetched from the database.",
+    ["view"], buckets=ROW_BUCKETS,
+)
+RESPONSE_SIZE = Histogram(
+    "noc_http_response_size_bytes", "Response body size.", ["view"], buckets=SIZE_BUCKETS,
+)
+
+# --- Imports and sheet syncs that ran in this process ---
+
+INGEST_RUNS = Counter(
+    "noc_ingest_runs_total", "Imports and sheet syncs run, by source and result.",
+    ["source", "result"],
+)
+INGEST_ROWS = Counter(
+    "noc_ingest_rows_total", "Rows handled by imports and sheet syncs, by outcome.",
+    ["source", "outcome"],
+)
+INGEST_DURATION = Histogram(
+    "noc_ingest_duration_seconds", "Wall time of an import or sheet sync.",
+    ["source"], buckets=INGEST_DURATION_BUCKETS,
+)
+INGEST_ROWS_PER_SECOND = Gauge(
+    "noc_ingest_rows_per_second", "Throughput of the last import or sheet sync.", ["source"],
+)
+
+INGEST_OUTCOMES = ("created", "updated", "duplicates", "skipped", "unchanged")
+
+
+def record_ingest(source, summary, seconds, rows):
+    """Count a finished import ("csv") or sheet sync ("sheet") from its summary dict."""
+    INGEST_RUNS.inc(source=source, result="success")
+    for outcome in INGEST_OUTCOMES:
+        if summary.get(outcome):
+            INGEST_ROWS.inc(summary[outcome], source=source, outcome=outcome)
+    INGEST_DURATION.observe(seconds, source=source)
+    INGEST_ROWS_PER_SECOND.set(round(rows / seconds, 1) if seconds else 0, source=source)
+
+
+def record_ingest_failure(source):
+    INGEST_RUNS.inc(source=source, result="failure")
+
+
+def _import_queue_lines():
+    imports = NetworkEventImport.objects
+    by_status = dict(
+        imports.values_list("processing_status").annotate(n=Count("id")).order_by()
+    )
+    totals = imports.filter(processing_status="completed").aggregate(
+        processed=Sum("processed_rows"),
+        created=Sum("created_events"),
+        updated=Sum("updated_events"),
+        duplicates=Sum("duplicate_events"),
+    )
+    last_rate = (
+        imports.filter(processing_status="completed", finished_at__isnull=False)
+        .order_by("-finished_at").values_list("rows_per_second", flat=True).first()
+    )
+
+    lines = [
+        "# HELP noc_csv_imports CSV imports in the queue table, by status.",
+        "# TYPE noc_csv_imports gauge",
+    ]
+    for status, _ in NetworkEventImport._meta.get_field("processing_status").choices:
+        lines.append(f'noc_csv_imports{{status="{status}"}} {by_status.get(status, 0)}')
+    lines += [
+        "# HELP noc_csv_import_rows Rows of all completed CSV imports, by outcome.",
+        "# TYPE noc_csv_import_rows gauge",
+    ]
+    for outcome, value in totals.items():
+        lines.append(f'noc_csv_import_rows{{outcome="{outcome}"}} {value or 0}')
+    lines += [
+        "# HELP noc_csv_import_last_rows_per_second Throughput of the latest completed CSV import.",
+        "# TYPE noc_csv_import_last_rows_per_second gauge",
+        f"noc_csv_import_last_rows_per_second {_format_value(float(last_rate or 0))}",
+    ]
+    return lines
+
+
+def render():
+    """Every metric of this process plus the import queue, as exposition text."""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    lines.extend(_import_queue_lines())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,143 @@
+# base/middleware.py
+
+import threading
+import time
+from contextlib import ExitStack, nullcontext
+from contextvars import ContextVar
+
+from django.db import connection
+
+from . import metrics
+
+# The _QueryStats of the request being handled, for queries it runs on other
+# threads (see track_queries)
+_request_stats = ContextVar("request_query_stats", default=None)
+
+
+class _QueryStats:
+    """
+    execute_wrapper that counts the queries, SQL time and rows of one
+    request, possibly from several threads at once.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+        self.rows = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            with self._lock:
+                self.seconds += time.perf_counter() - started
+                self.queries += 1
+            self._count_fetches(context["cursor"])
+
+    def _count_fetches(self, cursor_wrapper):
+        # The ORM fetches through the driver cursor after execute() returns,
+        # so rows are counted by shadowing its fetch methods. SQLite's cursor
+        # reports no rowcount for SELECTs, which is why this isn't rowcount.
+        cursor = cursor_wrapper.cursor
+        if getattr(cursor, "_noc_counted", False):
+            return
+        try:
+            for name in ("fetchone", "fetchmany", "fetchall"):
+                setattr(cursor, name, self._counting(getattr(cursor, name), name == "fetchone"))
+            cursor._noc_counted = True
+        except AttributeError:
+            # A C cursor without an instance dict: fall back to rowcount
+            if cursor.rowcount > 0:
+                with self._lock:
+                    self.rows += cursor.rowcount
+
+    def _counting(self, fetch, single):
+        def counted(*args, **kwargs):
+            result = fetch(*args, **kwargs)
+            with self._lock:
+                self.rows += (result is not None) if single else len(result)
+            return result
+        return counted
+
+
+class RequestMetricsMiddleware:
+    """
+    Record each request's wall time, SQL query count, SQL time, rows fetched
+    and response size per view into base.metrics. Streaming responses (the
+    exports) are measured until their last chunk is sent, since that's when
+    their queries run.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        stats = _QueryStats()
+        stack = ExitStack()
+        stack.enter_context(connection.execute_wrapper(stats))
+        token = _request_stats.set(stats)
+        try:
+            response = self.get_response(request)
+        except BaseException:
+            stack.close()
+            raise
+        finally:
+            _request_stats.reset(token)
+
+        def finish(size):
+            stack.close()
+            self.record(request, response, time.perf_counter() - started, stats, size)
+
+        if response.streaming:
+            measured = self._ameasured if response.is_async else self._measured
+            response.streaming_content = measured(response.streaming_content, finish)
+        else:
+            finish(len(response.content))
+        return response
+
+    @staticmethod
+    def _measured(chunks, finish):
+        size = 0
+        try:
+            for chunk in chunks:
+                size += len(chunk)
+                yield chunk
+        finally:
+            finish(size)
+
+    @staticmethod
+    async def _ameasured(chunks, finish):
+        # Async streams (the exports and live events under ASGI)
+        size = 0
+        try:
+            async for chunk in chunks:
+                size += len(chunk)
+                yield chunk
+        finally:
+            finish(size)
+
+    @staticmethod
+    def record(request, response, seconds, stats, size):
+        match = request.resolver_match
+        view = (match.view_name if match else None) or "unmatched"
+        metrics.REQUESTS.inc(view=view, method=request.method, status=response.status_code)
+        metrics.REQUEST_DURATION.observe(seconds, view=view)
+        metrics.REQUEST_QUERIES.observe(stats.queries, view=view)
+        metrics.REQUEST_SQL_DURATION.observe(stats.seconds, view=view)
+        metrics.REQUEST_SQL_ROWS.observe(stats.rows, view=view)
+        metrics.RESPONSE_SIZE.observe(size, view=view)
+
+
+def track_queries():
+    """
+    Count the queries this thread runs into the metrics of the request being
+    handled. For work a view hands to other threads, with their own database
+    connections (see base.concurrency); a no-op outside a request.
+    """
+    stats = _request_stats.get()
+    if stats is None:
+        return nullcontext()
+    return connection.execute_wrapper(stats)
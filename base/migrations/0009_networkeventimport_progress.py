@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("base", "0008_networkeventimport_skipped_rows_file"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="networkeventimport",
+            name="finished_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="networkeventimport",
+            name="rows_per_second",
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name="networkeventimport",
+            name="started_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="networkeventimport",
+            name="total_rows",
+            field=models.IntegerField(
+                default=0, help_text="Estimated data rows in the file"
+            ),
+        ),
+    ]
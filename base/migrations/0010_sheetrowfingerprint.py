@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("base", "0009_networkeventimport_progress"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SheetRowFingerprint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("worksheet", models.CharField(max_length=100)),
+                (
+                    "row_key",
+                    models.CharField(
+                        help_text="SN of the row, or its row number", max_length=100
+                    ),
+                ),
+                (
+                    "fingerprint",
+                    models.CharField(
+                        help_text="SHA256 of the synced cell values", max_length=64
+                    ),
+                ),
+                ("synced_at", models.DateTimeField(auto_now=True)),
+                (
+                    "event",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="sheet_rows",
+                        to="base.networkevent",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("worksheet", "row_key"), name="unique_sheet_row"
+                    )
+                ],
+            },
+        ),
+    ]
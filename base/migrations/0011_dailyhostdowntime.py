@@ -0,0 +1,132 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:12
+
+from collections import Counter, defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def _host_rollups(rows, now):
+    """
+    Rollup rows of one host's (down_time, up_time, reason) tuples, as
+    DailyHostDowntime.compute_buckets computed them when this migration
+    was written: events count on their local down day, merged downtime is
+    split at local midnights.
+    """
+    days = defaultdict(lambda: [0, 0, Counter()])
+    intervals = []
+    for down_time, up_time, reason in rows:
+        if not down_time:
+            continue
+        day = days[timezone.localtime(down_time).date()]
+        day[0] += 1
+        day[2][reason] += 1
+        intervals.append((down_time, up_time or now))
+
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    for start, end in merged:
+        cursor = start
+        while cursor < end:
+            day = timezone.localtime(cursor).date()
+            next_day = timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+            segment_end = min(end, next_day)
+            days[day][1] += (segment_end - cursor).total_seconds()
+            cursor = segment_end
+    return days
+
+
+def fill_rollups(apps, schema_editor):
+    """Compute the rollup of the existing events, one host at a time."""
+    DailyHostDowntime = apps.get_model("base", "DailyHostDowntime")
+    NetworkEvent = apps.get_model("base", "NetworkEvent")
+    now = timezone.now()
+    rows = (
+        NetworkEvent.objects.order_by("name", "type", "region")
+        .values_list("name", "type", "region", "down_time", "up_time", "reason")
+        .iterator(chunk_size=2000)
+    )
+
+    def flush(host, host_rows):
+        name, type, region = host
+        DailyHostDowntime.objects.bulk_create(
+            [
+                DailyHostDowntime(
+                    name=name, type=type, region=region, day=day,
+                    event_count=count, downtime_seconds=int(seconds),
+                    reasons=dict(reasons),
+                )
+                for day, (count, seconds, reasons) in _host_rollups(host_rows, now).items()
+            ],
+            batch_size=500,
+        )
+
+    host, host_rows = None, []
+    for name, type, region, *row in rows:
+        if (name, type, region) != host and host_rows:
+            flush(host, host_rows)
+            host_rows = []
+        host = (name, type, region)
+        host_rows.append(row)
+    if host_rows:
+        flush(host, host_rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("base", "0010_sheetrowfingerprint"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyHostDowntime",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100)),
+                ("type", models.CharField(max_length=100)),
+                ("region", models.CharField(max_length=100)),
+                ("day", models.DateField()),
+                ("event_count", models.IntegerField(default=0)),
+                ("downtime_seconds", models.IntegerField(default=0)),
+                (
+                    "reasons",
+                    models.JSONField(default=dict, help_text="Reason -> event count"),
+                ),
+            ],
+            options={
+                "ordering": ["day"],
+                "indexes": [
+                    models.Index(fields=["day"], name="base_dailyh_day_699cbc_idx"),
+                    models.Index(
+                        fields=["name", "day"], name="base_dailyh_name_5f76f0_idx"
+                    ),
+                    models.Index(
+                        fields=["type", "day"], name="base_dailyh_type_c047b1_idx"
+                    ),
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("name", "type", "region", "day"),
+                        name="unique_daily_host_downtime",
+                    )
+                ],
+            },
+        ),
+        # Without it every rollup-backed view reads 100% uptime until
+        # rebuild_rollups is run by hand
+        migrations.RunPython(fill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:25
+
+from django.db import migrations, models
+from django.utils import timezone
+
+from base import nepali_calendar
+
+
+def bs_date_parts(value):
+    # A copy of base.utils.bs_date_parts as of this migration
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    try:
+        return tuple(nepali_calendar.to_bs(value.date()))
+    except ValueError:
+        return None, None, None
+
+
+def backfill_bs_date(apps, schema_editor):
+    NetworkEvent = apps.get_model("base", "NetworkEvent")
+    batch = []
+    events = NetworkEvent.objects.filter(down_time__isnull=False).only("down_time")
+    for event in events.iterator(chunk_size=2000):
+        event.bs_year, event.bs_month, event.bs_day = bs_date_parts(event.down_time)
+        batch.append(event)
+        if len(batch) >= 2000:
+            NetworkEvent.objects.bulk_update(batch, ["bs_year", "bs_month", "bs_day"])
+            batch = []
+    if batch:
+        NetworkEvent.objects.bulk_update(batch, ["bs_year", "bs_month", "bs_day"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("base", "0011_dailyhostdowntime"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="networkevent",
+            name="bs_day",
+            field=models.PositiveSmallIntegerField(
+                blank=True, editable=False, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="networkevent",
+            name="bs_month",
+            field=models.PositiveSmallIntegerField(
+                blank=True, editable=False, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="networkevent",
+            name="bs_year",
+            field=models.PositiveSmallIntegerField(
+                blank=True, editable=False, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="networkevent",
+            index=models.Index(
+                fields=["bs_year", "bs_month", "bs_day"],
+                name="base_networ_bs_year_0bb3b4_idx",
+            ),
+        ),
+        migrations.RunPython(backfill_bs_date, migrations.RunPython.noop),
+    ]
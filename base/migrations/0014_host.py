@@ -0,0 +1,99 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_hosts(apps, schema_editor):
+    Host = apps.get_model("base", "Host")
+    NetworkEvent = apps.get_model("base", "NetworkEvent")
+
+    # Ordered by down time, so each host ends up with its latest event's values
+    latest = {}
+    rows = (
+        NetworkEvent.objects.exclude(name="")
+        .order_by("name", "down_time")
+        .values_list("name", "type", "region", "solar", "down_time")
+        .iterator(chunk_size=2000)
+    )
+    for name, type, region, solar, down_time in rows:
+        latest[name] = (type, region, solar, down_time)
+    Host.objects.bulk_create(
+        [
+            Host(
+                name=name, type=type, region=region,
+                solar=(solar or "").strip().lower() in ("true", "yes", "1"),
+                last_seen=down_time,
+            )
+            for name, (type, region, solar, down_time) in latest.items()
+        ],
+        batch_size=500,
+    )
+    NetworkEvent.objects.update(
+        host_id=Subquery(Host.objects.filter(name=OuterRef("name")).values("id")[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("base", "0013_networkevent_search_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Host",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100, unique=True)),
+                ("type", models.CharField(blank=True, max_length=100)),
+                ("region", models.CharField(blank=True, max_length=100)),
+                (
+                    "solar",
+                    models.BooleanField(default=False, help_text="Full solar POP"),
+                ),
+                (
+                    "last_seen",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="Down time of the host's latest event",
+                        null=True,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["name"],
+            },
+        ),
+        migrations.AddField(
+            model_name="networkevent",
+            name="host",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="events",
+                to="base.host",
+            ),
+        ),
+        migrations.RunPython(backfill_hosts, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="networkevent",
+            index=models.Index(
+                fields=["host", "down_time"], name="base_networ_host_id_fc82ba_idx"
+            ),
+        ),
+        migrations.RemoveIndex(
+            model_name="networkevent",
+            name="base_networ_name_cdc4df_idx",
+        ),
+    ]
@@ -0,0 +1,203 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:52
+
+import datetime
+import hashlib
+
+from django.db import migrations, models
+from django.utils import timezone
+
+UNIQUE_HASH_FIELDS = [
+    "name", "down_time", "up_time", "date", "type", "region",
+    "reason", "solar", "remarks", "category",
+]
+BASE_HASH_FIELDS = ["name", "down_time", "type", "region"]
+CHUNK_SIZE = 2000
+
+# A copy of base.utils.dedup_keys as of this migration, so that later
+# changes to it can't change the keys filled in here.
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+_MICROSECOND = datetime.timedelta(microseconds=1)
+
+
+def _dedup_text(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime.datetime):
+        if timezone.is_naive(value):
+            value = timezone.make_aware(value)
+        return str((value - _EPOCH) // _MICROSECOND)
+    return str(value).strip().lower()
+
+
+def dedup_keys(rows):
+    return [
+        int.from_bytes(
+            hashlib.blake2b(
+                "\x1f".join(map(_dedup_text, row)).encode("utf-8"), digest_size=8
+            ).digest(),
+            "big",
+            signed=True,
+        )
+        for row in rows
+    ]
+
+
+def fill_keys(apps, schema_editor):
+    """
+    Hash every event into the new 64-bit keys, a chunk at a time.
+
+    Events that only differed by the zone their times were written in get
+    the same key. Rather than pick which of them to drop, the migration
+    stops and lists them, to be merged or deleted by hand before running
+    it again.
+    """
+    NetworkEvent = apps.get_model("base", "NetworkEvent")
+    base_positions = [UNIQUE_HASH_FIELDS.index(field) for field in BASE_HASH_FIELDS]
+    rows = (
+        NetworkEvent.objects.order_by("pk")
+        .values_list("pk", *UNIQUE_HASH_FIELDS)
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    seen = {}
+    collisions = []
+    chunk = []
+
+    def flush():
+        values = [row[1:] for row in chunk]
+        unique_keys = dedup_keys(values)
+        base_keys = dedup_keys([[row[i] for i in base_positions] for row in values])
+        events = []
+        for row, unique_key, base_key in zip(chunk, unique_keys, base_keys):
+            if unique_key in seen:
+                collisions.append((seen[unique_key], row[0]))
+                continue
+            seen[unique_key] = row[0]
+            events.append(NetworkEvent(pk=row[0], unique_key=unique_key, base_key=base_key))
+        NetworkEvent.objects.bulk_update(events, ["unique_key", "base_key"], batch_size=500)
+        chunk.clear()
+
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == CHUNK_SIZE:
+            flush()
+    if chunk:
+        flush()
+    if collisions:
+        pairs = ", ".join(f"{first} and {second}" for first, second in collisions)
+        raise RuntimeError(
+            f"{len(collisions)} network events repeat an earlier one once their times "
+            f"are compared as instants (pks {pairs}). Merge or delete them, then migrate again."
+        )
+
+
+def _old_hash(values):
+    text = "|".join(
+        str(timezone.localtime(value)) if hasattr(value, "tzinfo")
+        else str(value or "").strip().lower()
+        for value in values
+    )
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def fill_hex_hashes(apps, schema_editor):
+    """Back to the SHA-256 hex hashes, for migrating backwards."""
+    NetworkEvent = apps.get_model("base", "NetworkEvent")
+    base_positions = [UNIQUE_HASH_FIELDS.index(field) for field in BASE_HASH_FIELDS]
+    rows = NetworkEvent.objects.values_list("pk", *UNIQUE_HASH_FIELDS).iterator(
+        chunk_size=CHUNK_SIZE
+    )
+    events = []
+    for pk, *values in rows:
+        events.append(NetworkEvent(
+            pk=pk,
+            unique_hash=_old_hash(values),
+            base_hash=_old_hash([values[i] for i in base_positions]),
+        ))
+        if len(events) == CHUNK_SIZE:
+            NetworkEvent.objects.bulk_update(events, ["unique_hash", "base_hash"], batch_size=500)
+            events = []
+    NetworkEvent.objects.bulk_update(events, ["unique_hash", "base_hash"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("base", "0014_host"),
+    ]
+
+    operations = [
+        # Indexes that repeat another one: unique=True already indexes
+        # unique_hash, down_time has db_index, and (type, down_time) and
+        # (region, down_time) serve lookups on type and region alone.
+        migrations.RemoveIndex(
+            model_name="networkevent",
+            name="base_networ_unique__fa28e7_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="networkevent",
+            name="base_networ_down_ti_d0085e_idx",
+        ),
+        migrations.AlterField(
+            model_name="networkevent",
+            name="type",
+            field=models.CharField(max_length=100),
+        ),
+        migrations.AlterField(
+            model_name="networkevent",
+            name="region",
+            field=models.CharField(max_length=100),
+        ),
+        migrations.AddField(
+            model_name="networkevent",
+            name="unique_key",
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name="networkevent",
+            name="base_key",
+            field=models.BigIntegerField(null=True),
+        ),
+        # Nullable first, so that migrating backwards can re-add and refill them
+        migrations.AlterField(
+            model_name="networkevent",
+            name="unique_hash",
+            field=models.CharField(max_length=64, null=True),
+        ),
+        migrations.RunPython(fill_keys, fill_hex_hashes),
+        migrations.RemoveField(
+            model_name="networkevent",
+            name="unique_hash",
+        ),
+        migrations.RemoveField(
+            model_name="networkevent",
+            name="base_hash",
+        ),
+        migrations.RenameField(
+            model_name="networkevent",
+            old_name="unique_key",
+            new_name="unique_hash",
+        ),
+        migrations.RenameField(
+            model_name="networkevent",
+            old_name="base_key",
+            new_name="base_hash",
+        ),
+        migrations.AlterField(
+            model_name="networkevent",
+            name="unique_hash",
+            field=models.BigIntegerField(
+                help_text="Hash of all event fields, for duplicate prevention",
+                unique=True,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="networkevent",
+            name="base_hash",
+            field=models.BigIntegerField(
+                blank=True,
+                db_index=True,
+                help_text="Base hash for update comparison",
+                null=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("base", "0016_eventnotification"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="sheetrowfingerprint",
+            name="row_key",
+            field=models.CharField(
+                help_text="Hash of the outage the row records, or its row number",
+                max_length=100,
+            ),
+        ),
+    ]
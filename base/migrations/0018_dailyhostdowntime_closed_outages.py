@@ -0,0 +1,86 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:40
+
+from collections import Counter, defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import migrations
+from django.utils import timezone
+
+
+def _host_rollups(rows):
+    """
+    Rollup rows of one host's (down_time, up_time, reason) tuples, as
+    DailyHostDowntime.compute_buckets computes them as of this migration:
+    events count on their local down day, the merged downtime of closed
+    outages is split at local midnights.
+    """
+    days = defaultdict(lambda: [0, 0, Counter()])
+    intervals = []
+    for down_time, up_time, reason in rows:
+        if not down_time:
+            continue
+        day = days[timezone.localtime(down_time).date()]
+        day[0] += 1
+        day[2][reason] += 1
+        if up_time:
+            intervals.append((down_time, up_time))
+
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    for start, end in merged:
+        cursor = start
+        while cursor < end:
+            day = timezone.localtime(cursor).date()
+            next_day = timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+            segment_end = min(end, next_day)
+            days[day][1] += (segment_end - cursor).total_seconds()
+            cursor = segment_end
+    return days
+
+
+def drop_open_downtime(apps, schema_editor):
+    """
+    Recompute the rollup of the hosts with an ongoing outage, whose rows
+    counted it as down until they were last written.
+    """
+    DailyHostDowntime = apps.get_model("base", "DailyHostDowntime")
+    NetworkEvent = apps.get_model("base", "NetworkEvent")
+    hosts = (
+        NetworkEvent.objects.filter(up_time__isnull=True)
+        .order_by()
+        .values_list("name", "type", "region")
+        .distinct()
+    )
+    for name, type, region in hosts:
+        rows = NetworkEvent.objects.filter(name=name, type=type, region=region).values_list(
+            "down_time", "up_time", "reason"
+        )
+        DailyHostDowntime.objects.filter(name=name, type=type, region=region).delete()
+        DailyHostDowntime.objects.bulk_create(
+            [
+                DailyHostDowntime(
+                    name=name, type=type, region=region, day=day,
+                    event_count=count, downtime_seconds=int(seconds),
+                    reasons=dict(reasons),
+                )
+                for day, (count, seconds, reasons) in _host_rollups(rows).items()
+            ],
+            batch_size=500,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("base", "0017_sheetrowfingerprint_outage_key"),
+    ]
+
+    operations = [
+        # Backwards, the rows stay as they are: readers of the older rollup
+        # only undercount the ongoing outages until their hosts are written
+        migrations.RunPython(drop_open_downtime, migrations.RunPython.noop),
+    ]
@@ -1,18 +1,155 @@
-import hashlib
-from datetime import timedelta
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, time, timedelta
 from datetime import date
+from itertools import islice
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
+from .cache import bump_data_version
+from .db import write_batch
+from .utils import bs_date_parts, dedup_keys, merge_intervals
+
+# Rollup ranges collected by DailyHostDowntime.deferred(), None outside it
+_deferred_ranges = ContextVar("deferred_rollup_ranges", default=None)
+
+
+class EpochSeconds(models.Func):
+    """Whole seconds since the Unix epoch of a datetime expression."""
+
+    output_field = models.BigIntegerField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        # Datetimes are stored as UTC text, which strftime reads directly
+        return self.as_sql(
+            compiler, connection,
+            template="CAST(strftime('%%%%s', %(expressions)s) AS INTEGER)",
+            **extra_context,
+        )
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection,
+            template="CAST(EXTRACT(EPOCH FROM %(expressions)s) AS BIGINT)",
+            **extra_context,
+        )
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection, template="UNIX_TIMESTAMP(%(expressions)s)", **extra_context
+        )
+
+
+def duration_seconds_expression(now=None):
+    """
+    An event's duration in seconds as a database expression:
+    Coalesce(up_time, now) - down_time, so ongoing outages keep growing.
+    Integer seconds, so it can be summed, averaged and ordered by.
+    """
+    now = models.Value(now or timezone.now(), output_field=models.DateTimeField())
+    return EpochSeconds(Coalesce("up_time", now)) - EpochSeconds("down_time")
+
+
+class NetworkEventQuerySet(models.QuerySet):
+    def with_duration(self, now=None):
+        """Annotate ``live_duration_seconds``, which NetworkEvent.duration() prefers."""
+        return self.annotate(live_duration_seconds=duration_seconds_expression(now))
+
+    def refresh_open_durations(self, now=None):
+        """
+        Bring the stored duration_seconds of ongoing outages up to ``now`` in
+        one UPDATE. Returns the number of events refreshed.
+        """
+        with write_batch():
+            return self.filter(up_time__isnull=True, down_time__isnull=False).update(
+                duration_seconds=duration_seconds_expression(now)
+            )
+
+
+class Host(models.Model):
+    """
+    One monitored switch, MPLS node or link, keyed by its name in the report.
+
+    Events point at their host by integer id, so host pages, chart APIs and
+    per-host aggregates join and group on that instead of the name string.
+    Type, region and solar flag follow the host's latest event.
+    """
+
+    name = models.CharField(max_length=100, unique=True)
+    type = models.CharField(max_length=100, blank=True)
+    region = models.CharField(max_length=100, blank=True)
+    solar = models.BooleanField(default=False, help_text="Full solar POP")
+    last_seen = models.DateTimeField(
+        null=True, blank=True, help_text="Down time of the host's latest event"
+    )
+
+    class Meta:
+        ordering = ["name"]
+
+    def __str__(self):
+        return self.name
+
+    @staticmethod
+    def solar_flag(value):
+        return str(value or "").strip().lower() in ("true", "yes", "1")
+
+    @classmethod
+    def resolve(cls, events):
+        """
+        {name: Host} for the names of ``events``, creating hosts seen for the
+        first time. A host whose latest event is in ``events`` takes its
+        type, region and solar flag from it.
+        """
+        latest = {}
+        for event in events:
+            if not event.name:
+                continue
+            seen = latest.get(event.name)
+            if seen is None or (
+                event.down_time and (seen.down_time is None or event.down_time >= seen.down_time)
+            ):
+                latest[event.name] = event
+        if not latest:
+            return {}
+
+        hosts = cls.objects.in_bulk(list(latest), field_name="name")
+        missing = [name for name in latest if name not in hosts]
+        if missing:
+            cls.objects.bulk_create(
+                [cls(name=name) for name in missing], ignore_conflicts=True
+            )
+            hosts.update(cls.objects.in_bulk(missing, field_name="name"))
+
+        changed = []
+        for name, event in latest.items():
+            host = hosts[name]
+            if host.last_seen and (not event.down_time or event.down_time < host.last_seen):
+                continue
+            values = (
+                event.type or "", event.region or "", cls.solar_flag(event.solar),
+                event.down_time,
+            )
+            if (host.type, host.region, host.solar, host.last_seen) != values:
+                host.type, host.region, host.solar, host.last_seen = values
+                changed.append(host)
+        if changed:
+            cls.objects.bulk_update(changed, ["type", "region", "solar", "last_seen"])
+        return hosts
+
 
 class NetworkEvent(models.Model):
     name = models.CharField(max_length=100)
+    host = models.ForeignKey(
+        Host, on_delete=models.PROTECT, null=True, blank=True, related_name="events"
+    )
     down_time = models.DateTimeField(null=True, blank=True, db_index=True)
     up_time = models.DateTimeField(null=True, blank=True)
     date = models.CharField(max_length=100)
-    type = models.CharField(max_length=100, db_index=True)
-    region = models.CharField(max_length=100, db_index=True)
+    type = models.CharField(max_length=100)
+    region = models.CharField(max_length=100)
     reason = models.CharField(max_length=100)
     solar = models.CharField(max_length=100)
     remarks = models.TextField(null=True, blank=True)
@@ -23,26 +160,39 @@ class NetworkEvent(models.Model):
     duration_seconds = models.IntegerField(
         null=True, blank=True, help_text="Duration in seconds"
     )
-    unique_hash = models.CharField(
-        max_length=64,
+    # 64-bit keys from utils.dedup_keys: 8 bytes per row and per index entry
+    # instead of 64 hex characters
+    unique_hash = models.BigIntegerField(
         unique=True,
-        db_index=True,
-        help_text="SHA256 hash for duplicate prevention",
+        help_text="Hash of all event fields, for duplicate prevention",
     )
-    base_hash = models.CharField(max_length=64, db_index=True, help_text="Base hash for update comparison", null=True, blank=True)
+    base_hash = models.BigIntegerField(db_index=True, help_text="Base hash for update comparison", null=True, blank=True)
+    # Bikram Sambat date of down_time (local), filled on save and bulk writes
+    bs_year = models.PositiveSmallIntegerField(null=True, blank=True, editable=False)
+    bs_month = models.PositiveSmallIntegerField(null=True, blank=True, editable=False)
+    bs_day = models.PositiveSmallIntegerField(null=True, blank=True, editable=False)
 
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = NetworkEventQuerySet.as_manager()
+
+    # Fields compared against an existing event (matched on base_hash) to
+    # decide whether an import row is an update or a plain duplicate.
+    UPDATE_FIELDS = [
+        "up_time", "date", "reason", "solar", "remarks",
+        "category", "down_count",
+    ]
+    BULK_BATCH_SIZE = 500
+
     class Meta:
         # Remove the complex unique constraint and use hash-based approach instead
         indexes = [
-            models.Index(fields=["name", "down_time"]),
+            models.Index(fields=["host", "down_time"]),
             models.Index(fields=["type", "down_time"]),
             models.Index(fields=["region", "down_time"]),
-            models.Index(fields=["down_time"]),
-            models.Index(fields=["unique_hash"]),  # Fast duplicate checking
+            models.Index(fields=["bs_year", "bs_month", "bs_day"]),
         ]
         ordering = ["-down_time"]
 
@@ -63,36 +213,52 @@ class NetworkEvent(models.Model):
         end_of_week = start_of_week + timedelta(days=6)
         return start_of_week <= self.down_time.date() <= end_of_week
 
+    # Fields hashed into unique_hash (all but down_count) and base_hash (the
+    # "core" fields that identify the same outage across imports)
+    UNIQUE_HASH_FIELDS = [
+        "name", "down_time", "up_time", "date", "type", "region",
+        "reason", "solar", "remarks", "category",
+    ]
+    BASE_HASH_FIELDS = ["name", "down_time", "type", "region"]
+
+    @classmethod
+    def unique_hashes(cls, events):
+        """unique_hash of each event of a chunk, hashed in one pass."""
+        fields = cls.UNIQUE_HASH_FIELDS
+        return dedup_keys([getattr(event, field) for field in fields] for event in events)
+
+    @classmethod
+    def base_hashes(cls, rows):
+        """base_hash of each event kwargs dict of a chunk, hashed in one pass."""
+        fields = cls.BASE_HASH_FIELDS
+        return dedup_keys([row.get(field) for field in fields] for row in rows)
+
     def generate_unique_hash(self):
-        """Generate SHA256 hash for duplicate detection including all relevant fields"""
-        # Include all fields except down_count, created_at, updated_at for duplicate detection
-        data_string = "|".join(
-            [
-                str(self.name or "").strip().lower(),
-                str(self.down_time) if self.down_time else "",
-                str(self.up_time) if self.up_time else "",
-                str(self.date or "").strip().lower(),
-                str(self.type or "").strip().lower(),
-                str(self.region or "").strip().lower(),
-                str(self.reason or "").strip().lower(),
-                str(self.solar or "").strip().lower(),
-                str(self.remarks or "").strip().lower(),
-                str(self.category or "").strip().lower(),
-            ]
-        )
-        return hashlib.sha256(data_string.encode("utf-8")).hexdigest()
+        """Hash for duplicate detection over all fields except down_count"""
+        return type(self).unique_hashes([self])[0]
 
-    def save(self, *args, **kwargs):
-        # Generate unique hash before saving
-        self.unique_hash = self.generate_unique_hash()
+    @staticmethod
+    def generate_base_hash(name, down_time, type, region):
+        """Hash of the "core" fields that identify the same outage across imports"""
+        return dedup_keys([[name, down_time, type, region]])[0]
+
+    def refresh_computed_fields(self, now=None, unique_hash=None):
+        """Fill unique_hash, duration_seconds and the BS date the way save() does.
 
-        # Calculate duration in seconds for better performance
+        Bulk writes bypass save(), so they call this on every object first,
+        passing the ``unique_hash`` they computed for the whole chunk.
+        """
+        self.unique_hash = self.generate_unique_hash() if unique_hash is None else unique_hash
+        self.bs_year, self.bs_month, self.bs_day = bs_date_parts(self.down_time)
+
+        # Stored for closed events; ongoing ones are refreshed in bulk by
+        # NetworkEventQuerySet.refresh_open_durations
         if self.down_time and self.up_time:
             duration = self.up_time - self.down_time
             self.duration_seconds = int(duration.total_seconds())
         elif self.down_time:
             # For ongoing events, calculate duration from down_time to now
-            now = timezone.now()
+            now = now or timezone.now()
             if timezone.is_aware(now) and timezone.is_naive(self.down_time):
                 now = now.replace(tzinfo=None)
             duration = now - self.down_time
@@ -100,12 +266,38 @@ class NetworkEvent(models.Model):
         else:
             self.duration_seconds = 0
 
-        super().save(*args, **kwargs)
+    def save(self, *args, **kwargs):
+        # Generate unique hash and duration before saving
+        self.refresh_computed_fields()
+        spans = []
+        if self.pk:
+            # The old version's days need their rollups recomputed too
+            spans = DailyHostDowntime.spans_for(type(self).objects.filter(pk=self.pk))
+        # The previous up_time is the span's last item
+        kind = EventNotification.kind_of(
+            not spans, bool(spans) and spans[0][4] is None, self
+        )
+        with transaction.atomic():
+            self.host = Host.resolve([self]).get(self.name)
+            super().save(*args, **kwargs)
+            type(self).events_changed(spans + [DailyHostDowntime.span_of(self)])
+            EventNotification.record([(kind, self)])
+
+    def delete(self, *args, **kwargs):
+        span = DailyHostDowntime.span_of(self)
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            type(self).events_changed([span])
+        return result
 
     
     def duration(self):
-        """Return duration as timedelta object"""
-        if self.duration_seconds is not None:
+        """Return duration as timedelta object; ongoing outages run up to now."""
+        live_seconds = getattr(self, "live_duration_seconds", None)
+        if live_seconds is not None:
+            return timedelta(seconds=live_seconds)
+        # The stored value of an ongoing outage is as of its last refresh
+        if self.duration_seconds is not None and self.up_time:
             return timedelta(seconds=self.duration_seconds)
 
         if self.down_time and self.up_time:
@@ -130,6 +322,18 @@ class NetworkEvent(models.Model):
     def __str__(self):
         return f"{self.name} | {self.down_time} - {self.up_time}"
 
+    @classmethod
+    def events_changed(cls, spans):
+        """
+        Keep derived data in step with a write to the events in ``spans``
+        (see DailyHostDowntime.span_of). Call inside the write's transaction:
+        rollups are refreshed right away (or at the end of a
+        DailyHostDowntime.deferred() block), cached chart payloads are
+        invalidated once the transaction commits.
+        """
+        DailyHostDowntime.refresh_spans(spans)
+        transaction.on_commit(bump_data_version)
+
     @classmethod
     def check_duplicate_exists(cls, **kwargs):
         """Check if a duplicate exists based on the hash"""
@@ -139,32 +343,21 @@ class NetworkEvent(models.Model):
     @classmethod
     def create_or_update_event(cls, **kwargs):
         """
-    Create or update a NetworkEvent based on base_hash.
-    Returns: (instance, created, updated)
-    """
-    # Normalize & generate base_hash for matching "core" event
-        temp = cls(**kwargs)
-        base_data_string = "|".join([
-        (temp.name or "").strip().lower(),
-        str(temp.down_time) if temp.down_time else "",
-        (temp.type or "").strip().lower(),
-        (temp.region or "").strip().lower(),
-    ])
-        base_hash = hashlib.sha256(base_data_string.encode('utf-8')).hexdigest()
-
-    # Add base_hash to kwargs for saving later
-        kwargs['base_hash'] = base_hash
+        Create or update a NetworkEvent based on base_hash.
+        Returns: (instance, created, updated)
+        """
+        # Normalize & generate base_hash for matching "core" event
+        kwargs["base_hash"] = cls.generate_base_hash(
+            kwargs.get("name"), kwargs.get("down_time"),
+            kwargs.get("type"), kwargs.get("region"),
+        )
 
         try:
-            existing = cls.objects.get(base_hash=base_hash)
+            existing = cls.objects.get(base_hash=kwargs["base_hash"])
             updated = False
 
-        # Check fields that matter for update
-            fields_to_check = [
-            'up_time', 'date', 'reason', 'solar', 'remarks',
-            'category', 'down_count',
-        ]
-            for field in fields_to_check:
+            # Check fields that matter for update
+            for field in cls.UPDATE_FIELDS:
                 new_val = kwargs.get(field)
                 old_val = getattr(existing, field)
                 if new_val != old_val:
@@ -178,11 +371,362 @@ class NetworkEvent(models.Model):
                 return existing, False, False  # duplicate, no changes
 
         except cls.DoesNotExist:
-        # No existing event, create new
+            # No existing event, create new
             new_event = cls(**kwargs)
             new_event.save()
             return new_event, True, False  # created
 
+    @classmethod
+    def upsert_chunk(cls, rows):
+        """
+        Batched create_or_update_event for one chunk of event kwargs.
+
+        Existing events for the whole chunk are fetched with a single
+        ``base_hash__in`` query, fields are diffed in memory and the result
+        is written with one bulk_create and one bulk_update. Rows repeating a
+        base_hash inside the chunk are applied in order, exactly as
+        sequential create_or_update_event calls would.
+
+        Returns: (events, created, updated, duplicates) where ``events`` is
+        aligned with ``rows``.
+        """
+        prepared = [dict(data) for data in rows]
+        for data, base_hash in zip(prepared, cls.base_hashes(prepared)):
+            data["base_hash"] = base_hash
+
+        # The prefetch is part of the write batch, so no other writer can
+        # insert the same base_hash between the diff and the write.
+        with write_batch():
+            existing = {}
+            for event in cls.objects.filter(
+                base_hash__in={data["base_hash"] for data in prepared}
+            ):
+                existing.setdefault(event.base_hash, event)
+
+            events = []
+            to_create = []
+            to_update = {}
+            was_open = {}  # id(event) -> whether it was ongoing before this chunk
+            spans = []  # Rollup ranges touched by this chunk
+            created_count = updated_count = duplicate_count = 0
+
+            for data in prepared:
+                event = existing.get(data["base_hash"])
+                if event is None:
+                    event = cls(**data)
+                    existing[data["base_hash"]] = event
+                    to_create.append(event)
+                    created_count += 1
+                else:
+                    changed = False
+                    previous_span = DailyHostDowntime.span_of(event)
+                    was_open.setdefault(id(event), event.up_time is None)
+                    for field in cls.UPDATE_FIELDS:
+                        new_val = data.get(field)
+                        if new_val != getattr(event, field):
+                            setattr(event, field, new_val)
+                            changed = True
+                    if changed:
+                        updated_count += 1
+                        spans.append(previous_span)
+                        if event.pk is not None:
+                            to_update[event.pk] = event
+                    else:
+                        duplicate_count += 1
+                events.append(event)
+
+            now = timezone.now()
+            written = to_create + list(to_update.values())
+            hosts = Host.resolve(written)
+            for event, unique_hash in zip(written, cls.unique_hashes(written)):
+                event.refresh_computed_fields(now, unique_hash)
+                event.host = hosts.get(event.name)
+            for event in to_update.values():
+                event.updated_at = now
+
+            if to_create:
+                cls.objects.bulk_create(to_create, batch_size=cls.BULK_BATCH_SIZE)
+            if to_update:
+                cls.objects.bulk_update(
+                    list(to_update.values()),
+                    cls.UPDATE_FIELDS + ["unique_hash", "duration_seconds", "host", "updated_at"],
+                    batch_size=cls.BULK_BATCH_SIZE,
+                )
+            spans.extend(DailyHostDowntime.span_of(event) for event in to_create)
+            spans.extend(DailyHostDowntime.span_of(event) for event in to_update.values())
+            cls.events_changed(spans)
+            EventNotification.record(
+                [("created", event) for event in to_create]
+                + [
+                    (EventNotification.kind_of(False, was_open[id(event)], event), event)
+                    for event in to_update.values()
+                ]
+            )
+
+        return events, created_count, updated_count, duplicate_count
+
+    @classmethod
+    def bulk_create_or_update_events(cls, rows, batch_size=None, on_chunk=None):
+        """
+        Upsert an iterable of event kwargs in chunks of ``batch_size``.
+        ``rows`` is consumed lazily, so it may be a generator over a file.
+        Each chunk commits on its own; the rollups of all of them are
+        refreshed together at the end (see DailyHostDowntime.deferred).
+        ``on_chunk(created, updated, duplicates)`` is called with the running
+        totals after every committed chunk (used for progress reporting).
+        Returns: (created, updated, duplicates)
+        """
+        batch_size = batch_size or cls.BULK_BATCH_SIZE
+        rows = iter(rows)
+        created_count = updated_count = duplicate_count = 0
+        # Rollups are refreshed once at the end, not after every chunk
+        with DailyHostDowntime.deferred():
+            while True:
+                chunk = list(islice(rows, batch_size))
+                if not chunk:
+                    break
+                _, created, updated, duplicates = cls.upsert_chunk(chunk)
+                created_count += created
+                updated_count += updated
+                duplicate_count += duplicates
+                if on_chunk:
+                    on_chunk(created_count, updated_count, duplicate_count)
+        return created_count, updated_count, duplicate_count
+
+class DailyHostDowntime(models.Model):
+    """
+    Per-day rollup of NetworkEvent for one (host, type, region).
+
+    An event counts (and adds its reason) on the local day it went down; its
+    downtime, merged with the host's overlapping outages, is split over
+    every day it covers. Only closed outages add downtime: an ongoing one
+    keeps growing after the rollup is written, so readers sweep the hosts
+    that have one from the raw events instead. Rows are recomputed from the
+    raw events of the touched hosts and days whenever events are written,
+    and ``manage.py rebuild_rollups`` recomputes the whole table.
+    """
+
+    name = models.CharField(max_length=100)
+    type = models.CharField(max_length=100)
+    region = models.CharField(max_length=100)
+    day = models.DateField()
+    event_count = models.IntegerField(default=0)
+    downtime_seconds = models.IntegerField(default=0)
+    reasons = models.JSONField(default=dict, help_text="Reason -> event count")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["name", "type", "region", "day"], name="unique_daily_host_downtime"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["day"]),
+            models.Index(fields=["name", "day"]),
+            models.Index(fields=["type", "day"]),
+        ]
+        ordering = ["day"]
+
+    def __str__(self):
+        return f"{self.name} | {self.day}: {self.event_count} events"
+
+    @staticmethod
+    def local_day(value):
+        return timezone.localtime(value).date()
+
+    @staticmethod
+    def day_start(day):
+        return timezone.make_aware(datetime.combine(day, time.min))
+
+    @staticmethod
+    def span_of(event):
+        """(name, type, region, down_time, up_time) of an event, the rollup range it affects"""
+        return (event.name, event.type, event.region, event.down_time, event.up_time)
+
+    @classmethod
+    def spans_for(cls, queryset):
+        return list(
+            queryset.order_by().values_list("name", "type", "region", "down_time", "up_time")
+        )
+
+    @classmethod
+    def compute_buckets(cls, rows):
+        """
+        Aggregate (name, type, region, down_time, up_time, reason) rows into
+        {(name, type, region, day): [event_count, downtime_seconds, Counter]}.
+        Overlapping closed outages of the same host are merged before they
+        are split per day, so a day's downtime never counts a second twice;
+        ongoing outages are counted but add no downtime.
+        """
+        buckets = defaultdict(lambda: [0, 0, Counter()])
+        outages = defaultdict(list)
+        for name, type, region, down_time, up_time, reason in rows:
+            if not down_time:
+                continue
+            host = (name, type, region)
+            bucket = buckets[host + (cls.local_day(down_time),)]
+            bucket[0] += 1
+            bucket[2][reason] += 1
+            if up_time:
+                outages[host].append((down_time, up_time))
+
+        for host, intervals in outages.items():
+            for start, end in merge_intervals(intervals):
+                # Split the outage at local midnights
+                cursor = start
+                while cursor < end:
+                    day = cls.local_day(cursor)
+                    segment_end = min(end, cls.day_start(day + timedelta(days=1)))
+                    buckets[host + (day,)][1] += (segment_end - cursor).total_seconds()
+                    cursor = segment_end
+        return buckets
+
+    @classmethod
+    def _rows_from_buckets(cls, buckets):
+        return [
+            cls(
+                name=name, type=type, region=region, day=day,
+                event_count=count, downtime_seconds=int(seconds), reasons=dict(reasons),
+            )
+            for (name, type, region, day), (count, seconds, reasons) in buckets.items()
+        ]
+
+    @classmethod
+    def _merge_ranges(cls, ranges, spans):
+        """
+        Add ``spans`` to {(name, type, region): (first day, last day)}. An
+        ongoing outage only affects the day it went down on.
+        """
+        for name, type, region, down_time, up_time in spans:
+            if not down_time:
+                continue
+            first = cls.local_day(down_time)
+            last = max(cls.local_day(up_time), first) if up_time else first
+            host = (name, type, region)
+            if host in ranges:
+                old_first, old_last = ranges[host]
+                first, last = min(first, old_first), max(last, old_last)
+            ranges[host] = (first, last)
+        return ranges
+
+    @classmethod
+    def refresh_spans(cls, spans):
+        """
+        Recompute the rollup rows of every (host, day) covered by ``spans``;
+        inside a deferred() block, only note them down.
+        """
+        deferred = _deferred_ranges.get()
+        if deferred is not None:
+            cls._merge_ranges(deferred, spans)
+        else:
+            cls.refresh_ranges(cls._merge_ranges({}, spans))
+
+    @classmethod
+    def refresh_ranges(cls, ranges):
+        """
+        Recompute the rollup rows of {(name, type, region): (first, last)}.
+
+        Each host's events are read over that host's own days (one indexed
+        query per host), so a write touching hosts far apart in time doesn't
+        read everything in between.
+        """
+        if not ranges:
+            return
+        host_days = {}  # name -> (first, last) over its types and regions
+        for (name, _, _), (first, last) in ranges.items():
+            if name in host_days:
+                first = min(first, host_days[name][0])
+                last = max(last, host_days[name][1])
+            host_days[name] = (first, last)
+
+        def in_range(name, type, region, day):
+            first, last = ranges.get((name, type, region), (None, None))
+            return first is not None and first <= day <= last
+
+        host_ids = dict(Host.objects.filter(name__in=host_days).values_list("name", "pk"))
+        buckets = {}
+        stale_pks = []
+        for name, (first, last) in host_days.items():
+            if name in host_ids:
+                rows = (
+                    NetworkEvent.objects.filter(
+                        host_id=host_ids[name],
+                        down_time__lt=cls.day_start(last + timedelta(days=1)),
+                    )
+                    .filter(
+                        models.Q(up_time__isnull=True)
+                        | models.Q(up_time__gte=cls.day_start(first))
+                    )
+                    .order_by()
+                    .values_list("name", "type", "region", "down_time", "up_time", "reason")
+                )
+                buckets.update(
+                    (key, value)
+                    for key, value in cls.compute_buckets(rows).items()
+                    if in_range(*key)
+                )
+            stale_pks.extend(
+                pk
+                for pk, *key in cls.objects.filter(name=name, day__range=(first, last))
+                .values_list("pk", "name", "type", "region", "day")
+                if in_range(*key)
+            )
+
+        with transaction.atomic():
+            for start in range(0, len(stale_pks), 500):
+                cls.objects.filter(pk__in=stale_pks[start:start + 500]).delete()
+            cls.objects.bulk_create(cls._rows_from_buckets(buckets), batch_size=500)
+
+    @classmethod
+    @contextmanager
+    def deferred(cls):
+        """
+        Refresh the rollups of the event writes inside the block once, when
+        it ends, over the hosts and days they touched together; for imports
+        and syncs, which would otherwise re-read the same hosts' events after
+        every chunk. Rollups lag the chunks committed inside the block until
+        then. The refresh runs even when the block fails, since earlier
+        chunks are committed already. Nested blocks join the outer one.
+        """
+        if _deferred_ranges.get() is not None:
+            yield
+            return
+        ranges = {}
+        token = _deferred_ranges.set(ranges)
+        try:
+            yield
+        finally:
+            _deferred_ranges.reset(token)
+            if ranges:
+                with write_batch():
+                    cls.refresh_ranges(ranges)
+                    transaction.on_commit(bump_data_version)
+
+    @classmethod
+    def rebuild(cls):
+        """Recompute the whole rollup table from NetworkEvent, one host at a time."""
+        rows = (
+            NetworkEvent.objects.order_by("name", "type", "region")
+            .values_list("name", "type", "region", "down_time", "up_time", "reason")
+            .iterator(chunk_size=2000)
+        )
+        created = 0
+        with transaction.atomic():
+            cls.objects.all().delete()
+            host, host_rows = None, []
+            for row in rows:
+                if row[:3] != host and host_rows:
+                    objs = cls._rows_from_buckets(cls.compute_buckets(host_rows))
+                    created += len(cls.objects.bulk_create(objs, batch_size=500))
+                    host_rows = []
+                host = row[:3]
+                host_rows.append(row)
+            if host_rows:
+                objs = cls._rows_from_buckets(cls.compute_buckets(host_rows))
+                created += len(cls.objects.bulk_create(objs, batch_size=500))
+        return created
+
+
 class NetworkEventImport(models.Model):
     csv_file = models.FileField(upload_to="uploads/events/")
     uploaded_at = models.DateTimeField(auto_now_add=True)
@@ -208,11 +752,134 @@ class NetworkEventImport(models.Model):
         verbose_name="Skipped Rows Log"
     )
 
+    # Live progress, written by the import worker after every chunk
+    total_rows = models.IntegerField(default=0, help_text="Estimated data rows in the file")
+    rows_per_second = models.FloatField(default=0)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
 
     def __str__(self):
         return f"{self.csv_file.name} - {self.processing_status}"
 
+    @property
+    def progress_percent(self):
+        if self.processing_status == "completed":
+            return 100
+        if not self.total_rows:
+            return 0
+        return min(100, round(self.processed_rows * 100 / self.total_rows))
+
+    @property
+    def eta_seconds(self):
+        """Seconds left for a running import, None when it cannot be estimated"""
+        if self.processing_status != "processing" or not self.rows_per_second:
+            return None
+        remaining = max(self.total_rows - self.processed_rows, 0)
+        return int(remaining / self.rows_per_second)
+
+    @classmethod
+    def claim_next(cls):
+        """
+        Atomically move the oldest pending import to "processing" and return it.
+        The conditional UPDATE lets several workers poll the same table
+        without picking up the same file twice. Returns None if the queue is empty.
+        """
+        while True:
+            pk = (
+                cls.objects.filter(processing_status="pending")
+                .order_by("uploaded_at")
+                .values_list("pk", flat=True)
+                .first()
+            )
+            if pk is None:
+                return None
+            claimed = cls.objects.filter(pk=pk, processing_status="pending").update(
+                processing_status="processing", started_at=timezone.now()
+            )
+            if claimed:
+                return cls.objects.get(pk=pk)
+
     class Meta:
         verbose_name = "Network Event CSV Import"
         verbose_name_plural = "Network Event CSV Imports"
         ordering = ["-uploaded_at"]
+
+
+class SheetRowFingerprint(models.Model):
+    """
+    Hash of a Google Sheet row as it was last synced.
+
+    The Sheet sync compares every fetched row with this table and only
+    upserts rows that are new or changed. Deleting the linked event deletes
+    the fingerprint too, so the row is picked up again on the next sync.
+    """
+
+    worksheet = models.CharField(max_length=100)
+    row_key = models.CharField(
+        max_length=100, help_text="Hash of the outage the row records, or its row number"
+    )
+    fingerprint = models.CharField(max_length=64, help_text="SHA256 of the synced cell values")
+    event = models.ForeignKey(
+        NetworkEvent,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="sheet_rows",
+    )
+    synced_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["worksheet", "row_key"], name="unique_sheet_row"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.worksheet} {self.row_key}"
+
+
+class EventNotification(models.Model):
+    """
+    Outbox of outage changes for the dashboard's live stream (base.live).
+
+    The import and the Sheet sync add a row per created, updated or resolved
+    event in the transaction that writes it, so the web processes can tail
+    this table by id whichever process did the write. Rows are kept for
+    RETENTION, long enough for a reconnecting wallboard to catch up.
+    """
+
+    KINDS = [("created", "Created"), ("updated", "Updated"), ("resolved", "Resolved")]
+    RETENTION = timedelta(hours=1)
+
+    kind = models.CharField(max_length=10, choices=KINDS)
+    event = models.ForeignKey(NetworkEvent, on_delete=models.CASCADE, related_name="+")
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.kind} {self.event_id}"
+
+    @staticmethod
+    def kind_of(created, was_open, event):
+        if created:
+            return "created"
+        return "resolved" if was_open and event.up_time is not None else "updated"
+
+    @classmethod
+    def record(cls, changes):
+        """
+        Add a notification per (kind, event) and drop the expired ones.
+        Call inside the write's transaction.
+        """
+        if not changes:
+            return
+        cls.objects.bulk_create(
+            [cls(kind=kind, event_id=event.pk) for kind, event in changes],
+            batch_size=NetworkEvent.BULK_BATCH_SIZE,
+        )
+        cls.objects.filter(created_at__lt=timezone.now() - cls.RETENTION).delete()
+
+    @classmethod
+    def latest_id(cls):
+        return cls.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
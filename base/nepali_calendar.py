@@ -0,0 +1,136 @@
+# base/nepali_calendar.py
+"""
+Bikram Sambat <-> Gregorian date dimension.
+
+The month boundaries are read from nepali_datetime once, when the module is
+imported, and kept as flat arrays indexed by AD day and by BS month. Every
+lookup afterwards is an index into those arrays, so request handlers and
+rollups can convert dates without calling into the library.
+
+Covers BS 1975-2099 (AD 1918-2043), everything nepali_datetime knows except
+its last year.
+"""
+
+from array import array
+from datetime import date, timedelta
+from typing import NamedTuple
+
+import nepali_datetime
+
+MIN_BS_YEAR = nepali_datetime.MINYEAR
+MAX_BS_YEAR = nepali_datetime.MAXYEAR - 1
+
+# Nepal's fiscal year starts on 1st Shrawan
+FISCAL_YEAR_START_MONTH = 4
+
+# Month names as the daily report spells them, in calendar order
+MONTH_NAMES = [
+    "Baisakh", "Jestha", "Aasar", "Shrawan", "Bhadra", "Ashoj",
+    "Kartik", "Mangsir", "Poush", "Magh", "Falgun", "Chaitra",
+]
+
+
+class BSDate(NamedTuple):
+    year: int
+    month: int
+    day: int
+
+
+class FiscalPeriod(NamedTuple):
+    year: int  # BS year the fiscal year starts in: 2082 for FY 2082/83
+    month: int  # 1 = Shrawan ... 12 = Ashadh
+    quarter: int  # 1 = Shrawan-Ashoj ... 4 = Baisakh-Ashadh
+
+    @property
+    def label(self):
+        return f"{self.year}/{(self.year + 1) % 100:02d}"
+
+
+def _build():
+    # AD ordinal of the 1st of every BS month, plus one past the last month
+    month_starts = array("l")
+    for year in range(MIN_BS_YEAR, MAX_BS_YEAR + 2):
+        for month in range(1, 13):
+            month_starts.append(
+                nepali_datetime.date(year, month, 1).to_datetime_date().toordinal()
+            )
+            if year > MAX_BS_YEAR:
+                break
+
+    # BS month index (0 = Baisakh of MIN_BS_YEAR) of every AD day
+    day_months = array("H")
+    for index in range(len(month_starts) - 1):
+        day_months.extend([index] * (month_starts[index + 1] - month_starts[index]))
+    return month_starts, day_months
+
+
+_MONTH_STARTS, _DAY_MONTHS = _build()
+_FIRST_ORDINAL = _MONTH_STARTS[0]
+_LAST_ORDINAL = _MONTH_STARTS[-1] - 1
+
+MIN_AD_DATE = date.fromordinal(_FIRST_ORDINAL)
+MAX_AD_DATE = date.fromordinal(_LAST_ORDINAL)
+
+
+def _month_index(year, month):
+    if not MIN_BS_YEAR <= year <= MAX_BS_YEAR:
+        raise ValueError(f"BS year {year} is outside {MIN_BS_YEAR}-{MAX_BS_YEAR}.")
+    if not 1 <= month <= 12:
+        raise ValueError(f"BS month {month} is outside 1-12.")
+    return (year - MIN_BS_YEAR) * 12 + month - 1
+
+
+def days_in_month(year, month):
+    index = _month_index(year, month)
+    return _MONTH_STARTS[index + 1] - _MONTH_STARTS[index]
+
+
+def month_days(year):
+    """{month: number of days} for the twelve months of a BS year."""
+    return {month: days_in_month(year, month) for month in range(1, 13)}
+
+
+def to_ad(year, month, day):
+    """Gregorian date of a BS date."""
+    if not 1 <= day <= days_in_month(year, month):
+        raise ValueError(f"{year}-{month:02d} has no day {day}.")
+    return date.fromordinal(_MONTH_STARTS[_month_index(year, month)] + day - 1)
+
+
+def to_bs(ad_date):
+    """BSDate of a Gregorian date."""
+    ordinal = ad_date.toordinal()
+    if not _FIRST_ORDINAL <= ordinal <= _LAST_ORDINAL:
+        raise ValueError(f"{ad_date} is outside {MIN_AD_DATE} - {MAX_AD_DATE}.")
+    index = _DAY_MONTHS[ordinal - _FIRST_ORDINAL]
+    year, month = divmod(index, 12)
+    return BSDate(MIN_BS_YEAR + year, month + 1, ordinal - _MONTH_STARTS[index] + 1)
+
+
+def month_range(year, month):
+    """(first, last) Gregorian dates of a BS month."""
+    index = _month_index(year, month)
+    return (
+        date.fromordinal(_MONTH_STARTS[index]),
+        date.fromordinal(_MONTH_STARTS[index + 1] - 1),
+    )
+
+
+def year_start(year):
+    """Gregorian date of 1st Baisakh of a BS year."""
+    return to_ad(year, 1, 1)
+
+
+def fiscal_period(bs_date):
+    """FiscalPeriod of a BSDate (or any (year, month, day) tuple)."""
+    year, month = bs_date[0], bs_date[1]
+    fiscal_year = year if month >= FISCAL_YEAR_START_MONTH else year - 1
+    fiscal_month = (month - FISCAL_YEAR_START_MONTH) % 12 + 1
+    return FiscalPeriod(fiscal_year, fiscal_month, (fiscal_month - 1) // 3 + 1)
+
+
+def fiscal_year_range(fiscal_year):
+    """(first, last) Gregorian dates of the fiscal year starting in a BS year."""
+    start = to_ad(fiscal_year, FISCAL_YEAR_START_MONTH, 1)
+    end = to_ad(fiscal_year + 1, FISCAL_YEAR_START_MONTH, 1) - timedelta(days=1)
+    return start, end
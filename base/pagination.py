@@ -0,0 +1,75 @@
+# base/pagination.py
+
+import base64
+import json
+from bisect import bisect_left, bisect_right
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(key):
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (ValueError, UnicodeError) as e:
+        raise InvalidCursor("Malformed cursor.") from e
+    if not isinstance(key, list):
+        raise InvalidCursor("Malformed cursor.")
+    return tuple(key)
+
+
+def keyset_page(rows, sort_key, cursor=None, limit=25, descending=True):
+    """
+    One page of ``rows`` ordered by ``sort_key(row)``, which must return a
+    unique, JSON-serializable tuple (end it with the host name).
+
+    The cursor is the key of the last row sent, so a page starts right after
+    it even if rows were added or removed in between.
+
+    Returns: (page_rows, next_cursor) where next_cursor is None on the last page.
+    """
+    keyed = sorted(((sort_key(row), row) for row in rows), key=lambda item: item[0])
+    keys = [key for key, _ in keyed]
+
+    if descending:
+        end = len(keyed) if cursor is None else bisect_left(keys, _comparable(cursor, keys))
+        start = max(end - limit, 0)
+        page = keyed[start:end][::-1]
+        has_more = start > 0
+    else:
+        start = 0 if cursor is None else bisect_right(keys, _comparable(cursor, keys))
+        end = start + limit
+        page = keyed[start:end]
+        has_more = end < len(keyed)
+
+    next_cursor = encode_cursor(page[-1][0]) if page and has_more else None
+    return [row for _, row in page], next_cursor
+
+
+def _comparable(cursor, keys):
+    """
+    Check a decoded cursor can be ordered against the row keys: as long as
+    they are, and with a number or a string wherever the keys have one.
+    """
+    if keys:
+        if len(cursor) != len(keys[0]) or any(
+            _kind(part) is None or _kind(part) != _kind(key_part)
+            for part, key_part in zip(cursor, keys[0])
+        ):
+            raise InvalidCursor("Cursor does not match the sort order.")
+    return cursor
+
+
+def _kind(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return "number"
+    if isinstance(value, str):
+        return "text"
+    return None
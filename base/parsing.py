@@ -0,0 +1,240 @@
+# base/parsing.py
+"""
+Parsing and validation of the NOC report's CSV exports.
+
+Nothing here touches the database or the models, so the functions can run
+in worker processes of a process pool (see
+services.process_network_event_imports) as well as in the import worker
+itself.
+"""
+
+import codecs
+import csv
+import os
+import pickle
+import tempfile
+from datetime import datetime
+from io import TextIOWrapper
+
+from django.utils.timezone import make_aware
+
+SHEET_DATETIME_FORMAT = "%m/%d/%Y %H:%M:%S"
+
+# Columns every uploaded export must have
+CRITICAL_HEADERS = ["MPLS/Switch", "Down Time"]
+
+# Bytes of an upload read to check its encoding and header row
+HEADER_SNIFF_BYTES = 64 * 1024
+
+SKIPPED_ROWS_HEADER = ["Row Number", "Name", "Type", "Date", "Reason", "Problematic Value"]
+
+# A skipped-rows log is kept in memory up to this size, then in a temp file
+SKIPPED_LOG_SPOOL_BYTES = 1024 * 1024
+
+# Good rows per pickled chunk of a parsed file (see parse_event_csv)
+PARSED_CHUNK_ROWS = 2000
+
+
+def parse_datetime(value):
+    """Parse the MM/DD/YYYY HH:MM:SS timestamps used by the NOC sheets."""
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        dt = datetime.strptime(value.strip(), SHEET_DATETIME_FORMAT)
+        return make_aware(dt)  # Converts naive datetime to timezone-aware
+    except (ValueError, TypeError):
+        return None
+
+
+class SkippedRowsLog:
+    """
+    An import's skipped-rows log, written as CSV row by row into a temporary
+    file (in memory while small), so a file full of bad rows doesn't collect
+    them in a list. Use it as a context manager; file() is for the end.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self._binary = tempfile.SpooledTemporaryFile(max_size=SKIPPED_LOG_SPOOL_BYTES)
+        self._text = TextIOWrapper(self._binary, encoding="utf-8", newline="")
+        self._writer = csv.writer(self._text)
+        self._writer.writerow(SKIPPED_ROWS_HEADER)
+
+    def __len__(self):
+        return self.count
+
+    def append(self, row):
+        self._writer.writerow(row)
+        self.count += 1
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def file(self):
+        """The whole log as a rewound binary file. Append nothing after this."""
+        self._text.flush()
+        self._binary.seek(0)
+        return self._binary
+
+    def close(self):
+        self._text.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class EventCSVParser:
+    """
+    Validates the rows of a "Total" worksheet export and turns the good ones
+    into NetworkEvent kwargs.
+
+    ``row_count`` counts every data row read. ``skipped_rows`` collects the
+    rejected ones (see SKIPPED_ROWS_HEADER): a plain list, or the
+    SkippedRowsLog passed in, which writes them out as they come.
+    """
+
+    SKIPPED_ROWS_HEADER = SKIPPED_ROWS_HEADER
+
+    def __init__(self, skipped_rows=None):
+        self.row_count = 0
+        self.skipped_rows = [] if skipped_rows is None else skipped_rows
+
+    def skip(self, reason, row_number, row, problem_value=""):
+        """A helper to capture skipped row details consistently."""
+        self.skipped_rows.append([
+            row_number,
+            row.get("MPLS/Switch", "N/A").strip(),
+            row.get("Type", "N/A").strip(),
+            row.get("Date", "N/A").strip(),
+            reason,
+            problem_value,
+        ])
+
+    def rows(self, reader):
+        """Validate rows of a csv.DictReader one by one and yield the event data of the good ones."""
+        for row_number, row in enumerate(reader, 2):  # Start at 2 to account for header
+            self.row_count += 1
+            name = row.get("MPLS/Switch", "").strip()
+            if not name:
+                continue
+            down_time_str = row.get("Down Time", "")
+            down_time = parse_datetime(down_time_str)
+
+            if not down_time:
+                self.skip("Invalid Down Time", row_number, row, down_time_str)
+                continue  # Skip processing this row
+            up_time_str = row.get("Up Time", "").strip()
+            up_time = None  # Assume no valid up_time yet
+
+            # Only try to parse if there's actually text in the cell
+            if up_time_str:
+                up_time = parse_datetime(up_time_str)
+
+                # Check for MALFORMED Up Time
+                if not up_time:
+                    self.skip("Malformed Up Time", row_number, row, up_time_str)
+                    continue
+
+            # Check for ILLOGICAL Up Time (only if up_time is a valid date)
+            if up_time and up_time < down_time:
+                self.skip(
+                    "Illogical Up Time (before Down Time)",
+                    row_number,
+                    row,
+                    f"Up: {up_time_str}, Down: {down_time_str}",
+                )
+                continue
+
+            yield {
+                "name": name,
+                "down_time": down_time,
+                "up_time": up_time,
+                "date": row.get("Date", "").strip(),
+                "type": row.get("Type", "").strip(),
+                "region": row.get("Region", "").strip(),
+                "reason": row.get("Reason/Issue", "").strip(),
+                "solar": row.get("Full SOLAR POP", "").strip(),
+                "remarks": row.get("Remarks(from mail if any)", "").strip(),
+                "category": row.get("Category", "").strip(),
+                "down_count": (
+                    int(row.get("down_count", 0))
+                    if row.get("down_count", "").isdigit()
+                    else 0
+                ),
+            }
+
+
+def reader_for(binary_file):
+    """csv.DictReader over a binary file of the UTF-8 export (a BOM is dropped)."""
+    return csv.DictReader(TextIOWrapper(binary_file, encoding="utf-8-sig", newline=""))
+
+
+def sniff_headers(binary_file):
+    """
+    The header row of an upload, from its first HEADER_SNIFF_BYTES only, so
+    validating a large upload doesn't read all of it. The file is rewound.
+
+    Raises UnicodeDecodeError when that chunk isn't UTF-8 and ValueError when
+    it holds no header line.
+    """
+    binary_file.seek(0)
+    chunk = binary_file.read(HEADER_SNIFF_BYTES)
+    binary_file.seek(0)
+    # Incremental decoder: a character cut off at the end of the chunk is fine
+    text = codecs.getincrementaldecoder("utf-8-sig")().decode(chunk)
+    header_line, newline, _ = text.partition("\n")
+    if not header_line.strip():
+        raise ValueError("CSV file appears to be empty or has no headers")
+    if not newline and len(chunk) == HEADER_SNIFF_BYTES:
+        raise ValueError(
+            f"No line break in the first {HEADER_SNIFF_BYTES // 1024} KB; is this a CSV file?"
+        )
+    return [h.strip() for h in next(csv.reader([header_line]), [])]
+
+
+def parse_event_csv(path):
+    """
+    Parse a whole export file into a temporary file of pickled chunks:
+    (parsed file path, row_count). Read it back with read_parsed_events and
+    delete it afterwards.
+
+    The process-pool entry point of the parallel import, so it takes a path
+    and returns plain, picklable data. The rows are handed over on disk a
+    chunk at a time, so neither the worker nor the importing process holds
+    a whole file of them.
+    """
+    parser = EventCSVParser()
+    with tempfile.NamedTemporaryFile(suffix=".parsed", delete=False) as parsed:
+        try:
+            with open(path, "rb") as binary_file:
+                chunk = []
+                for row in parser.rows(reader_for(binary_file)):
+                    chunk.append(row)
+                    if len(chunk) == PARSED_CHUNK_ROWS:
+                        pickle.dump((chunk, parser.skipped_rows), parsed)
+                        chunk, parser.skipped_rows = [], []
+                pickle.dump((chunk, parser.skipped_rows), parsed)
+        except BaseException:
+            parsed.close()
+            os.remove(parsed.name)
+            raise
+    return parsed.name, parser.row_count
+
+
+def read_parsed_events(path, skipped_rows):
+    """
+    Yield the rows parse_event_csv wrote to ``path`` a chunk at a time,
+    appending the rows it skipped to ``skipped_rows`` along the way.
+    """
+    with open(path, "rb") as parsed:
+        while True:
+            try:
+                rows, skipped = pickle.load(parsed)
+            except EOFError:
+                return
+            skipped_rows.extend(skipped)
+            yield from rows
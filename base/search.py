@@ -0,0 +1,140 @@
+# base/search.py
+"""
+Full-text search over NetworkEvent, backed by an SQLite FTS5 index.
+
+The index is an external-content FTS5 table over the event table, so it
+stores only the tokens, not another copy of the text. Triggers on the event
+table keep it current for every write path: save(), bulk_create,
+bulk_update, queryset updates and deletes.
+
+Searches match whole tokens and token prefixes: "power" finds "Power Issue",
+"jes" finds "24th Jestha" and "mhetauda sw" finds "mhetauda-sw8". Every
+word has to match, in any of the searched columns. On other databases, or
+when SQLite lacks FTS5, search falls back to icontains lookups.
+"""
+
+import re
+
+from django.db import OperationalError, connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = "base_networkevent_fts"
+CONTENT_TABLE = "base_networkevent"
+FTS_COLUMNS = ("name", "reason", "date", "region", "remarks")
+
+_TOKEN_RE = re.compile(r"\w+")
+
+_TRIGGERS = {
+    f"{FTS_TABLE}_ai": (
+        f"AFTER INSERT ON {CONTENT_TABLE} BEGIN "
+        f"INSERT INTO {FTS_TABLE}(rowid, {', '.join(FTS_COLUMNS)}) "
+        f"VALUES (new.id, {', '.join('new.' + c for c in FTS_COLUMNS)}); END"
+    ),
+    f"{FTS_TABLE}_ad": (
+        f"AFTER DELETE ON {CONTENT_TABLE} BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {', '.join(FTS_COLUMNS)}) "
+        f"VALUES ('delete', old.id, {', '.join('old.' + c for c in FTS_COLUMNS)}); END"
+    ),
+    f"{FTS_TABLE}_au": (
+        f"AFTER UPDATE OF {', '.join(FTS_COLUMNS)} ON {CONTENT_TABLE} BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {', '.join(FTS_COLUMNS)}) "
+        f"VALUES ('delete', old.id, {', '.join('old.' + c for c in FTS_COLUMNS)}); "
+        f"INSERT INTO {FTS_TABLE}(rowid, {', '.join(FTS_COLUMNS)}) "
+        f"VALUES (new.id, {', '.join('new.' + c for c in FTS_COLUMNS)}); END"
+    ),
+}
+
+# (alias, database name) -> whether the index exists there
+_available = {}
+
+
+def ensure_search_index(connection):
+    """
+    Create the FTS5 table and its triggers if they are missing, and rebuild
+    the index when anything had to be created.
+
+    Idempotent. Runs from the migration that adds the index and after every
+    migrate, because SQLite table rebuilds (AlterField, RemoveField) drop
+    the triggers along with the old table.
+    Returns False when the database can't have the index.
+    """
+    _available.pop((connection.alias, connection.settings_dict["NAME"]), None)
+    if connection.vendor != "sqlite":
+        return False
+    with connection.cursor() as cursor:
+        names = [CONTENT_TABLE, FTS_TABLE, *_TRIGGERS]
+        cursor.execute(
+            f"SELECT name FROM sqlite_master WHERE name IN ({', '.join(['%s'] * len(names))})",
+            names,
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        if CONTENT_TABLE not in existing:
+            # Migrated back before the events table
+            return False
+        missing = [name for name in (FTS_TABLE, *_TRIGGERS) if name not in existing]
+        if not missing:
+            return True
+        if FTS_TABLE in missing:
+            try:
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+                    f"{', '.join(FTS_COLUMNS)}, content='{CONTENT_TABLE}', "
+                    f"content_rowid='id', tokenize='unicode61', prefix='2 3')"
+                )
+            except OperationalError:
+                # SQLite built without FTS5
+                return False
+        for name, body in _TRIGGERS.items():
+            cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    return True
+
+
+def drop_search_index(connection):
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for name in _TRIGGERS:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    _available.pop((connection.alias, connection.settings_dict["NAME"]), None)
+
+
+def search_available(using="default"):
+    connection = connections[using]
+    key = (using, connection.settings_dict["NAME"])
+    if key not in _available:
+        _available[key] = (
+            connection.vendor == "sqlite"
+            and FTS_TABLE in connection.introspection.table_names()
+        )
+    return _available[key]
+
+
+def match_expression(text, columns=FTS_COLUMNS):
+    """
+    FTS5 MATCH expression for free text: every word as a prefix term,
+    restricted to ``columns``. None when the text has no words.
+    """
+    tokens = _TOKEN_RE.findall(text.lower())
+    if not tokens:
+        return None
+    column_filter = "{" + " ".join(columns) + "}"
+    return " AND ".join(f'{column_filter} : "{token}"*' for token in tokens)
+
+
+def search_events(queryset, text, columns=FTS_COLUMNS):
+    """Filter a NetworkEvent queryset to events matching ``text`` in ``columns``."""
+    expression = match_expression(text, columns)
+    if expression is None or not search_available(queryset.db):
+        # No index (or nothing to tokenize): substring match as before
+        condition = Q()
+        for column in columns:
+            condition |= Q(**{f"{column}__icontains": text.strip()})
+        return queryset.filter(condition)
+    return queryset.filter(
+        id__in=RawSQL(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [expression]
+        )
+    )
@@ -1,41 +1,110 @@
 # base/services.py
 
+import csv
 import hashlib
 import logging
-from datetime import datetime
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 
 import gspread
 from django.conf import settings
-from django.utils.timezone import make_aware
+from django.core.files.base import File
+from django.db import connections
+from django.utils import timezone
 
-from .models import NetworkEvent
+from . import metrics
+from .db import write_batch
+from .models import DailyHostDowntime, NetworkEvent, NetworkEventImport, SheetRowFingerprint
+from .parsing import (
+    EventCSVParser, SkippedRowsLog, parse_datetime, parse_event_csv, read_parsed_events,
+    reader_for,
+)
 
 logger = logging.getLogger(__name__)
 
-def sync_network_events_from_google_sheet():
+
+class CSVWorksheet:
+    """
+    Local stand-in for a gspread Worksheet backed by a CSV export of the sheet.
+    Implements the part of the Worksheet API the sync uses.
+    """
+
+    def __init__(self, path, title="Total"):
+        self.path = path
+        self.title = title
+
+    def get_all_values(self):
+        with open(self.path, newline="", encoding="utf-8") as csv_file:
+            return [row for row in csv.reader(csv_file)]
+
+
+def get_google_worksheet(title="Total"):
+    """Open a worksheet of the configured Google Sheet."""
+    gc = gspread.service_account(filename=settings.GOOGLE_CREDENTIALS_FILE)
+    spreadsheet = gc.open_by_key(settings.GOOGLE_SHEET_KEY)
+    return spreadsheet.worksheet(title)
+
+
+def row_fingerprint(values):
+    """SHA256 over the synced cell values of one sheet row."""
+    return hashlib.sha256("\x1f".join(values).encode("utf-8")).hexdigest()
+
+
+def sheet_row_key(event_data, row_number):
+    """
+    Key of a sheet row in SheetRowFingerprint: a hash of the outage identity
+    the upsert matches events on (host, down time, type, region), from the
+    cell text so unchanged rows are never parsed. Rows without a host or
+    down time are skipped by the sync and keyed by their row number.
+    """
+    if not (event_data["MPLS/Switch"] and event_data["Down Time"]):
+        return f"row:{row_number}"
+    return "id:" + row_fingerprint(
+        event_data[col].lower() for col in ("MPLS/Switch", "Down Time", "Type", "Region")
+    )
+
+
+def sync_network_events_from_google_sheet(worksheet=None, full=False):
     """
     Connects to Google Sheets, fetches data, and syncs it with the NetworkEvent model.
 
+    Every row is fingerprinted and compared with the SheetRowFingerprint
+    table, so only new or edited rows reach the ORM. Rows are keyed by the
+    outage they record (see sheet_row_key), not by SN, which restarts every
+    day, or by row number, which shifts when rows are inserted or deleted.
+
+    Args:
+        worksheet: Object with ``title`` and ``get_all_values()``; defaults to
+            the "Total" worksheet of settings.GOOGLE_SHEET_KEY. Pass a
+            CSVWorksheet to sync from a local export.
+        full: Re-process every row even if its fingerprint is unchanged.
+
     Returns:
         dict: A summary of the operation with counts for created, updated,
-              duplicate, and skipped records.
+              duplicate, skipped and unchanged records.
     Raises:
         Exception: If there's an error connecting to Google Sheets or if
                    required columns are missing.
     """
+    started = time.monotonic()
+
     # --- 1. Connect and Fetch Data ---
     try:
-        gc = gspread.service_account(filename=settings.GOOGLE_CREDENTIALS_FILE)
-        spreadsheet = gc.open_by_key(settings.GOOGLE_SHEET_KEY)
-        worksheet = spreadsheet.worksheet("Total")
+        if worksheet is None:
+            worksheet = get_google_worksheet("Total")
         all_rows = worksheet.get_all_values()
         logger.info("Successfully connected to Google Sheet.")
     except Exception as e:
         logger.error(f"Error connecting to Google Sheets: {e}")
+        metrics.record_ingest_failure("sheet")
         raise  # Re-raise the exception to be handled by the caller
 
     if not all_rows:
-        return {"created": 0, "updated": 0, "duplicates": 0, "skipped": 0, "message": "Sheet is empty."}
+        return {
+            "created": 0, "updated": 0, "duplicates": 0, "skipped": 0,
+            "unchanged": 0, "message": "Sheet is empty.",
+        }
 
     headers = [h.strip() for h in all_rows[0]]
     records_as_lists = all_rows[1:]
@@ -53,29 +122,42 @@ def sync_network_events_from_google_sheet():
                 raise ValueError(f"Required column '{col}' not found in sheet.")
     except ValueError as e:
         logger.fatal(f"Header validation failed: {e}")
+        metrics.record_ingest_failure("sheet")
         raise
 
-    # --- 3. Process Rows ---
-    created_count = 0
-    updated_count = 0
-    duplicate_count = 0
+    # --- 3. Find New or Changed Rows ---
+    known = {
+        fp.row_key: fp
+        for fp in SheetRowFingerprint.objects.filter(worksheet=worksheet.title).only(
+            "pk", "row_key", "fingerprint"
+        )
+    }
+    seen_keys = set()
+    changed_rows = []  # (row_key, fingerprint, model_data)
     skipped_count = 0
+    unchanged_count = 0
 
-    def parse_datetime(value):
-        if not value or not isinstance(value, str):
-            return None
-        try:
-            dt = datetime.strptime(value.strip(), "%m/%d/%Y %H:%M:%S")
-            return make_aware(dt)
-        except (ValueError, TypeError):
-            return None
-
-    for row_list in records_as_lists:
+    for row_number, row_list in enumerate(records_as_lists, 2):
         if len(row_list) < len(headers):
             row_list.extend([""] * (len(headers) - len(row_list)))
 
         event_data = {col: row_list[idx_map[col]].strip() for col in required_cols}
 
+        row_key = sheet_row_key(event_data, row_number)
+        if row_key in seen_keys:
+            # The same outage again: keyed by which repeat it is
+            repeat = 2
+            while f"{row_key}:{repeat}" in seen_keys:
+                repeat += 1
+            row_key = f"{row_key}:{repeat}"
+        seen_keys.add(row_key)
+
+        fingerprint = row_fingerprint(event_data.values())
+        previous = known.get(row_key)
+        if not full and previous is not None and previous.fingerprint == fingerprint:
+            unchanged_count += 1
+            continue
+
         if not event_data["MPLS/Switch"]:
             skipped_count += 1
             continue
@@ -85,17 +167,7 @@ def sync_network_events_from_google_sheet():
             skipped_count += 1
             continue
 
-        # This `base_hash` logic seems to be unused in the create_or_update call.
-        # I'll keep it here in case your model method uses it implicitly.
-        base_data_string = "|".join([
-            event_data["MPLS/Switch"].lower(),
-            str(down_time),
-            event_data["Type"].lower(),
-            event_data["Region"].lower(),
-        ])
-        base_hash = hashlib.sha256(base_data_string.encode("utf-8")).hexdigest()
-
-        model_data = {
+        changed_rows.append((row_key, fingerprint, {
             "name": event_data["MPLS/Switch"],
             "down_time": down_time,
             "up_time": parse_datetime(event_data["Up Time"]),
@@ -107,22 +179,291 @@ def sync_network_events_from_google_sheet():
             "remarks": event_data["Remarks(from mail if any)"],
             "category": event_data["Category"],
             "down_count": 0,  # Default, as not in sheet
-        }
-        
-        # We need to assume your NetworkEvent model has this custom manager method.
-        # If not, you can implement it as shown in the bonus section below.
-        event, created, updated = NetworkEvent.create_or_update_event(**model_data)
-
-        if created:
-            created_count += 1
-        elif updated:
-            updated_count += 1
-        else:
-            duplicate_count += 1
-
-    return {
+        }))
+
+    # --- 4. Upsert Changed Rows and Their Fingerprints ---
+    created_count = updated_count = duplicate_count = 0
+    batch_size = NetworkEvent.BULK_BATCH_SIZE
+    with DailyHostDowntime.deferred():
+        for start in range(0, len(changed_rows), batch_size):
+            chunk = changed_rows[start:start + batch_size]
+            # Events and their fingerprints commit together, one chunk at a time
+            with write_batch():
+                events, created, updated, duplicates = NetworkEvent.upsert_chunk(
+                    [model_data for _, _, model_data in chunk]
+                )
+
+                # Changed fingerprints are replaced (delete + insert), which is much
+                # cheaper than bulk_update's per-row CASE expressions.
+                replaced_pks = [known[row_key].pk for row_key, _, _ in chunk if row_key in known]
+                SheetRowFingerprint.objects.filter(pk__in=replaced_pks).delete()
+                SheetRowFingerprint.objects.bulk_create(
+                    [
+                        SheetRowFingerprint(
+                            worksheet=worksheet.title, row_key=row_key,
+                            fingerprint=fingerprint, event=event,
+                        )
+                        for (row_key, fingerprint, _), event in zip(chunk, events)
+                    ],
+                    batch_size=batch_size,
+                )
+            created_count += created
+            updated_count += updated
+            duplicate_count += duplicates
+
+    # Rows removed from the sheet no longer need a fingerprint.
+    stale_keys = set(known) - seen_keys
+    if stale_keys:
+        SheetRowFingerprint.objects.filter(
+            worksheet=worksheet.title, row_key__in=stale_keys
+        ).delete()
+
+    # Ongoing outages the sheet didn't touch have grown since they were stored
+    NetworkEvent.objects.refresh_open_durations()
+
+    summary = {
         "created": created_count,
         "updated": updated_count,
         "duplicates": duplicate_count,
         "skipped": skipped_count,
+        "unchanged": unchanged_count,
     }
+    metrics.record_ingest(
+        "sheet", summary, time.monotonic() - started, len(records_as_lists)
+    )
+    return summary
+
+
+def estimate_csv_rows(field_file):
+    """Count data rows by scanning newlines in fixed-size binary chunks."""
+    lines = 0
+    with field_file.open(mode="rb") as binary_file:
+        for chunk in iter(lambda: binary_file.read(1024 * 1024), b""):
+            lines += chunk.count(b"\n")
+    return max(lines - 1, 0)  # Minus the header
+
+
+def process_network_event_import(event_import):
+    """
+    Parse and upsert the CSV of a NetworkEventImport.
+
+    Runs in the import worker (see the ``process_imports`` command), not in
+    the admin request. Each chunk is committed on its own and the import's
+    progress fields are updated after it, so the admin can poll them.
+
+    Returns:
+        dict: Counts for processed, created, updated, duplicate and skipped rows.
+    """
+    event_import.total_rows = estimate_csv_rows(event_import.csv_file)
+    event_import.started_at = event_import.started_at or timezone.now()
+    event_import.save(update_fields=["total_rows", "started_at"])
+    started = time.monotonic()
+
+    # One pass over the file: rows are validated as they are read and fed to
+    # the chunked upsert, skipped ones go straight to the log file.
+    with SkippedRowsLog() as skipped_rows, event_import.csv_file.open(mode="rb") as binary_file:
+        parser = EventCSVParser(skipped_rows)
+        counts = NetworkEvent.bulk_create_or_update_events(
+            parser.rows(reader_for(binary_file)),
+            on_chunk=_progress_reporter(event_import, started, lambda: parser.row_count),
+        )
+        return _finish_import(event_import, parser.row_count, counts, skipped_rows, started)
+
+
+def _progress_reporter(event_import, started, row_count, duplicates_before=lambda: 0):
+    """on_chunk callback writing an import's live progress fields."""
+
+    def report_progress(created, updated, duplicates):
+        elapsed = time.monotonic() - started
+        rows = row_count()
+        NetworkEventImport.objects.filter(pk=event_import.pk).update(
+            processed_rows=rows,
+            created_events=created,
+            updated_events=updated,
+            duplicate_events=duplicates + duplicates_before(),
+            total_rows=max(event_import.total_rows, rows),
+            rows_per_second=round(rows / elapsed, 1) if elapsed else 0,
+        )
+
+    return report_progress
+
+
+def _finish_import(event_import, row_count, counts, skipped_rows, started):
+    """Save the final stats and SkippedRowsLog of an import and return its summary."""
+    created_count, updated_count, duplicate_count = counts
+    if skipped_rows:
+        file_name = f"skipped_rows_import_{event_import.id}.csv"
+        event_import.skipped_rows_file.save(
+            file_name, File(skipped_rows.file(), name=file_name), save=False
+        )
+
+    elapsed = time.monotonic() - started
+    event_import.processed_rows = row_count
+    event_import.total_rows = row_count
+    event_import.created_events = created_count
+    event_import.updated_events = updated_count
+    event_import.duplicate_events = duplicate_count
+    event_import.rows_per_second = round(row_count / elapsed, 1) if elapsed else 0
+    event_import.finished_at = timezone.now()
+    event_import.processing_status = "completed"
+    event_import.error_message = ""  # Clear any previous error
+    event_import.save()
+
+    summary = {
+        "processed": row_count,
+        "created": created_count,
+        "updated": updated_count,
+        "duplicates": duplicate_count,
+        "skipped": len(skipped_rows),
+    }
+    metrics.record_ingest("csv", summary, elapsed, row_count)
+    return summary
+
+
+def _fail_import(event_import, error):
+    metrics.record_ingest_failure("csv")
+    event_import.processing_status = "failed"
+    event_import.error_message = f"An error occurred during processing: {error}"
+    event_import.finished_at = timezone.now()
+    event_import.save()
+
+
+def process_network_event_imports(imports, workers=None):
+    """
+    Process several claimed imports: parse in a process pool, write from here.
+
+    Each file is parsed and validated in a worker process
+    (parsing.parse_event_csv) into a temporary file of row chunks; this
+    process is the only writer and applies the files in upload order as
+    their parses finish, while up to ``workers`` later files are parsed.
+    Rows repeating one already applied from an earlier file of the batch
+    (the same export uploaded twice, overlapping monthly exports) are
+    counted as duplicates without another trip to the database. Every
+    import keeps its own stats, skipped-rows log and status.
+
+    Returns:
+        dict: {import pk: summary dict, or None when the import failed}.
+    """
+    imports = list(imports)
+    results = {}
+    if not imports:
+        return results
+
+    # The children never use the database; don't hand them open connections
+    connections.close_all()
+    workers = workers or os.cpu_count()
+    last_applied = {}  # Outage identity -> values of its last applied row
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for event_import in imports:
+            event_import.total_rows = estimate_csv_rows(event_import.csv_file)
+            event_import.started_at = event_import.started_at or timezone.now()
+            event_import.save(update_fields=["total_rows", "started_at"])
+
+        # At most one parsed file per worker waits ahead of the one being
+        # written, however many files were claimed
+        paths = [event_import.csv_file.path for event_import in imports]
+        futures = [pool.submit(parse_event_csv, path) for path in paths[:workers]]
+
+        for index, event_import in enumerate(imports):
+            if index + workers < len(paths):
+                futures.append(pool.submit(parse_event_csv, paths[index + workers]))
+            started = time.monotonic()
+            parsed_path = None
+            try:
+                parsed_path, row_count = futures[index].result()
+                repeated = 0
+                # Rows of the chunk being written; they only count as applied
+                # once it commits, so a failed import leaves no entries behind.
+                pending = {}
+
+                def new_rows(rows):
+                    nonlocal repeated
+                    for row in rows:
+                        # Same outage as an earlier row of the batch, and no
+                        # field changed since: exactly what the upsert would
+                        # count as a duplicate.
+                        identity = (
+                            row["name"].lower(), row["down_time"],
+                            row["type"].lower(), row["region"].lower(),
+                        )
+                        values = tuple(row.values())
+                        if pending.get(identity, last_applied.get(identity)) == values:
+                            repeated += 1
+                            continue
+                        pending[identity] = values
+                        yield row
+
+                report_progress = _progress_reporter(
+                    event_import, started, lambda: row_count, lambda: repeated
+                )
+
+                def on_chunk(*totals):
+                    last_applied.update(pending)
+                    pending.clear()
+                    report_progress(*totals)
+
+                with SkippedRowsLog() as skipped_log:
+                    created, updated, duplicates = NetworkEvent.bulk_create_or_update_events(
+                        new_rows(read_parsed_events(parsed_path, skipped_log)),
+                        on_chunk=on_chunk,
+                    )
+                    results[event_import.pk] = _finish_import(
+                        event_import, row_count,
+                        (created, updated, duplicates + repeated), skipped_log, started,
+                    )
+            except Exception as e:
+                logger.exception(f"Import {event_import.pk} failed.")
+                _fail_import(event_import, e)
+                results[event_import.pk] = None
+            finally:
+                if parsed_path:
+                    os.remove(parsed_path)
+    return results
+
+
+def run_next_import():
+    """
+    Claim and process the oldest pending NetworkEventImport.
+
+    Returns:
+        NetworkEventImport | None: The import that was processed, or None if
+        the queue was empty.
+    """
+    event_import = NetworkEventImport.claim_next()
+    if event_import is None:
+        return None
+
+    try:
+        summary = process_network_event_import(event_import)
+        logger.info(f"Import {event_import.pk} completed: {summary}")
+    except Exception as e:
+        logger.exception(f"Import {event_import.pk} failed.")
+        _fail_import(event_import, e)
+    return event_import
+
+
+def run_import_batch(workers, max_files=None):
+    """
+    Claim up to ``max_files`` pending imports (default: four per worker) and
+    process them with process_network_event_imports.
+
+    Returns:
+        list[NetworkEventImport]: The claimed imports, empty if the queue was.
+    """
+    imports = []
+    for _ in range(max_files or workers * 4):
+        event_import = NetworkEventImport.claim_next()
+        if event_import is None:
+            break
+        imports.append(event_import)
+    if len(imports) == 1:
+        # Nothing to parallelize
+        event_import = imports[0]
+        try:
+            process_network_event_import(event_import)
+        except Exception as e:
+            logger.exception(f"Import {event_import.pk} failed.")
+            _fail_import(event_import, e)
+    elif imports:
+        process_network_event_imports(imports, workers=workers)
+    return imports
@@ -0,0 +1,169 @@
+# base/synthetic.py
+
+import csv
+import io
+import random
+from datetime import datetime, timedelta
+
+from django.core.files.base import ContentFile
+
+from .models import NetworkEventImport
+from .nepali_calendar import to_bs
+from .utils import REASON_CATEGORIES
+
+# Column layout of the "Total" worksheet of the NOC daily report
+SHEET_HEADER = [
+    "SN", "MPLS/Switch", "Full SOLAR POP", "Down Time", "Up Time", "Type",
+    "Region", "Reason/Issue", "Date", "Duration", "Remarks(from mail if any)",
+    "Category",
+]
+
+REGIONS = [
+    "Koshi Region", "Madhesh Region", "Bagmati Region", "Gandaki Region",
+    "Lumbini Region", "Karnali Region", "Far Western Region",
+]
+
+# (type, share of events, host name template)
+EVENT_TYPES = [
+    ("Switch", 0.55, "m{place}-sw{n}"),
+    ("MPLS", 0.25, "m{place}-mpls{n}"),
+    ("Link Down", 0.12, "m{place} - m{other} [10G]"),
+    ("Optical Power", 0.05, "m{place} - m{other} [10G] - Optical"),
+    ("CRC", 0.03, "m{place} - m{other} [1G] - CRC"),
+]
+
+# How often each root-cause category shows up in the real report; the
+# categories not listed get weight 1.
+CATEGORY_WEIGHTS = {
+    "Power": 30, "CT Line Issue": 10, "Fiber": 15, "Reboot": 12, "Device": 6,
+    "Power Backup": 4, "Maintenance": 3, "Unknown": 8,
+}
+
+# Free text the classifier only matches partially, and blanks
+FREE_TEXT_REASONS = [
+    ("Power issue since morning", 3),
+    ("fiber cut near pole", 2),
+    ("Rebooted by site team", 2),
+    ("", 4),
+]
+
+
+def _reason_pool():
+    # (reason, category, weight) for every reason find_likely_root_cause knows
+    pool = []
+    for category, info in REASON_CATEGORIES.items():
+        reasons = list(dict.fromkeys(info["reasons"]))
+        weight = CATEGORY_WEIGHTS.get(category, 1) / len(reasons)
+        pool.extend((reason, category, weight) for reason in reasons)
+    pool.extend((reason, "", weight) for reason, weight in FREE_TEXT_REASONS)
+    return pool
+
+
+REASONS = _reason_pool()
+
+PLACES = [
+    "jamune", "kalaiya", "damak", "bardaghat", "bhairahawa", "jumlabazaar",
+    "adarshanagar", "illam", "birtamod", "itahari", "dharan", "janakpur",
+    "hetauda", "bharatpur", "pokhara", "butwal", "nepalgunj", "surkhet",
+    "dhangadhi", "mahendranagar", "birgunj", "lahan", "rajbiraj", "gaur",
+]
+
+NEPALI_MONTHS = [
+    "Baisakh", "Jestha", "Aasar", "Shrawan", "Bhadra", "Ashoj",
+    "Kartik", "Mangsir", "Poush", "Magh", "Falgun", "Chaitra",
+]
+
+SHEET_DATETIME_FORMAT = "%m/%d/%Y %H:%M:%S"
+
+
+def _ordinal(day):
+    if 11 <= day % 100 <= 13:
+        return f"{day}th"
+    suffix = {1: "st", 2: "nd", 3: "rd"}.get(day % 10, "th")
+    return f"{day}{suffix}"
+
+
+def _hosts(rng, host_count):
+    hosts = []
+    weights = [share for _, share, _ in EVENT_TYPES]
+    for n in range(host_count):
+        event_type, _, template = rng.choices(EVENT_TYPES, weights=weights)[0]
+        place, other = rng.sample(PLACES, 2)
+        name = template.format(place=place, other=other, n=n + 1)
+        hosts.append((name, event_type, rng.choice(REGIONS)))
+    return hosts
+
+
+def synthetic_sheet_rows(count, seed=0, hosts=300, start=None, days=365, open_ratio=0.02):
+    """
+    ``count`` event rows in the layout of the NOC sheet (SHEET_HEADER), the
+    same for the same arguments.
+
+    Events are spread over ``days`` days from ``start`` and ordered by down
+    time; a few hosts are flaky and get most of the events, like the real
+    report. ``open_ratio`` of them have no Up Time (still down).
+    """
+    rng = random.Random(seed)
+    host_list = _hosts(rng, hosts)
+    # Heavy-tailed: the first hosts go down far more often than the rest
+    host_weights = [1 / (rank + 1) ** 0.8 for rank in range(len(host_list))]
+    reason_weights = [weight for _, _, weight in REASONS]
+    start = start or datetime(2025, 4, 14)
+    span_seconds = days * 86400
+
+    down_offsets = sorted(rng.randrange(span_seconds) for _ in range(count))
+    for sn, offset in enumerate(down_offsets, 1):
+        name, event_type, region = rng.choices(host_list, weights=host_weights)[0]
+        reason, category, _ = rng.choices(REASONS, weights=reason_weights)[0]
+        down_time = start + timedelta(seconds=offset)
+        if rng.random() < open_ratio:
+            up_time = ""
+        else:
+            # Mostly minutes, sometimes hours, rarely days
+            duration = timedelta(seconds=int(rng.lognormvariate(7.5, 1.6)) + 30)
+            up_time = (down_time + duration).strftime(SHEET_DATETIME_FORMAT)
+        bs_date = to_bs(down_time.date())
+
+        yield [
+            str(sn),
+            name,
+            rng.choice(["TRUE", "FALSE", ""]),
+            down_time.strftime(SHEET_DATETIME_FORMAT),
+            up_time,
+            event_type,
+            region,
+            reason,
+            f"{_ordinal(bs_date.day)} {NEPALI_MONTHS[bs_date.month - 1]}",
+            "",
+            "",
+            category,
+        ]
+
+
+class SyntheticWorksheet:
+    """In-memory stand-in for a gspread Worksheet filled with synthetic rows."""
+
+    def __init__(self, count, seed=0, title="Total", **kwargs):
+        self.title = title
+        self.rows = [SHEET_HEADER] + list(synthetic_sheet_rows(count, seed=seed, **kwargs))
+
+    def get_all_values(self):
+        return [list(row) for row in self.rows]
+
+
+def write_synthetic_csv(file, count, seed=0, **kwargs):
+    """Write a synthetic sheet export (header plus ``count`` rows) to an open text file."""
+    writer = csv.writer(file)
+    writer.writerow(SHEET_HEADER)
+    writer.writerows(synthetic_sheet_rows(count, seed=seed, **kwargs))
+
+
+def make_synthetic_import(count, seed=0, **kwargs):
+    """A NetworkEventImport of a synthetic CSV, saved and ready to process."""
+    buffer = io.StringIO()
+    write_synthetic_csv(buffer, count, seed=seed, **kwargs)
+    event_import = NetworkEventImport(processing_status="processing")
+    event_import.csv_file.save(
+        f"synthetic_{seed}_{count}.csv", ContentFile(buffer.getvalue().encode("utf-8"))
+    )
+    return event_import
@@ -1,3 +1,1076 @@
-from django.test import TestCase
+import csv
+import importlib
+import io
+import json
+import tempfile
+import zipfile
+from collections import Counter
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+import nepali_datetime
+from asgiref.sync import sync_to_async
+from django.apps import apps as django_apps
+from django.contrib import admin
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.core.management.sql import emit_post_migrate_signal
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import (
+    AsyncRequestFactory, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase,
+    override_settings,
+)
+from django.utils import timezone
+
+from . import nepali_calendar
+from .buckets import BS_MONTH, DAY, HOUR, MAX_POINTS, WEEK, buckets_for
+from .exports import streaming_export
+from .filters import get_filters
+from .models import DailyHostDowntime, Host, NetworkEvent, NetworkEventImport, SheetRowFingerprint
+from .search import FTS_TABLE, drop_search_index, search_available, search_events
+from .pagination import InvalidCursor, decode_cursor, encode_cursor, keyset_page
+from .services import (
+    CSVWorksheet, process_network_event_import, process_network_event_imports,
+    sync_network_events_from_google_sheet,
+)
+from .synthetic import SyntheticWorksheet, write_synthetic_csv
+from .utils import (
+    dedup_keys, find_likely_root_cause, find_likely_root_causes, merged_downtime_by_host,
+)
+from .views import get_host_summary
+
+
+def event_row(name, down_time, up_time=None, **fields):
+    """Upsert kwargs of one Switch event, as the CSV and sheet parsers give them."""
+    return {
+        "name": name, "down_time": down_time, "up_time": up_time, "date": "",
+        "type": "Switch", "region": "Central", "reason": "Power", "solar": "",
+        "remarks": "", "category": "", "down_count": 0, **fields,
+    }
+
+
+class CSVImportTests(TestCase):
+    """The chunked CSV import, run on a synthetic export."""
+
+    ROWS = 120
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        media = override_settings(MEDIA_ROOT=tmp_dir.name)
+        media.enable()
+        self.addCleanup(media.disable)
+        buffer = io.StringIO()
+        write_synthetic_csv(buffer, self.ROWS, seed=2)
+        self.csv_text = buffer.getvalue()
+
+    def run_import(self, csv_text):
+        event_import = NetworkEventImport(processing_status="processing")
+        event_import.csv_file.save("events.csv", ContentFile(csv_text.encode("utf-8")))
+        summary = process_network_event_import(event_import)
+        event_import.refresh_from_db()
+        self.assertEqual(event_import.processing_status, "completed")
+        return summary
+
+    def test_reimport_counts_duplicates(self):
+        first = self.run_import(self.csv_text)
+        self.assertEqual(
+            (first["created"], first["updated"], first["duplicates"]), (self.ROWS, 0, 0)
+        )
+        second = self.run_import(self.csv_text)
+        self.assertEqual(
+            (second["created"], second["updated"], second["duplicates"]), (0, 0, self.ROWS)
+        )
+        self.assertEqual(NetworkEvent.objects.count(), self.ROWS)
+
+    def test_edited_row_is_updated(self):
+        self.run_import(self.csv_text)
+        header, *rows = csv.reader(io.StringIO(self.csv_text))
+        rows[5][header.index("Reason/Issue")] = "Fiber Cut"
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows([header, *rows])
+        summary = self.run_import(buffer.getvalue())
+        self.assertEqual(
+            (summary["created"], summary["updated"], summary["duplicates"]),
+            (0, 1, self.ROWS - 1),
+        )
+        self.assertEqual(NetworkEvent.objects.filter(reason="Fiber Cut").count(), 1)
+
+    def test_batch_import(self):
+        spool_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(spool_dir.cleanup)
+        header, *rows = csv.reader(io.StringIO(self.csv_text))
+        rows[5][header.index("Reason/Issue")] = "Fiber Cut"
+        rows[7][header.index("Down Time")] = "not a date"
+        edited = io.StringIO()
+        csv.writer(edited).writerows([header, *rows])
+        # The same export twice and an edited copy, through one worker that
+        # parses each file ahead of the one being written in chunks of 25
+        imports = []
+        for csv_text in (self.csv_text, self.csv_text, edited.getvalue()):
+            event_import = NetworkEventImport(processing_status="processing")
+            event_import.csv_file.save("events.csv", ContentFile(csv_text.encode("utf-8")))
+            imports.append(event_import)
+        with (
+            mock.patch("base.parsing.PARSED_CHUNK_ROWS", 25),
+            mock.patch("tempfile.tempdir", spool_dir.name),
+        ):
+            results = process_network_event_imports(imports, workers=1)
+
+        keys = ("created", "updated", "duplicates", "skipped")
+        summaries = [
+            tuple(results[event_import.pk][key] for key in keys) for event_import in imports
+        ]
+        self.assertEqual(summaries, [
+            (self.ROWS, 0, 0, 0), (0, 0, self.ROWS, 0), (0, 1, self.ROWS - 2, 1),
+        ])
+        self.assertEqual(NetworkEvent.objects.filter(reason="Fiber Cut").count(), 1)
+        imports[2].refresh_from_db()
+        self.assertTrue(imports[2].skipped_rows_file)
+        # The parsed files are gone once written
+        self.assertEqual(list(Path(spool_dir.name).iterdir()), [])
+
+
+class SheetSyncTests(TestCase):
+    """The Google Sheet sync, run against CSV exports of a synthetic sheet."""
+
+    ROWS = 50
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.worksheet = CSVWorksheet(Path(tmp_dir.name) / "sheet.csv")
+        self.header, *self.rows = SyntheticWorksheet(self.ROWS, seed=1).get_all_values()
+        self.export()
+
+    def export(self):
+        with open(self.worksheet.path, "w", newline="", encoding="utf-8") as csv_file:
+            csv.writer(csv_file).writerows([self.header, *self.rows])
+
+    def sync(self):
+        return sync_network_events_from_google_sheet(worksheet=self.worksheet)
+
+    def test_first_sync_creates_every_row(self):
+        summary = self.sync()
+        self.assertEqual(summary["created"], self.ROWS)
+        self.assertEqual(NetworkEvent.objects.count(), self.ROWS)
+        self.assertEqual(SheetRowFingerprint.objects.count(), self.ROWS)
+
+    def test_second_sync_leaves_rows_unchanged(self):
+        self.sync()
+        summary = self.sync()
+        self.assertEqual(summary["unchanged"], self.ROWS)
+        self.assertEqual(summary["created"] + summary["updated"] + summary["duplicates"], 0)
+
+    def test_restarted_sn_leaves_rows_unchanged(self):
+        self.sync()
+        # SN starts again from 1 every day
+        sn = self.header.index("SN")
+        for number, row in enumerate(self.rows):
+            row[sn] = str(number % 7 + 1)
+        self.export()
+        summary = self.sync()
+        self.assertEqual(summary["unchanged"], self.ROWS)
+        self.assertEqual(NetworkEvent.objects.count(), self.ROWS)
+
+    def test_deleted_row_reprocesses_nothing(self):
+        self.sync()
+        del self.rows[0]
+        self.export()
+        summary = self.sync()
+        self.assertEqual(summary["unchanged"], self.ROWS - 1)
+        self.assertEqual(summary["created"] + summary["updated"] + summary["duplicates"], 0)
+        self.assertEqual(SheetRowFingerprint.objects.count(), self.ROWS - 1)
+
+    def test_edited_row_is_updated(self):
+        self.sync()
+        reason = self.header.index("Reason/Issue")
+        self.rows[10][reason] = "Fiber Cut"
+        self.export()
+        summary = self.sync()
+        self.assertEqual(summary["updated"], 1)
+        self.assertEqual(summary["unchanged"], self.ROWS - 1)
+        self.assertEqual(NetworkEvent.objects.filter(reason="Fiber Cut").count(), 1)
+
+
+class RootCauseTests(TestCase):
+    """
+    Root causes against root_causes.json: per-host reason lists (in down
+    time order) with the root cause the original per-event implementation
+    gave for each.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        with open(Path(__file__).parent / "fixtures" / "root_causes.json", encoding="utf-8") as f:
+            cls.hosts = json.load(f)
+        cls.expected = {host["host"]: host["root_cause"] for host in cls.hosts}
+
+    def test_reason_lists(self):
+        for host in self.hosts:
+            with self.subTest(host=host["host"]):
+                self.assertEqual(find_likely_root_cause(host["reasons"]), host["root_cause"])
+
+    def test_reason_histograms(self):
+        root_causes = find_likely_root_causes(
+            {host["host"]: Counter(host["reasons"]) for host in self.hosts}
+        )
+        self.assertEqual(root_causes, self.expected)
+
+    def test_dashboard_summary(self):
+        start = timezone.make_aware(datetime(2025, 6, 1))
+        NetworkEvent.bulk_create_or_update_events(
+            event_row(
+                host["host"],
+                start + timedelta(hours=number),
+                start + timedelta(hours=number, minutes=10),
+                reason=reason,
+            )
+            for host in self.hosts
+            for number, reason in enumerate(host["reasons"])
+        )
+        host_details, _ = get_host_summary(
+            NetworkEvent.objects.all(), start, start + timedelta(days=30)
+        )
+        self.assertEqual({host["name"]: host["reason"] for host in host_details}, self.expected)
+
+
+class KeysetPageTests(SimpleTestCase):
+    # Ties on count, told apart by the name at the end of the key
+    ROWS = [{"name": f"host-{number:02}", "count": number % 3} for number in range(20)]
+
+    @staticmethod
+    def sort_key(row):
+        return (row["count"], row["name"])
+
+    def pages(self, descending, limit=6):
+        names, cursor = [], None
+        while True:
+            page, cursor = keyset_page(
+                self.ROWS, self.sort_key, cursor=cursor and decode_cursor(cursor),
+                limit=limit, descending=descending,
+            )
+            names.append([row["name"] for row in page])
+            if cursor is None:
+                return names
+
+    def test_pages_cover_every_row_once_in_order(self):
+        for descending in (True, False):
+            with self.subTest(descending=descending):
+                pages = self.pages(descending)
+                expected = [row["name"] for row in sorted(
+                    self.ROWS, key=self.sort_key, reverse=descending
+                )]
+                self.assertEqual(sum(pages, []), expected)
+                self.assertEqual([len(page) for page in pages], [6, 6, 6, 2])
+
+    def test_cursor_of_a_removed_row(self):
+        cursor = decode_cursor(encode_cursor((1, "host-04")))
+        rows = [row for row in self.ROWS if row["name"] != "host-04"]
+        page, _ = keyset_page(rows, self.sort_key, cursor=cursor, limit=2, descending=False)
+        self.assertEqual([row["name"] for row in page], ["host-07", "host-10"])
+
+    def test_invalid_cursors(self):
+        cursors = [
+            ("host-04", 1),  # Components swapped
+            (1, 2),  # A number where the name goes
+            (1, None),
+            (True, "host-04"),
+            (1, "host-04", 3),
+            ([1], "host-04"),
+        ]
+        for cursor in cursors:
+            for descending in (True, False):
+                with self.subTest(cursor=cursor, descending=descending):
+                    with self.assertRaises(InvalidCursor):
+                        keyset_page(
+                            self.ROWS, self.sort_key,
+                            cursor=decode_cursor(encode_cursor(cursor)), descending=descending,
+                        )
+        with self.assertRaises(InvalidCursor):
+            decode_cursor("not a cursor")
+
+
+class HostSummaryAPITests(TestCase):
+    def test_invalid_cursor_is_a_bad_request(self):
+        start = timezone.make_aware(datetime(2025, 6, 1))
+        NetworkEvent.bulk_create_or_update_events(
+            event_row(name, start + timedelta(days=day), start + timedelta(days=day, hours=1))
+            for name, day in (("a-sw1", 0), ("a-sw1", 1), ("b-sw1", 0))
+        )
+        window = {"start_date": "2025-06-01", "end_date": "2025-06-30"}
+        response = self.client.get("/api/host-summary/", {**window, "limit": 1})
+        self.assertEqual(response.status_code, 200)
+        *tie, _ = decode_cursor(response.json()["next_cursor"])
+        # The sort values of a-sw1 (the first page), then not a name; a-sw1
+        # is not the first key, the only one the cursor used to be checked on
+        for cursor in [encode_cursor([*tie, 5]), encode_cursor([*tie, None]), "junk"]:
+            with self.subTest(cursor=cursor):
+                response = self.client.get("/api/host-summary/", {**window, "cursor": cursor})
+                self.assertEqual(response.status_code, 400)
+
+
+class OngoingOutageTests(TransactionTestCase):
+    """
+    The rollup-backed dashboard (no text search) and the event sweep (with
+    one) report the same downtime, also for an outage that was ongoing when
+    its rollup was written and still is.
+    """
+
+    NOW = timezone.make_aware(datetime(2025, 6, 20, 12))
+    WINDOW = {"start_date": "2025-06-10", "end_date": "2025-06-20"}
+    # Merged and clipped to the window by hand
+    EXPECTED = {
+        "alpha-sw1": (NOW - timezone.make_aware(datetime(2025, 6, 17, 8))).total_seconds(),
+        "beta-sw1": 2 * 3600 + 3600,
+    }
+
+    def setUp(self):
+        cache.clear()
+        at = lambda *args: timezone.make_aware(datetime(2025, 6, *args))  # noqa: E731
+        # Written two days before the dashboard is viewed, while still down
+        with mock.patch("django.utils.timezone.now", return_value=at(18, 11)):
+            NetworkEvent.bulk_create_or_update_events([
+                event_row("alpha-sw1", at(17, 8), at(18, 11)),
+                event_row("alpha-sw1", at(18, 10), reason="Fiber"),
+                # Across the window start, and an outage inside another
+                event_row("beta-sw1", at(9, 20), at(10, 2)),
+                event_row("beta-sw1", at(15, 10), at(15, 11)),
+                event_row("beta-sw1", at(15, 10, 10), at(15, 10, 20)),
+            ])
+        patcher = mock.patch("django.utils.timezone.now", return_value=self.NOW)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get(self, path, search):
+        params = {**self.WINDOW, **({"name": "sw1"} if search else {})}
+        response = self.client.get(path, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_host_summary(self):
+        for search in (False, True):
+            with self.subTest(search=search):
+                rows = self.get("/api/host-summary/", search)["results"]
+                durations = {row["name"]: row["duration"] for row in rows}
+                self.assertEqual(durations, {
+                    name: str(timedelta(seconds=seconds)) for name, seconds in self.EXPECTED.items()
+                })
+
+    def test_aggregate_uptime(self):
+        window_seconds = 11 * 86400 - 1e-6
+        expected = round(
+            sum(100 - seconds / window_seconds * 100 for seconds in self.EXPECTED.values()) / 2, 2
+        )
+        for search in (False, True):
+            with self.subTest(search=search):
+                self.assertEqual(self.get("/api/aggregate-uptime/", search)["data"][0], expected)
+
+    def test_host_charts(self):
+        for host in Host.objects.all():
+            with self.subTest(host=host.name):
+                path = f"/api/host/{host.pk}/charts/"
+                rollup, sweep = self.get(path, False), self.get(path, True)
+                self.assertEqual(rollup["bucket"], "day")
+                self.assertEqual(rollup, sweep)
+                self.assertAlmostEqual(
+                    rollup["uptime_pie"]["data"][1], self.EXPECTED[host.name] / 60, places=2
+                )
+
+
+class DowntimeTests(TestCase):
+    """
+    Downtime in a window, swept from RequestFilters.outages and read from
+    the daily rollup: clipped to the window, overlapping and nested outages
+    counted once, ongoing ones until now.
+    """
+
+    WINDOW = {"start_date": "2025-06-10", "end_date": "2025-06-20"}
+    HOUR = 3600
+    # Per host, merged and clipped to the window by hand
+    EXPECTED = {
+        "a-sw1": 4 * HOUR,
+        "b-sw1": HOUR,
+        "c-sw1": 2 * 86400,
+        "d-sw1": 11 * 86400,
+    }
+
+    def setUp(self):
+        at = lambda *args: timezone.make_aware(datetime(2025, 6, *args))  # noqa: E731
+        # After the window, so ongoing outages are clipped to its end
+        patcher = mock.patch("django.utils.timezone.now", return_value=at(25))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        NetworkEvent.bulk_create_or_update_events([
+            # Across the window start; two overlapping, and one inside them
+            event_row("a-sw1", at(9, 22), at(10, 1)),
+            event_row("a-sw1", at(12, 10), at(12, 12)),
+            event_row("a-sw1", at(12, 11), at(12, 13)),
+            event_row("a-sw1", at(12, 10, 30), at(12, 10, 45)),
+            # Across the window end, and one before the window
+            event_row("b-sw1", at(20, 23), at(21, 2)),
+            event_row("b-sw1", at(5), at(6)),
+            # Ongoing, down inside the window and before it
+            event_row("c-sw1", at(19)),
+            event_row("d-sw1", at(8)),
+            # Over before the window
+            event_row("e-sw1", at(1), at(2)),
+        ])
+        self.filters = get_filters(RequestFactory().get("/", self.WINDOW))
+        self.start_time, self.end_time = self.filters.time_range
+
+    def test_outages_overlap_the_window(self):
+        names = lambda events: set(events.values_list("name", flat=True))  # noqa: E731
+        self.assertEqual(names(self.filters.outages), set(self.EXPECTED))
+        # Events of the window are those that went down in it
+        self.assertEqual(names(self.filters.events), {"a-sw1", "b-sw1", "c-sw1"})
+
+    def test_sweep(self):
+        downtime = merged_downtime_by_host(self.filters.outages, self.start_time, self.end_time)
+        self.assertEqual({name: round(seconds) for name, seconds in downtime.items()}, self.EXPECTED)
+
+    def test_rollup_days(self):
+        days = {
+            (row.name, row.day.day): (row.event_count, row.downtime_seconds)
+            for row in DailyHostDowntime.objects.filter(name__in=["a-sw1", "b-sw1", "c-sw1"])
+        }
+        self.assertEqual(days, {
+            ("a-sw1", 9): (1, 2 * self.HOUR),
+            ("a-sw1", 10): (0, self.HOUR),
+            ("a-sw1", 12): (3, 3 * self.HOUR),
+            ("b-sw1", 5): (1, 86400),
+            ("b-sw1", 20): (1, self.HOUR),
+            ("b-sw1", 21): (0, 2 * self.HOUR),
+            # Ongoing: counted, its downtime is swept when read
+            ("c-sw1", 19): (1, 0),
+        })
+
+    def test_host_summary(self):
+        for rollups in (self.filters.rollups, None):
+            with self.subTest(rollups=rollups is not None):
+                host_details, _ = get_host_summary(
+                    self.filters.events, self.start_time, self.end_time,
+                    rollups, self.filters.outages,
+                )
+                self.assertEqual(
+                    {host["name"]: host["duration"].total_seconds() for host in host_details},
+                    {name: self.EXPECTED[name] for name in ("a-sw1", "b-sw1", "c-sw1")},
+                )
+
+
+class RollupTests(TestCase):
+    """
+    DailyHostDowntime after every way events are written, against the
+    events themselves: the rollup recomputed from scratch, and per host the
+    merged downtime of its closed outages swept directly.
+    """
+
+    def setUp(self):
+        self.worksheet = SyntheticWorksheet(300, seed=5, hosts=15, days=20)
+        sync_network_events_from_google_sheet(worksheet=self.worksheet)
+
+    def assertRollupMatchesEvents(self):
+        rows = NetworkEvent.objects.values_list(
+            "name", "type", "region", "down_time", "up_time", "reason"
+        )
+        expected = {
+            key: (count, int(seconds), dict(reasons))
+            for key, (count, seconds, reasons) in DailyHostDowntime.compute_buckets(rows).items()
+        }
+        actual = {
+            (row.name, row.type, row.region, row.day): (
+                row.event_count, row.downtime_seconds, row.reasons
+            )
+            for row in DailyHostDowntime.objects.all()
+        }
+        self.assertEqual(actual, expected)
+
+        closed = NetworkEvent.objects.filter(up_time__isnull=False)
+        start = min(closed.values_list("down_time", flat=True))
+        end = max(closed.values_list("up_time", flat=True))
+        swept = merged_downtime_by_host(closed, start, end)
+        per_host = Counter()
+        for row in DailyHostDowntime.objects.all():
+            per_host[row.name] += row.downtime_seconds
+        for name, seconds in swept.items():
+            # Each day's seconds are truncated on their own
+            self.assertAlmostEqual(per_host[name], seconds, delta=20, msg=name)
+
+    def test_sheet_sync(self):
+        self.assertRollupMatchesEvents()
+        # Longer outages, over more days, and one no longer ongoing
+        header, *rows = self.worksheet.rows
+        up = header.index("Up Time")
+        for row in rows[::25]:
+            row[up] = "12/31/2025 10:00:00"
+        sync_network_events_from_google_sheet(worksheet=self.worksheet)
+        self.assertRollupMatchesEvents()
+
+    def test_save_and_delete(self):
+        event = NetworkEvent.objects.filter(up_time__isnull=False).first()
+        event.up_time += timedelta(days=3)
+        event.save()
+        self.assertRollupMatchesEvents()
+        # Moved to another host
+        event.name = "moved-sw1"
+        event.save()
+        self.assertRollupMatchesEvents()
+        ongoing = NetworkEvent.objects.filter(up_time__isnull=True).first()
+        ongoing.up_time = ongoing.down_time + timedelta(hours=30)
+        ongoing.save()
+        self.assertRollupMatchesEvents()
+        event.delete()
+        self.assertRollupMatchesEvents()
+
+    def test_bulk_upsert(self):
+        events = list(NetworkEvent.objects.order_by("pk")[:40].values(
+            "name", "down_time", "up_time", "date", "type", "region", "reason",
+            "solar", "remarks", "category", "down_count",
+        ))
+        for event in events:
+            event["up_time"] = (event["up_time"] or event["down_time"]) + timedelta(days=2)
+        start = timezone.make_aware(datetime(2025, 4, 20))
+        events += [event_row("new-sw1", start + timedelta(hours=hour)) for hour in range(0, 60, 7)]
+        NetworkEvent.bulk_create_or_update_events(events)
+        self.assertRollupMatchesEvents()
+
+    def test_admin_delete(self):
+        model_admin = admin.site._registry[NetworkEvent]
+        pks = list(NetworkEvent.objects.order_by("pk").values_list("pk", flat=True)[::5])
+        model_admin.delete_queryset(None, NetworkEvent.objects.filter(pk__in=pks))
+        self.assertEqual(NetworkEvent.objects.count(), 300 - len(pks))
+        self.assertRollupMatchesEvents()
+
+    def test_rebuild(self):
+        DailyHostDowntime.objects.filter(day__day__lt=10).delete()
+        DailyHostDowntime.objects.update(downtime_seconds=1)
+        call_command("rebuild_rollups", stdout=io.StringIO())
+        self.assertRollupMatchesEvents()
+
+
+class SearchIndexMixin:
+    def setUp(self):
+        start = timezone.make_aware(datetime(2025, 6, 1))
+        NetworkEvent(**event_row("mhetauda-sw8", start, reason="Fiber Breakage")).save()
+        NetworkEvent.bulk_create_or_update_events([
+            event_row("mdharan-mpls2", start, reason="UPS Issue", remarks="Battery swapped"),
+            event_row("mdharan-sw3", start, reason="Link Flap"),
+        ])
+
+    def search(self, text, columns=("name", "reason", "remarks")):
+        self.assertIndexMatchesEvents()
+        return set(
+            search_events(NetworkEvent.objects.all(), text, columns)
+            .values_list("name", flat=True)
+        )
+
+    def assertIndexMatchesEvents(self):
+        # Compares the index with the event table; raises if they differ
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('integrity-check', 1)")
+
+
+class SearchIndexTests(SearchIndexMixin, TestCase):
+    """The FTS5 index follows every write path."""
+
+    def test_insert(self):
+        self.assertEqual(self.search("mhetauda sw"), {"mhetauda-sw8"})
+        self.assertEqual(self.search("mdharan"), {"mdharan-mpls2", "mdharan-sw3"})
+        self.assertEqual(self.search("batt"), {"mdharan-mpls2"})
+        # Only in the searched columns
+        self.assertEqual(self.search("batt", columns=("name",)), set())
+
+    def test_update(self):
+        event = NetworkEvent.objects.get(name="mhetauda-sw8")
+        event.reason = "Power Issue"
+        event.save()
+        self.assertEqual(self.search("fiber"), set())
+        self.assertEqual(self.search("power"), {"mhetauda-sw8"})
+
+    def test_bulk_update_and_queryset_update(self):
+        events = list(NetworkEvent.objects.filter(name__startswith="mdharan"))
+        for event in events:
+            event.reason = "CT Line Issue"
+        NetworkEvent.objects.bulk_update(events, ["reason"])
+        self.assertEqual(self.search("ct line"), {"mdharan-mpls2", "mdharan-sw3"})
+        self.assertEqual(self.search("flap"), set())
+        NetworkEvent.objects.filter(name="mdharan-sw3").update(remarks="Team dispatched")
+        self.assertEqual(self.search("dispatch"), {"mdharan-sw3"})
+
+    def test_delete(self):
+        NetworkEvent.objects.get(name="mhetauda-sw8").delete()
+        NetworkEvent.objects.filter(name="mdharan-sw3").delete()
+        self.assertEqual(self.search("m"), {"mdharan-mpls2"})
+
+    def test_admin_search(self):
+        model_admin = admin.site._registry[NetworkEvent]
+        request = RequestFactory().get("/admin/base/networkevent/")
+        queryset, may_have_duplicates = model_admin.get_search_results(
+            request, NetworkEvent.objects.all(), "mdharan ups"
+        )
+        self.assertFalse(may_have_duplicates)
+        self.assertEqual(set(queryset.values_list("name", flat=True)), {"mdharan-mpls2"})
+        queryset, _ = model_admin.get_search_results(request, NetworkEvent.objects.all(), "  ")
+        self.assertEqual(queryset.count(), 3)
+
+
+
+class SearchIndexMigrateTests(SearchIndexMixin, TransactionTestCase):
+    """
+    The index is rebuilt after migrate. Committed: rolling back DDL on the
+    FTS5 table at the end of a TestCase would leave it inconsistent.
+    """
+
+    def test_post_migrate_restores_the_index(self):
+        # As a table rebuild in a later migration leaves it: no triggers
+        with connection.cursor() as cursor:
+            for suffix in ("ai", "ad", "au"):
+                cursor.execute(f"DROP TRIGGER {FTS_TABLE}_{suffix}")
+        NetworkEvent.objects.filter(name="mdharan-sw3").update(reason="Power")
+        emit_post_migrate_signal(verbosity=0, interactive=False, db="default")
+        self.assertEqual(self.search("power"), {"mdharan-sw3"})
+        NetworkEvent(**event_row("new-sw1", timezone.now(), reason="Power")).save()
+        self.assertEqual(self.search("power"), {"mdharan-sw3", "new-sw1"})
+
+        # Or no index at all: searches fall back to substring matches
+        drop_search_index(connection)
+        self.assertFalse(search_available())
+        self.assertEqual(
+            set(search_events(NetworkEvent.objects.all(), "dharan-sw", ["name"])
+                .values_list("name", flat=True)),
+            {"mdharan-sw3"},
+        )
+        emit_post_migrate_signal(verbosity=0, interactive=False, db="default")
+        self.assertTrue(search_available())
+        self.assertEqual(self.search("mhetauda"), {"mhetauda-sw8"})
+
+
+class DedupKeyTests(TestCase):
+    ROW = {
+        "name": "mhetauda-sw8", "down_time": datetime(2025, 6, 1, 4, 15, tzinfo=dt_timezone.utc),
+        "up_time": None, "date": "18th Jestha", "type": "Switch", "region": "Central",
+        "reason": "Power Issue", "solar": "FALSE", "remarks": "", "category": "Power",
+        "down_count": 0,
+    }
+    # The keys as first stored; changing dedup_keys changes every stored one
+    UNIQUE_KEY = 500213831707050268
+    BASE_KEY = 8159368988062666491
+
+    def test_pinned_keys(self):
+        values = [self.ROW[field] for field in NetworkEvent.UNIQUE_HASH_FIELDS]
+        self.assertEqual(dedup_keys([values]), [self.UNIQUE_KEY])
+        # Text normalized, the instant in any zone
+        local = timezone.localtime(self.ROW["down_time"])
+        self.assertEqual(
+            dedup_keys([[" MHETAUDA-SW8", local, "switch ", "CENTRAL"]]), [self.BASE_KEY]
+        )
+
+    def test_upsert_stores_the_keys(self):
+        NetworkEvent.bulk_create_or_update_events([self.ROW])
+        self.assertEqual(
+            NetworkEvent.objects.values_list("unique_hash", "base_hash").get(),
+            (self.UNIQUE_KEY, self.BASE_KEY),
+        )
+        event = NetworkEvent.objects.get()
+        event.save()
+        self.assertEqual(event.unique_hash, self.UNIQUE_KEY)
+
+    def test_migration_copy(self):
+        migration = importlib.import_module("base.migrations.0015_compact_dedup_keys")
+        rows = [
+            [self.ROW[field] for field in NetworkEvent.UNIQUE_HASH_FIELDS],
+            [" A ", None, datetime(2025, 1, 1), 5, ""],
+        ]
+        self.assertEqual(migration.dedup_keys(rows), dedup_keys(rows))
+
+
+class CompactDedupKeysMigrationTests(TransactionTestCase):
+    """Migration 0015, forwards, backwards and on colliding events."""
+
+    BEFORE = "0014_host"
+
+    def setUp(self):
+        start = timezone.make_aware(datetime(2025, 6, 1))
+        NetworkEvent.bulk_create_or_update_events(
+            event_row(f"host-sw{number}", start + timedelta(hours=number), reason=reason)
+            for number, reason in enumerate(["Power", "Fiber Issue", "", "UPS Issue"])
+        )
+        self.keys = dict(NetworkEvent.objects.values_list("pk", "unique_hash"))
+        self.migration = importlib.import_module("base.migrations.0015_compact_dedup_keys")
+        # Whatever happens, leave the database migrated, with its search index
+        self.addCleanup(call_command, "migrate", "base", verbosity=0)
+
+    def old_model(self):
+        state = MigrationExecutor(connection).loader.project_state(("base", self.BEFORE))
+        return state.apps.get_model("base", "NetworkEvent")
+
+    def test_backwards_and_forwards(self):
+        call_command("migrate", "base", self.BEFORE, verbosity=0)
+        fields = self.migration.UNIQUE_HASH_FIELDS
+        for event in self.old_model().objects.all():
+            values = [getattr(event, field) for field in fields]
+            self.assertEqual(event.unique_hash, self.migration._old_hash(values))
+            self.assertEqual(
+                event.base_hash,
+                self.migration._old_hash([event.name, event.down_time, event.type, event.region]),
+            )
+        call_command("migrate", "base", verbosity=0)
+        self.assertEqual(dict(NetworkEvent.objects.values_list("pk", "unique_hash")), self.keys)
+
+    def test_colliding_events_stop_the_migration(self):
+        call_command("migrate", "base", self.BEFORE, verbosity=0)
+        OldNetworkEvent = self.old_model()
+        original = OldNetworkEvent.objects.order_by("pk").first()
+        # The same outage once more, hashed apart under the old scheme
+        original.pk, original.unique_hash = None, "f" * 64
+        original.save()
+        first_pk = min(self.keys)
+        with self.assertRaisesMessage(RuntimeError, f"pks {first_pk} and {original.pk}"):
+            call_command("migrate", "base", verbosity=0)
+        # Nothing was deleted, and the database is still before 0015
+        self.assertEqual(OldNetworkEvent.objects.count(), len(self.keys) + 1)
+        OldNetworkEvent.objects.filter(pk=original.pk).delete()
+        call_command("migrate", "base", verbosity=0)
+        self.assertEqual(dict(NetworkEvent.objects.values_list("pk", "unique_hash")), self.keys)
+
+
+class BucketTests(SimpleTestCase):
+    """Chart buckets: the unit picked for a window, and the edges it gets."""
+
+    START = timezone.make_aware(datetime(2025, 6, 10, 13, 30))
+    # Window length: (unit, buckets, first label, last label)
+    CASES = [
+        (timedelta(hours=39), (HOUR, 40, "2025-06-10 13:00", "2025-06-12 04:00")),
+        # 41 hours once floored to 13:00, so days
+        (timedelta(hours=40), (DAY, 3, "2025-06-10", "2025-06-12")),
+        (timedelta(days=39), (DAY, 40, "2025-06-10", "2025-07-19")),
+        # Weeks from the Sunday before
+        (timedelta(days=40), (WEEK, 7, "2025-06-08", "2025-07-20")),
+        (timedelta(days=270), (WEEK, 39, "2025-06-08", "2026-03-01")),
+        (timedelta(days=280), (BS_MONTH, 11, "Jestha 2082", "Chaitra 2082")),
+        # BS months however many it takes
+        (timedelta(days=1900), (BS_MONTH, 64, "Jestha 2082", "Bhadra 2087")),
+    ]
+
+    def test_unit_selection(self):
+        for length, expected in self.CASES:
+            with self.subTest(length=length):
+                buckets = buckets_for(self.START, self.START + length)
+                self.assertEqual(
+                    (buckets.unit, len(buckets), buckets.labels[0], buckets.labels[-1]), expected
+                )
+                if buckets.unit != BS_MONTH:
+                    self.assertLessEqual(len(buckets), MAX_POINTS)
+
+    def test_edges(self):
+        for length, _ in self.CASES:
+            end = self.START + length
+            buckets = buckets_for(self.START, end)
+            edges = [timezone.localtime(edge) for edge in buckets.edges]
+            with self.subTest(unit=buckets.unit, length=length):
+                self.assertLessEqual(edges[0], self.START)
+                self.assertLess(self.START, edges[1])
+                self.assertLessEqual(edges[-2], end)
+                self.assertLess(end, edges[-1])
+                for edge, next_edge in zip(edges, edges[1:]):
+                    if buckets.unit == HOUR:
+                        self.assertEqual((edge.minute, edge.second), (0, 0))
+                        self.assertEqual(next_edge - edge, timedelta(hours=1))
+                        continue
+                    # Local midnights, where the rollup's days start
+                    self.assertEqual(edge, DailyHostDowntime.day_start(edge.date()))
+                    if buckets.unit == DAY:
+                        self.assertEqual(next_edge - edge, timedelta(days=1))
+                    elif buckets.unit == WEEK:
+                        self.assertEqual(edge.strftime("%A"), "Sunday")
+                        self.assertEqual(next_edge - edge, timedelta(days=7))
+                    else:
+                        bs_date = nepali_calendar.to_bs(edge.date())
+                        self.assertEqual(bs_date.day, 1)
+                        self.assertEqual(
+                            next_edge.date() - edge.date(),
+                            timedelta(days=nepali_calendar.days_in_month(*bs_date[:2])),
+                        )
+
+    def test_rollup_days_fall_in_one_bucket(self):
+        for length in (timedelta(days=30), timedelta(days=100), timedelta(days=400)):
+            buckets = buckets_for(self.START, self.START + length)
+            day = timezone.localtime(self.START).date()
+            with self.subTest(unit=buckets.unit):
+                while day <= timezone.localtime(self.START + length).date():
+                    last_moment = (
+                        DailyHostDowntime.day_start(day + timedelta(days=1)) - timedelta.resolution
+                    )
+                    self.assertEqual(buckets.index(day), buckets.index(DailyHostDowntime.day_start(day)))
+                    self.assertEqual(buckets.index(day), buckets.index(last_moment), day)
+                    day += timedelta(days=1)
+
+
+class BucketExpressionTests(TestCase):
+    """The SQL CASE sorts events into the buckets Buckets.index puts them in."""
+
+    def test_expression_matches_index(self):
+        start = timezone.make_aware(datetime(2025, 6, 10, 13, 30))
+        for length in (timedelta(hours=30), timedelta(days=30), timedelta(days=200), timedelta(days=400)):
+            buckets = buckets_for(start, start + length)
+            # Both sides of every edge, and the middle of every bucket
+            times = [start]
+            for edge, next_edge in zip(buckets.edges, buckets.edges[1:]):
+                times += [edge, next_edge - timedelta.resolution, edge + (next_edge - edge) / 2]
+            times = [time for time in times if start <= time <= start + length]
+            NetworkEvent.objects.all().delete()
+            NetworkEvent.bulk_create_or_update_events(
+                [event_row(f"h{i}-sw1", time) for i, time in enumerate(times)]
+            )
+            with self.subTest(unit=buckets.unit):
+                rows = NetworkEvent.objects.values_list(
+                    "down_time", buckets.expression("down_time")
+                )
+                self.assertEqual(len(rows), len(times))
+                for down_time, bucket in rows:
+                    self.assertEqual(bucket, buckets.index(down_time), down_time)
+
+
+class BucketChartTests(TransactionTestCase):
+    """
+    A host's downtime bars from the daily rollup (no text search) and from
+    its outages split at the bucket edges (with one) agree, for weeks and
+    BS months as for days: the rollup's days never straddle a bucket edge.
+    """
+
+    WINDOWS = {
+        WEEK: {"start_date": "2025-05-01", "end_date": "2025-08-01"},
+        BS_MONTH: {"start_date": "2025-05-01", "end_date": "2026-05-01"},
+    }
+
+    def setUp(self):
+        cache.clear()
+        at = lambda *args: timezone.make_aware(datetime(2025, *args))  # noqa: E731
+        patcher = mock.patch("django.utils.timezone.now", return_value=at(12, 1))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        NetworkEvent.bulk_create_or_update_events([
+            # Across the window start
+            event_row("alpha-sw1", at(4, 30, 20), at(5, 1, 4)),
+            # Across Sunday 15 June, and one overlapping it
+            event_row("alpha-sw1", at(6, 14, 22), at(6, 15, 3)),
+            event_row("alpha-sw1", at(6, 15, 1), at(6, 15, 6, 30)),
+            # Across 1st Shrawan 2082 (17 July), over several days
+            event_row("alpha-sw1", at(7, 16, 22), at(7, 18, 5, 15)),
+            event_row("beta-sw1", at(5, 14, 23), at(5, 15, 1)),
+            event_row("beta-sw1", at(7, 31, 23, 30), at(8, 2, 2)),
+        ])
+
+    def get(self, path, window, search):
+        params = {**window, **({"name": "sw1"} if search else {})}
+        response = self.client.get(path, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_rollup_and_sweep_agree(self):
+        for unit, window in self.WINDOWS.items():
+            for host in Host.objects.all():
+                with self.subTest(unit=unit, host=host.name):
+                    path = f"/api/host/{host.pk}/charts/"
+                    rollup, sweep = self.get(path, window, False), self.get(path, window, True)
+                    self.assertEqual(rollup["bucket"], unit)
+                    self.assertEqual(rollup, sweep)
+                    self.assertTrue(any(rollup["daily_bar"]["data"]))
+
+
+class BSDateTests(TestCase):
+    """
+    The stored Bikram Sambat date of an event's local down day, as
+    nepali_datetime converts it, from every write path and the 0012
+    backfill; and the month view grouping events by it.
+    """
+
+    # Around 1st Shrawan 2082 (17 July 2025 AD) and 1st Baisakh 2082 (14
+    # April 2025 AD); given in UTC, 18:15 is local midnight
+    UTC_TIMES = [
+        datetime(2025, 6, 20, 6, tzinfo=dt_timezone.utc),
+        datetime(2025, 7, 16, 18, 14, 59, tzinfo=dt_timezone.utc),
+        datetime(2025, 7, 16, 18, 15, tzinfo=dt_timezone.utc),
+        datetime(2025, 7, 17, 18, 14, 59, tzinfo=dt_timezone.utc),
+        datetime(2025, 4, 13, 18, 14, 59, tzinfo=dt_timezone.utc),
+        datetime(2025, 4, 13, 18, 15, tzinfo=dt_timezone.utc),
+        # A Gregorian new year that's already 1st January locally
+        datetime(2024, 12, 31, 20, tzinfo=dt_timezone.utc),
+    ]
+
+    def setUp(self):
+        NetworkEvent.bulk_create_or_update_events(
+            [event_row(f"h{i}-sw1", down_time) for i, down_time in enumerate(self.UTC_TIMES)]
+        )
+
+    def expected(self, down_time):
+        bs_date = nepali_datetime.date.from_datetime_date(timezone.localtime(down_time).date())
+        return bs_date.year, bs_date.month, bs_date.day
+
+    def assertStoredDatesMatch(self):
+        rows = NetworkEvent.objects.values_list("down_time", "bs_year", "bs_month", "bs_day")
+        self.assertEqual(len(rows), len(self.UTC_TIMES))
+        for down_time, *bs_date in rows:
+            self.assertEqual(tuple(bs_date), self.expected(down_time), down_time)
+
+    def test_boundaries(self):
+        self.assertEqual(
+            [self.expected(down_time) for down_time in self.UTC_TIMES],
+            [(2082, 3, 6), (2082, 3, 32), (2082, 4, 1), (2082, 4, 1),
+             (2081, 12, 31), (2082, 1, 1), (2081, 9, 17)],
+        )
+
+    def test_bulk_upsert(self):
+        self.assertStoredDatesMatch()
+
+    def test_save(self):
+        for event in NetworkEvent.objects.all():
+            event.down_time += timedelta(days=15)
+            event.save()
+        self.assertStoredDatesMatch()
+
+    def test_out_of_range(self):
+        event = NetworkEvent.objects.first()
+        event.down_time = timezone.make_aware(datetime(1900, 1, 1))
+        event.save()
+        event.refresh_from_db()
+        self.assertEqual((event.bs_year, event.bs_month, event.bs_day), (None, None, None))
+
+    def test_migration_backfill(self):
+        migration = importlib.import_module("base.migrations.0012_networkevent_bs_date")
+        NetworkEvent.objects.update(bs_year=None, bs_month=None, bs_day=None)
+        migration.backfill_bs_date(django_apps, None)
+        self.assertStoredDatesMatch()
+
+    def test_monthly_view(self):
+        window = {"start_date": "2025-01-01", "end_date": "2025-12-31"}
+        response = self.client.get("/monthview/", {**window, "year": 2082})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["years"], [2081, 2082])
+        self.assertEqual(response.context["calendar_data"]["day_counts"], {
+            "Baisakh": {1: 1}, "Aasar": {6: 1, 32: 1}, "Shrawan": {1: 2},
+        })
+        self.assertIn(("Shrawan", 2), response.context["months"])
+        # The latest month with events, unless one is asked for
+        self.assertEqual(response.context["selected_month"], "Shrawan")
+        self.assertEqual(len(response.context["events"]), 2)
+
+        response = self.client.get("/monthview/", {**window, "year": 2082, "month": "aasar", "day": 32})
+        self.assertEqual(
+            [timezone.localtime(event.down_time) for event in response.context["events"]],
+            [timezone.localtime(self.UTC_TIMES[1])],
+        )
+
+
+class NepaliCalendarTests(SimpleTestCase):
+    """base.nepali_calendar against nepali_datetime, over its whole range."""
+
+    def test_months(self):
+        for year in range(nepali_calendar.MIN_BS_YEAR, nepali_calendar.MAX_BS_YEAR + 1):
+            for month in range(1, 13):
+                start = nepali_datetime.date(year, month, 1).to_datetime_date()
+                next_year, next_month = divmod(year * 12 + month, 12)
+                next_start = nepali_datetime.date(next_year, next_month + 1, 1).to_datetime_date()
+                with self.subTest(year=year, month=month):
+                    self.assertEqual(nepali_calendar.to_ad(year, month, 1), start)
+                    self.assertEqual(
+                        nepali_calendar.days_in_month(year, month), (next_start - start).days
+                    )
+                    self.assertEqual(
+                        nepali_calendar.month_range(year, month),
+                        (start, next_start - timedelta(days=1)),
+                    )
+
+    def test_every_day(self):
+        day = nepali_calendar.MIN_AD_DATE
+        while day <= nepali_calendar.MAX_AD_DATE:
+            bs_date = nepali_datetime.date.from_datetime_date(day)
+            expected = (bs_date.year, bs_date.month, bs_date.day)
+            # One assertion per day would drown a failure in subtests
+            if nepali_calendar.to_bs(day) != expected or nepali_calendar.to_ad(*expected) != day:
+                self.fail(f"{day} is {expected} in nepali_datetime, {nepali_calendar.to_bs(day)} here")
+            day += timedelta(days=1)
+
+    def test_range(self):
+        first, last = nepali_calendar.MIN_AD_DATE, nepali_calendar.MAX_AD_DATE
+        last_month_days = nepali_calendar.days_in_month(nepali_calendar.MAX_BS_YEAR, 12)
+        self.assertEqual(nepali_calendar.to_bs(first), (nepali_calendar.MIN_BS_YEAR, 1, 1))
+        self.assertEqual(
+            nepali_calendar.to_bs(last), (nepali_calendar.MAX_BS_YEAR, 12, last_month_days)
+        )
+        out_of_range = [
+            (nepali_calendar.to_bs, first - timedelta(days=1)),
+            (nepali_calendar.to_bs, last + timedelta(days=1)),
+            (nepali_calendar.to_ad, nepali_calendar.MIN_BS_YEAR - 1, 12, 1),
+            (nepali_calendar.to_ad, nepali_calendar.MAX_BS_YEAR + 1, 1, 1),
+            (nepali_calendar.to_ad, 2082, 13, 1),
+            (nepali_calendar.to_ad, 2082, 1, 0),
+            (nepali_calendar.to_ad, 2082, 1, nepali_calendar.days_in_month(2082, 1) + 1),
+            (nepali_calendar.month_range, nepali_calendar.MAX_BS_YEAR + 1, 1),
+            (nepali_calendar.days_in_month, 2082, 0),
+            (nepali_calendar.year_start, nepali_calendar.MIN_BS_YEAR - 1),
+        ]
+        for function, *args in out_of_range:
+            with self.subTest(function=function.__name__, args=args):
+                with self.assertRaises(ValueError):
+                    function(*args)
+
+
+class ExportTests(TestCase):
+    """
+    The CSV and XLSX downloads, streamed in chunks by WSGI and ASGI alike:
+    under ASGI as an async stream, not read into a list first.
+    """
+
+    EVENTS = 25
+
+    def setUp(self):
+        start = timezone.make_aware(datetime(2025, 6, 1))
+        NetworkEvent.bulk_create_or_update_events([
+            event_row(f"h{i}-sw1", start + timedelta(hours=i), start + timedelta(hours=i, minutes=30))
+            for i in range(self.EVENTS)
+        ])
+        patcher = mock.patch("base.exports.EXPORT_CHUNK_SIZE", 10)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_wsgi(self):
+        response = self.client.get("/export/events/")
+        self.assertFalse(response.is_async)
+        chunks = list(response.streaming_content)
+        # The header with the first ten rows, ten more, and the last five
+        self.assertEqual(len(chunks), 3)
+        rows = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+        self.assertEqual(len(rows), self.EVENTS + 1)
+
+    async def test_asgi(self):
+        wsgi_content = b"".join(await sync_to_async(
+            lambda: list(self.client.get("/export/events/").streaming_content)
+        )())
+        response = await self.async_client.get("/export/events/")
+        self.assertTrue(response.is_async)
+        self.assertEqual(b"".join([chunk async for chunk in response.streaming_content]), wsgi_content)
+
+        response = await self.async_client.get("/export/events/", {"format": "xlsx"})
+        self.assertTrue(response.is_async)
+        content = b"".join([chunk async for chunk in response.streaming_content])
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            sheet = archive.read("xl/worksheets/sheet1.xml")
+        self.assertEqual(sheet.count(b"<row>"), self.EVENTS + 1)
+
+    async def test_asgi_sends_chunks_as_they_are_read(self):
+        read = []
+
+        def rows():
+            for i in range(self.EVENTS):
+                read.append(i)
+                yield [i]
+
+        response = streaming_export(AsyncRequestFactory().get("/"), ["n"], rows(), "csv", "n")
+        chunks = aiter(response.streaming_content)
+        self.assertEqual(await anext(chunks), ("n\r\n" + "".join(f"{i}\r\n" for i in range(10))).encode())
+        self.assertEqual(len(read), 10)
+        await chunks.aclose()
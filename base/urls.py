@@ -4,11 +4,18 @@ from . import views
 
 urlpatterns = [
     path("", views.display, name="index"),
-    path('host/<str:pk>/', views.per_host_details, name='host-details'),
+    path('host/<int:pk>/', views.per_host_details, name='host-details'),
+    path("host/<str:encoded_name>/", views.legacy_host_details),
+    path("api/host-summary/", views.host_summary_api, name="api-host-summary"),
+    path("api/dashboard/", views.dashboard_charts_api, name="api-dashboard"),
     path('api/aggregate-uptime/', views.aggregate_uptime_api, name='api-aggregate-uptime'),
-    path("api/host/<str:pk>/charts/", views.host_all_charts_api, name="host-charts"),
+    path("api/host/<int:pk>/charts/", views.host_all_charts_api, name="host-charts"),
     path("daily_event_trend_api/", views.daily_event_trend_api, name="daily_event_trend_api"),
     path('sync-events/', views.sync_page_view, name='sync_page'),
     path('monthview/', views.monthly_view, name='monthview'),
+    path("export/events/", views.export_events, name="export-events"),
+    path("export/hosts/", views.export_host_summary, name="export-hosts"),
+    path("live/events/", views.live_events, name="live-events"),
+    path("metrics", views.metrics_view, name="metrics"),
    
 ]
@@ -1,8 +1,14 @@
 # In your utils.py
 import datetime
+import hashlib
 import re  # <--- NEW: Import regular expression library
-from nepali_datetime import date as NepaliDate
-from nepali_datetime import datetime as NepaliDateTime
+from collections import Counter, defaultdict
+from functools import lru_cache
+
+from django.db.models import Q
+from django.utils import timezone
+
+from . import nepali_calendar
 
 BS_MONTH_MAP = {
     "baisakh": 1, "jestha": 2, "ashadh": 3, "shrawan": 4, "bhadra": 5,
@@ -21,6 +27,36 @@ AD_MONTH_MAP = {
 }
 
 
+def bs_date_parts(value):
+    """(year, month, day) in Bikram Sambat of a datetime's local date, or Nones."""
+    if value is None:
+        return None, None, None
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    try:
+        return tuple(nepali_calendar.to_bs(value.date()))
+    except ValueError:
+        # Outside the calendar's range (a mistyped year)
+        return None, None, None
+
+
+def bs_month_days(year):
+    """Number of days in each month (1-12) of a BS year."""
+    return nepali_calendar.month_days(year)
+
+
+def current_bs_year():
+    return nepali_calendar.to_bs(timezone.localdate()).year
+
+
+def default_time_range():
+    """From 1st Baisakh of the current BS year until now, in local time."""
+    start_ad_date = nepali_calendar.year_start(current_bs_year())
+    start_time = datetime.datetime.combine(start_ad_date, datetime.time.min)
+    end_time = timezone.localtime().replace(tzinfo=None, microsecond=0)
+    return start_time, end_time
+
+
 def get_time_range(request):
     start_date_ad_str = request.GET.get("start_date")
     end_date_ad_str = request.GET.get("end_date")
@@ -50,14 +86,12 @@ def get_time_range(request):
                 month_name = parts[0]
                 if month_name in BS_MONTH_MAP:
                     bs_month_num = BS_MONTH_MAP[month_name]
-                    current_bs_year = NepaliDate.today().year
-                    days_in_month = NepaliDate.get_days_in_month(current_bs_year, bs_month_num)
-                    start_bs = NepaliDate(current_bs_year, bs_month_num, 1)
-                    end_bs = NepaliDate(current_bs_year, bs_month_num, days_in_month)
-                    start_ad_date, end_ad_date = start_bs.to_gregorian(), end_bs.to_gregorian()
+                    start_ad_date, end_ad_date = nepali_calendar.month_range(
+                        current_bs_year(), bs_month_num
+                    )
                 elif month_name in AD_MONTH_MAP:
                     ad_month_num = AD_MONTH_MAP[month_name]
-                    current_ad_year = datetime.date.today().year
+                    current_ad_year = timezone.localdate().year
                     # To get last day of month, go to first of next month and subtract one day
                     next_month = ad_month_num % 12 + 1
                     next_year = current_ad_year if ad_month_num != 12 else current_ad_year + 1
@@ -82,12 +116,12 @@ def get_time_range(request):
 
                     if month_name in BS_MONTH_MAP:
                         bs_month_num = BS_MONTH_MAP[month_name]
-                        current_bs_year = NepaliDate.today().year
-                        target_bs = NepaliDate(current_bs_year, bs_month_num, day_num)
-                        start_ad_date = end_ad_date = target_bs.to_gregorian()
+                        start_ad_date = end_ad_date = nepali_calendar.to_ad(
+                            current_bs_year(), bs_month_num, day_num
+                        )
                     elif month_name in AD_MONTH_MAP:
                         ad_month_num = AD_MONTH_MAP[month_name]
-                        current_ad_year = datetime.date.today().year
+                        current_ad_year = timezone.localdate().year
                         target_ad = datetime.date(current_ad_year, ad_month_num, day_num)
                         start_ad_date = end_ad_date = target_ad
 
@@ -102,172 +136,280 @@ def get_time_range(request):
             return None, None
     
     else:
-        # Default behavior remains the same
-        current_bs_year = NepaliDate.today().year
-        start_bs = NepaliDate(current_bs_year, 1, 1)
-        start_ad_date = start_bs.to_gregorian()
-        start_time = datetime.datetime.combine(start_ad_date, datetime.time.min)
-        end_time = datetime.datetime.now()
-        return start_time, end_time
+        return default_time_range()
 
     return None, None
-from collections import Counter
 
-def find_likely_root_cause(reasons_list, total_down_events=0):
-    if not reasons_list:
-        return "N/A"
+
+def merge_intervals(intervals):
+    """Union of (start, end) intervals: sorted, with overlapping ones merged."""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def merged_downtime_by_host(events, start, end):
+    """
+    Seconds each host was down inside [start, end] for an events queryset.
+
+    Every outage is clipped to the window, ongoing outages count as down
+    until now (or ``end``, if that is earlier), and overlapping outages of
+    the same host are counted once. Runs as one sweep over (name, down_time, up_time) tuples ordered
+    by host id (the (host, down_time) index), so no model instances are built.
+    """
+    rows = (
+        events.filter(down_time__lt=end)
+        .filter(Q(up_time__isnull=True) | Q(up_time__gt=start))
+        .order_by("host_id", "down_time")
+        .values_list("name", "down_time", "up_time")
+        .iterator(chunk_size=2000)
+    )
+    downtime = defaultdict(float)
+    open_end = min(timezone.now(), end)
+    host, outage_start, outage_end = None, None, None
+    for name, down_time, up_time in rows:
+        clipped_start = max(down_time, start)
+        clipped_end = min(up_time, end) if up_time else open_end
+        if clipped_end <= clipped_start:
+            continue
+        if name != host or clipped_start > outage_end:
+            if host is not None:
+                downtime[host] += (outage_end - outage_start).total_seconds()
+            host, outage_start, outage_end = name, clipped_start, clipped_end
+        else:
+            outage_end = max(outage_end, clipped_end)
+    if host is not None:
+        downtime[host] += (outage_end - outage_start).total_seconds()
+    return dict(downtime)
+
+
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+_MICROSECOND = datetime.timedelta(microseconds=1)
+
+
+def _dedup_text(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime.datetime):
+        # The instant, whatever zone the datetime is in
+        if timezone.is_naive(value):
+            value = timezone.make_aware(value)
+        return str((value - _EPOCH) // _MICROSECOND)
+    return str(value).strip().lower()
+
+
+def dedup_keys(rows):
+    """
+    64-bit dedup keys (NetworkEvent.unique_hash/base_hash) for a chunk of
+    value rows: every value is normalized (text stripped and lowercased,
+    datetimes as UTC microseconds), each row is hashed with BLAKE2b to 8
+    bytes, read as a signed integer so it fits a BigIntegerField.
+    """
+    blake2b = hashlib.blake2b
+    from_bytes = int.from_bytes
+    return [
+        from_bytes(
+            blake2b("\x1f".join(map(_dedup_text, row)).encode("utf-8"), digest_size=8).digest(),
+            "big",
+            signed=True,
+        )
+        for row in rows
+    ]
+
+
+# Define reason categories and their root cause priorities
+# Higher priority = more likely to be actual root cause (not symptom)
+REASON_CATEGORIES = {
+    # Power Issues (High Priority - Root Causes)
+    'Power': {'priority': 9, 'reasons': [
+        'Power', 'Power Issue', 'MCB Trip', 'Voltage Issue', 'UPS Hung/Rebooted',
+        'Battery Issue', 'Short circuit', 'Stabilizer Issue', 'UPS Damage', 
+        'UPS Issue', 'Backup issue', 'Power Chord Loose', 'UPS Replacement',
+        'AVR Issue', 'MCB Damage', 'Power Chord Issue', 'Rectifier Issue',
+        'Circuit Breaker OFF', 'Generator not Operated on time', 'Sub-meter Issue'
+    ]},
     
-    # Clean and count reasons
-    clean_reasons = [reason.strip() for reason in reasons_list if reason.strip()]
-    if not clean_reasons:
-        return "Symptom-only (e.g. Reboot)"
+    # Fiber Issues (High Priority - Root Causes)
+    'Fiber': {'priority': 9, 'reasons': [
+        'Fiber Breakage', 'Fiber Burnt', 'Fiber Issue', 'Fiber Losses', 'Patch cord issue',
+        'Cable Issue', 'Fiber Replacement', 'RF Cable Issue', 'Repalced Ethernet cable',
+        'Link down', 'Link Flap', 'CRC Issue', 'Core Damage', 'Ethernet Cable loose',
+        'Plug/Unplug Ethernet Cable', 'Path Issue', 'Losses', 'Ethernet Cable Damage',
+        'Fiber Maintenance', 'ADDS fiber maintanence'
+    ]},
     
-    reason_counts = Counter(clean_reasons)
+    # CT Line Issues (Very High Priority - Infrastructure Root Cause)
+    'CT Line Issue': {'priority': 10, 'reasons': [
+        'CT Line Issue/Backup Drained', 'CT Line Issue', 'CT line outage', 'CT Line Fluctuation'
+    ]},
     
-    # Define reason categories and their root cause priorities
-    # Higher priority = more likely to be actual root cause (not symptom)
-    reason_categories = {
-        # Power Issues (High Priority - Root Causes)
-        'Power': {'priority': 9, 'reasons': [
-            'Power', 'Power Issue', 'MCB Trip', 'Voltage Issue', 'UPS Hung/Rebooted',
-            'Battery Issue', 'Short circuit', 'Stabilizer Issue', 'UPS Damage', 
-            'UPS Issue', 'Backup issue', 'Power Chord Loose', 'UPS Replacement',
-            'AVR Issue', 'MCB Damage', 'Power Chord Issue', 'Rectifier Issue',
-            'Circuit Breaker OFF', 'Generator not Operated on time', 'Sub-meter Issue'
-        ]},
-        
-        # Fiber Issues (High Priority - Root Causes)
-        'Fiber': {'priority': 9, 'reasons': [
-            'Fiber Breakage', 'Fiber Burnt', 'Fiber Issue', 'Fiber Losses', 'Patch cord issue',
-            'Cable Issue', 'Fiber Replacement', 'RF Cable Issue', 'Repalced Ethernet cable',
-            'Link down', 'Link Flap', 'CRC Issue', 'Core Damage', 'Ethernet Cable loose',
-            'Plug/Unplug Ethernet Cable', 'Path Issue', 'Losses', 'Ethernet Cable Damage',
-            'Fiber Maintenance', 'ADDS fiber maintanence'
-        ]},
-        
-        # CT Line Issues (Very High Priority - Infrastructure Root Cause)
-        'CT Line Issue': {'priority': 10, 'reasons': [
-            'CT Line Issue/Backup Drained', 'CT Line Issue', 'CT line outage', 'CT Line Fluctuation'
-        ]},
-        
-        # Device Issues (High Priority - Hardware Root Causes)
-        'Device': {'priority': 8, 'reasons': [
-            'Switch Issue', 'POE device Damage', 'Device Issue', 'Port issue', 
-            'Device Replacement', 'Card Issue', 'chassis issue', 'SFP Issue',
-            'Wireless Device Damage', 'Device Hang', 'Switch Decommissioned',
-            'MUX Issue', 'OLP issue', 'MPLS Issue', 'ATS Issue'
-        ]},
-        
-        # Temperature Issues (High Priority - Environmental Root Cause)
-        'Temperature Issue': {'priority': 8, 'reasons': [
-            'HIgh Temperature', 'Temperature Issue'
-        ]},
-        
-        # Traffic Issues (Medium Priority)
-        'Traffic Issue': {'priority': 6, 'reasons': [
-            'Congestion', 'Traffic Issue', 'Traffic Drop', 'TV issue', 'DTI Traffic Drop',
-            'Upstream issue'
-        ]},
-        
-        # Weather Issues (High Priority - External Root Cause)
-        'Weather': {'priority': 8, 'reasons': [
-            'Manual Down/Weather', 'Weather Unfavourable'
-        ]},
-        
-        # Maintenance (Medium Priority - Planned)
-        'Maintenance': {'priority': 5, 'reasons': [
-            'Working at POP', 'Maintainance', 'Intentional', 'Device Replacement',
-            'Manual Down', 'Maintainance', 'POP Shift', 'Link Upgrade', 'Team Working'
-        ]},
-        
-        # Logical Issues (Medium Priority)
-        'Logical Issue': {'priority': 6, 'reasons': [
-            'Shut/unshut Port', 'Admin Issue', 'Configuration Change', 'Logical Issue',
-            'management issue'
-        ]},
-        
-        # Wireless Issues (Medium Priority)
-        'Wireless': {'priority': 6, 'reasons': [
-            'Configuration Change', 'Radio Rebooted/Soft', 'Wireless Issue'
-        ]},
-        
-        # Symptoms (Low Priority - These are effects, not causes)
-        'Reboot': {'priority': 1, 'reasons': [
-            'Rebooted', 'Manual Reboot', 'Automatic Rebooted'
-        ]},
-        
-        # External/Uncontrollable (Low Priority for filtering)
-        'External': {'priority': 3, 'reasons': [
-            'Pole shifting', 'Road Expansion', 'NEA Working'
-        ]},
-        
-        # Terminated/No Issue (Should be excluded)
-        'Terminated': {'priority': 0, 'reasons': [
-            'Host Removed', 'No need to follow up', 'No Clients', 'Link Decommissioned',
-            'Cannot Optimize'
-        ]},
-        
-        # Provider Issues (Medium Priority)
-        'Provider Issue': {'priority': 7, 'reasons': [
-            'Techmind issue', 'Broadlink issue'
-        ]},
-        
-        # Power Backup Issues (High Priority)
-        'Power Backup': {'priority': 8, 'reasons': [
-            'No Backup', 'Full Solar POP', 'Backup issue'
-        ]},
-        
-        # Unknown (Lowest Priority)
-        'Unknown': {'priority': 0, 'reasons': [
-            'Unknown', 'Unknown'
-        ]}
-    }
+    # Device Issues (High Priority - Hardware Root Causes)
+    'Device': {'priority': 8, 'reasons': [
+        'Switch Issue', 'POE device Damage', 'Device Issue', 'Port issue', 
+        'Device Replacement', 'Card Issue', 'chassis issue', 'SFP Issue',
+        'Wireless Device Damage', 'Device Hang', 'Switch Decommissioned',
+        'MUX Issue', 'OLP issue', 'MPLS Issue', 'ATS Issue'
+    ]},
     
-    # Map each reason to its category and priority
-    reason_to_category = {}
-    for category, info in reason_categories.items():
-        for reason in info['reasons']:
-            reason_to_category[reason.lower()] = {
-                'category': category,
-                'priority': info['priority']
-            }
+    # Temperature Issues (High Priority - Environmental Root Cause)
+    'Temperature Issue': {'priority': 8, 'reasons': [
+        'HIgh Temperature', 'Temperature Issue'
+    ]},
+    
+    # Traffic Issues (Medium Priority)
+    'Traffic Issue': {'priority': 6, 'reasons': [
+        'Congestion', 'Traffic Issue', 'Traffic Drop', 'TV issue', 'DTI Traffic Drop',
+        'Upstream issue'
+    ]},
+    
+    # Weather Issues (High Priority - External Root Cause)
+    'Weather': {'priority': 8, 'reasons': [
+        'Manual Down/Weather', 'Weather Unfavourable'
+    ]},
+    
+    # Maintenance (Medium Priority - Planned)
+    'Maintenance': {'priority': 5, 'reasons': [
+        'Working at POP', 'Maintainance', 'Intentional', 'Device Replacement',
+        'Manual Down', 'Maintainance', 'POP Shift', 'Link Upgrade', 'Team Working'
+    ]},
+    
+    # Logical Issues (Medium Priority)
+    'Logical Issue': {'priority': 6, 'reasons': [
+        'Shut/unshut Port', 'Admin Issue', 'Configuration Change', 'Logical Issue',
+        'management issue'
+    ]},
+    
+    # Wireless Issues (Medium Priority)
+    'Wireless': {'priority': 6, 'reasons': [
+        'Configuration Change', 'Radio Rebooted/Soft', 'Wireless Issue'
+    ]},
+    
+    # Symptoms (Low Priority - These are effects, not causes)
+    'Reboot': {'priority': 1, 'reasons': [
+        'Rebooted', 'Manual Reboot', 'Automatic Rebooted'
+    ]},
+    
+    # External/Uncontrollable (Low Priority for filtering)
+    'External': {'priority': 3, 'reasons': [
+        'Pole shifting', 'Road Expansion', 'NEA Working'
+    ]},
+    
+    # Terminated/No Issue (Should be excluded)
+    'Terminated': {'priority': 0, 'reasons': [
+        'Host Removed', 'No need to follow up', 'No Clients', 'Link Decommissioned',
+        'Cannot Optimize'
+    ]},
+    
+    # Provider Issues (Medium Priority)
+    'Provider Issue': {'priority': 7, 'reasons': [
+        'Techmind issue', 'Broadlink issue'
+    ]},
+    
+    # Power Backup Issues (High Priority)
+    'Power Backup': {'priority': 8, 'reasons': [
+        'No Backup', 'Full Solar POP', 'Backup issue'
+    ]},
     
+    # Unknown (Lowest Priority)
+    'Unknown': {'priority': 0, 'reasons': [
+        'Unknown', 'Unknown'
+    ]}
+}
+
+
+# Each known reason (lower-cased) -> (category, priority). Reasons listed in
+# several categories keep the last one, as the per-call build did.
+REASON_TO_CATEGORY = {
+    reason.lower(): (category, info['priority'])
+    for category, info in REASON_CATEGORIES.items()
+    for reason in info['reasons']
+}
+
+# Candidates for partial matching, highest priority first; the stable sort
+# keeps table order among equal priorities, so the first hit is the same
+# one the old "strictly greater priority wins" scan settled on. Priority 0
+# entries could never win that scan and are left out.
+_PARTIAL_MATCHES = sorted(
+    ((reason, category, priority)
+     for reason, (category, priority) in REASON_TO_CATEGORY.items()
+     if priority > 0),
+    key=lambda item: -item[2],
+)
+
+
+@lru_cache(maxsize=4096)
+def classify_reason(reason):
+    """Return (category, priority) for a single reason string."""
+    reason_lower = reason.lower()
+
+    # First try exact match
+    if reason_lower in REASON_TO_CATEGORY:
+        return REASON_TO_CATEGORY[reason_lower]
+
+    # Try partial matching
+    for mapped_reason, category, priority in _PARTIAL_MATCHES:
+        if mapped_reason in reason_lower or reason_lower in mapped_reason:
+            return category, priority
+
+    # If no match found, treat as unknown
+    return 'Unknown', 0
+
+
+def find_likely_root_cause(reasons_list, total_down_events=0):
+    if not reasons_list:
+        return "N/A"
+    return _root_cause_from_counts(Counter(reasons_list), total_down_events)
+
+
+def find_likely_root_causes(reason_counts_by_host, total_down_events_by_host=None):
+    """
+    Batch version of find_likely_root_cause.
+
+    Takes {host: {reason: count}} (counts in order of first occurrence, e.g.
+    a Counter or a histogram from the database) and returns {host: root cause}.
+    Every distinct reason is classified once for all hosts.
+    """
+    total_down_events_by_host = total_down_events_by_host or {}
+    results = {}
+    for host, reason_counts in reason_counts_by_host.items():
+        if not reason_counts:
+            results[host] = "N/A"
+            continue
+        results[host] = _root_cause_from_counts(
+            reason_counts, total_down_events_by_host.get(host, 0)
+        )
+    return results
+
+
+def _root_cause_from_counts(raw_counts, total_down_events=0):
+    # Clean and count reasons
+    reason_counts = Counter()
+    for reason, count in raw_counts.items():
+        reason = reason.strip()
+        if reason:
+            reason_counts[reason] += count
+    if not reason_counts:
+        return "Symptom-only (e.g. Reboot)"
+
     # Categorize the input reasons
     categorized_reasons = {}
     for reason, count in reason_counts.items():
-        reason_lower = reason.lower()
-        
-        # Find matching category (exact match or partial match)
-        matched_category = None
-        matched_priority = 0
-        
-        # First try exact match
-        if reason_lower in reason_to_category:
-            matched_category = reason_to_category[reason_lower]['category']
-            matched_priority = reason_to_category[reason_lower]['priority']
-        else:
-            # Try partial matching
-            for mapped_reason, info in reason_to_category.items():
-                if mapped_reason in reason_lower or reason_lower in mapped_reason:
-                    if info['priority'] > matched_priority:
-                        matched_category = info['category']
-                        matched_priority = info['priority']
-        
-        # If no match found, treat as unknown
-        if not matched_category:
-            matched_category = 'Unknown'
-            matched_priority = 0
-        
+        matched_category, matched_priority = classify_reason(reason)
+
         if matched_category not in categorized_reasons:
             categorized_reasons[matched_category] = {
                 'count': 0,
                 'priority': matched_priority,
                 'examples': []
             }
-        
+
         categorized_reasons[matched_category]['count'] += count
         categorized_reasons[matched_category]['examples'].append(reason)
-    
+
     # Filter out unknown reasons unless they're the only option
     unknown_categories = {k: v for k, v in categorized_reasons.items() if k == 'Unknown'}
     non_unknown_categories = {k: v for k, v in categorized_reasons.items() if k != 'Unknown'}
@@ -1,152 +1,347 @@
+import asyncio
 import base64
-import datetime
 from collections import Counter, defaultdict
-from datetime import time, timedelta
-import re 
-import json
+from datetime import timedelta
+from functools import partial
+from django.conf import settings
 from django.contrib import messages
-from django.db.models import Count, Q
+from django.core.cache import cache
+from django.db.models import Count, F, Min, OuterRef, Q, Subquery, Sum
 from django.db.models.functions import TruncDate
-from django.http import JsonResponse
-from django.shortcuts import redirect, render
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.shortcuts import aget_object_or_404, get_object_or_404, redirect, render
 from django.urls import reverse
-from django.utils import timezone
-from .utils import find_likely_root_cause 
+from django.utils import formats, timezone
+from .utils import (
+    bs_date_parts,
+    bs_month_days,
+    find_likely_root_cause,
+    find_likely_root_causes,
+    merge_intervals,
+    merged_downtime_by_host,
+)
 from django.views.decorators.csrf import csrf_exempt
 
-from .models import NetworkEvent
+from . import live, metrics, nepali_calendar
+from .buckets import HOUR, buckets_for
+from .cache import cache_key, cached_json_view
+from .concurrency import run_concurrently
+from .exports import (
+    EVENT_EXPORT_COLUMNS,
+    HOST_EXPORT_COLUMNS,
+    event_rows,
+    host_rows,
+    streaming_export,
+)
+from .filters import aget_filters, get_filters
+from .models import DailyHostDowntime, EventNotification, Host, NetworkEvent
+from .pagination import InvalidCursor, decode_cursor, keyset_page
 from .services import sync_network_events_from_google_sheet
 
 
 def get_time_range(request):
-    events = NetworkEvent.objects.all()
-    start_date = request.GET.get("start_date")
-    end_date = request.GET.get("end_date")
+    """The request's reporting window as timezone-aware (start_time, end_time)."""
+    return get_filters(request).time_range
 
-    if start_date and end_date:
-        start_time = datetime.datetime.strptime(start_date, "%Y-%m-%d")
-        end_time = datetime.datetime.strptime(end_date, "%Y-%m-%d")
+
+def get_query(request):
+    """
+    Builds a filtered queryset for NetworkEvent objects based on GET parameters.
+    Resolved once per request and shared by everything that asks for it.
+    """
+    return get_filters(request).events
+
+
+def get_rollup_query(request):
+    """
+    DailyHostDowntime rows matching the request's filters, or None when the
+    text search is used.
+    """
+    return get_filters(request).rollups
+
+
+def get_host_summary(events, start_time, end_time, rollups=None, outages=None):
+    """
+    Per-host rows for the dashboard, aggregated in the database.
+
+    Switch/MPLS events are grouped per host into an event count, downtime
+    inside [start_time, end_time] (overlapping outages counted once), uptime
+    and likely root cause. Downtime is read from ``rollups`` when given,
+    otherwise swept from ``outages``: the events overlapping the window,
+    including ones that went down before it (RequestFilters.outages;
+    defaults to ``events``). Hosts with an ongoing outage are swept either
+    way, since the rollup only holds closed ones. Events of other types are
+    represented by the latest event of each host.
+
+    Returns: (host_details, other_events)
+    """
+    total_seconds = (end_time - start_time).total_seconds()
+
+    device_filter = Q(type__iexact="switch") | Q(type__iexact="mpls")
+    device_events = events.filter(device_filter)
+    other_type_events = events.exclude(device_filter)
+
+    hosts = (
+        device_events.order_by()
+        .values("host_id")
+        .annotate(
+            count=Count("id"),
+            first_type=Subquery(
+                device_events.filter(host_id=OuterRef("host_id"))
+                .order_by("down_time", "pk")
+                .values("type")[:1]
+            ),
+        )
+        .values("host_id", "count", "first_type", name=F("host__name"))
+    )
+
+    device_outages = (events if outages is None else outages).filter(device_filter)
+    if rollups is not None:
+        window_days = (
+            timezone.localtime(start_time).date(),
+            timezone.localtime(end_time).date(),
+        )
+        downtime_per_host = dict(
+            rollups.filter(device_filter, day__range=window_days)
+            .values("name")
+            .annotate(seconds=Sum("downtime_seconds"))
+            .values_list("name", "seconds")
+        )
+        open_downtime, open_types = _open_outage_downtime(device_outages, start_time, end_time)
+        downtime_per_host.update((name, open_downtime.get(name, 0)) for name in open_types)
     else:
-        start_time, end_time = None, None
-        for event in events:
-            if event.date == "1st Baisakh":
-                start_time = event.down_time
-        end_time = datetime.datetime.now().replace(microsecond=0)
+        downtime_per_host = merged_downtime_by_host(device_outages, start_time, end_time)
 
-    if start_time:
-        start_time = datetime.datetime.combine(start_time, time.min)
-    return start_time, end_time
+    host_map = {}
+    for row in hosts:
+        # Rounded: a window ends at 23:59:59.999999, a rollup day at midnight
+        duration = timedelta(seconds=round(downtime_per_host.get(row["name"], 0)))
+        downtime_percent = (duration.total_seconds() / total_seconds) * 100
+        host_map[row["name"]] = {
+            "name": row["name"],
+            "host_id": row["host_id"],
+            "count": row["count"],
+            "duration": duration,
+            "uptime": round(100 - downtime_percent, 2),
+            "type": row["first_type"].lower(),
+        }
 
+    # Reason histogram per host, in order of first occurrence so ties in
+    # find_likely_root_causes resolve the same way as with the raw list.
+    reason_rows = (
+        device_events.order_by()
+        .values("host_id", "reason")
+        .annotate(occurrences=Count("id"), first_seen=Min("down_time"))
+        .order_by("host_id", "first_seen")
+    )
+    reason_counts = defaultdict(Counter)
+    for row in reason_rows:
+        reason_counts[row["host_id"]][row["reason"]] += row["occurrences"]
 
-from django.db.models import Q
+    root_causes = find_likely_root_causes(reason_counts)
+    host_details = list(host_map.values())
+    for host in host_details:
+        host["reason"] = root_causes.get(host["host_id"], "N/A")
 
-from .models import NetworkEvent  # Make sure to import your model
+    host_details = sorted(
+        host_details,
+        key=lambda x: (x["count"], x["duration"], x["uptime"]),
+        reverse=True,
+    )
 
+    latest_ids = (
+        other_type_events.order_by()
+        .values("host_id")
+        .annotate(
+            latest_id=Subquery(
+                other_type_events.filter(host_id=OuterRef("host_id"))
+                .order_by("-down_time", "-pk")
+                .values("pk")[:1]
+            )
+        )
+        .values("latest_id")
+    )
+    other_events = []
+    for i in NetworkEvent.objects.filter(pk__in=latest_ids).with_duration().order_by("down_time"):
+        other_events.append(
+            {
+                "date": i.date,
+                "name": i.name,
+                "host_id": i.host_id,
+                "count": 1,
+                "downtime": i.down_time,
+                "uptime": i.up_time,
+                "duration": i.duration(),
+                "reason": find_likely_root_cause([i.reason]),
+                "type": i.type.lower() if i.type else None,
+            }
+        )
 
-def get_query(request):
+    return host_details, other_events
+
+
+HOST_SUMMARY_PAGE_SIZE = 25
+HOST_SUMMARY_MAX_PAGE_SIZE = 200
+
+# Sort keys for the paginated summary tables. Each ends with the host name,
+# which is unique per table, so every row has a distinct keyset position.
+HOST_SUMMARY_SORTS = {
+    "hosts": {
+        "count": lambda h: (h["count"], h["duration"].total_seconds(), h["uptime"], h["name"]),
+        "duration": lambda h: (h["duration"].total_seconds(), h["count"], h["name"]),
+        "uptime": lambda h: (h["uptime"], h["count"], h["name"]),
+    },
+    "others": {
+        "down_time": lambda e: (e["downtime"].isoformat() if e["downtime"] else "", e["name"]),
+        "duration": lambda e: (e["duration"].total_seconds() if e["duration"] else 0, e["name"]),
+    },
+}
+HOST_SUMMARY_DEFAULT_SORT = {"hosts": ("count", "desc"), "others": ("down_time", "asc")}
+
+
+def get_cached_host_summary(request):
     """
-    Builds a filtered queryset for NetworkEvent objects based on GET parameters.
+    get_host_summary for the request's filters. Cached like the chart APIs,
+    so the dashboard, its paginated API and the export share one computation
+    until the data changes.
     """
-    print("RECEIVED FILTERS:", request.GET)
-    name_query = request.GET.get("name", None)
-    start_date = request.GET.get("start_date", None)
-    end_date = request.GET.get("end_date", None)
-    type_query = request.GET.get("type", None)
-
-    # Start with a clean queryset
-    queryset = NetworkEvent.objects.all()
-
-    # Apply text search filter for name and reason
-    if name_query:
-        # The OR condition should only apply to text-like fields
-        queryset = queryset.filter(
-            Q(name__icontains=name_query)
-            | Q(reason__icontains=name_query)
-            | Q(date__icontains=name_query)
+    key = cache_key(request, "host_summary")
+    summary = cache.get(key)
+    if summary is None:
+        filters = get_filters(request)
+        start_time, end_time = filters.time_range
+        summary = get_host_summary(
+            filters.events, start_time, end_time, filters.rollups, filters.outages
         )
+        cache.set(key, summary, timeout=settings.CHART_CACHE_TIMEOUT)
+    return summary
+
 
-    # Apply date range filters
-    if start_date:
-        queryset = queryset.filter(down_time__date__gte=start_date)
+def host_summary_page(request, kind, cursor=None, sort=None, order=None, limit=None):
+    """
+    One keyset page of the host summary ("hosts") or of the other-type
+    events ("others"). Raises InvalidCursor on a bad cursor.
+    """
+    default_sort, default_order = HOST_SUMMARY_DEFAULT_SORT[kind]
+    sorts = HOST_SUMMARY_SORTS[kind]
+    sort = sort if sort in sorts else default_sort
+    order = order if order in ("asc", "desc") else default_order
+    limit = min(max(limit or HOST_SUMMARY_PAGE_SIZE, 1), HOST_SUMMARY_MAX_PAGE_SIZE)
+
+    host_details, other_events = get_cached_host_summary(request)
+    rows = host_details if kind == "hosts" else other_events
+    page, next_cursor = keyset_page(
+        rows,
+        sorts[sort],
+        cursor=decode_cursor(cursor) if cursor else None,
+        limit=limit,
+        descending=order == "desc",
+    )
+    return {
+        "results": page,
+        "next_cursor": next_cursor,
+        "total": len(rows),
+        "sort": sort,
+        "order": order,
+    }
+
+
+def _format_datetime(value):
+    return formats.date_format(timezone.localtime(value), "DATETIME_FORMAT") if value else ""
+
+
+def _host_row_json(host):
+    return {
+        "name": host["name"],
+        "url": reverse("host-details", kwargs={"pk": host["host_id"]}),
+        "type": host["type"],
+        "count": host["count"],
+        "duration": str(host["duration"]),
+        "duration_seconds": int(host["duration"].total_seconds()),
+        "reason": host["reason"],
+        "uptime": host["uptime"],
+    }
+
+
+def _other_event_row_json(event):
+    return {
+        "date": event["date"],
+        "name": event["name"],
+        "type": event["type"],
+        "down_time": _format_datetime(event["downtime"]),
+        "up_time": _format_datetime(event["uptime"]),
+        "duration": str(event["duration"]) if event["duration"] else "",
+        "reason": event["reason"],
+    }
 
-    if end_date:
-        queryset = queryset.filter(down_time__date__lte=end_date)
 
-    # Apply type filter
-    if type_query:
-        queryset = queryset.filter(type__iexact=type_query)
+def host_summary_api(request):
+    """
+    Paginated host summary for the dashboard tables.
+
+    GET parameters, besides the usual filters:
+      kind    "hosts" (Switch/MPLS summary, default) or "others"
+      sort    hosts: count (default), duration, uptime; others: down_time, duration
+      order   asc or desc
+      limit   rows per page (default 25, at most 200)
+      cursor  next_cursor of the previous page
+    """
+    kind = request.GET.get("kind", "hosts")
+    if kind not in HOST_SUMMARY_SORTS:
+        return JsonResponse({"error": f"Unknown kind '{kind}'."}, status=400)
+    try:
+        limit = int(request.GET.get("limit") or HOST_SUMMARY_PAGE_SIZE)
+    except ValueError:
+        return JsonResponse({"error": "limit must be an integer."}, status=400)
 
-    # The final ordering should be done here
-    return queryset.order_by("down_time")
+    try:
+        page = host_summary_page(
+            request,
+            kind,
+            cursor=request.GET.get("cursor"),
+            sort=request.GET.get("sort"),
+            order=request.GET.get("order"),
+            limit=limit,
+        )
+    except InvalidCursor as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    to_json = _host_row_json if kind == "hosts" else _other_event_row_json
+    page["results"] = [to_json(row) for row in page["results"]]
+    return JsonResponse(page)
 
 
 def display(request):
-    total_events = get_query(request).count()
+    # Read before the page's queries, so the live stream can't skip a change
+    live_after = EventNotification.latest_id()
     type_query = request.GET.get("type")
     page = "index.html"
     events = get_query(request)
+    total_events = events.count()
     start_time, end_time = get_time_range(request)
-    total_seconds = (end_time - start_time).total_seconds()
-    other_events = get_query(request).filter
     pendings = events.filter(up_time__isnull=True)
-    host_map = {}
-    other_events = {}
-    total_switch = 0
-    total_mpls = 0
-    for i in events:
-        if i.name in host_map:
-            host_map[i.name]["duration"] += i.duration()
-            host_map[i.name]["count"] += 1
-            host_map[i.name]["reasons_list"].append(i.reason)
-        else:
-            if i.type and i.type.lower() in ["switch", "mpls"]:
-                host_map[i.name] = {
-                    "name": i.name,
-                    "encoded_name": base64.urlsafe_b64encode(i.name.encode()).decode(),
-                    "count": 1,
-                    "duration": i.duration(),
-                    "uptime": 0,
-                    "reasons_list": [i.reason],
-                    "type": i.type.lower() if i.type else None,
-                }
-            else:
-                other_events[i.name] = {
-                    "date": i.date,
-                    "name": i.name,
-                    "encoded_name": base64.urlsafe_b64encode(i.name.encode()).decode(),
-                    "count": 1,
-                    "downtime": i.down_time,
-                    "uptime": i.up_time,
-                    "duration": i.duration(),
-                    "reasons_list": [i.reason],
-                    "type": i.type.lower() if i.type else None,
-                }
-
-    total_switch = sum(1 for h in host_map.values() if h["type"] == "switch")
-    total_mpls = sum(1 for h in host_map.values() if h["type"] == "mpls")
-    host_details = list(host_map.values())
-    other_events = list(other_events.values())
-    for host in host_details:
-        downtime_percent = (host["duration"].total_seconds() / total_seconds) * 100
-        host["uptime"] = round(100 - downtime_percent, 2)
-        host["reason"] = find_likely_root_cause(host["reasons_list"])
-
-    host_details = sorted(
-        host_details,
-        key=lambda x: (x["count"], x["duration"], x["uptime"]),
-        reverse=True,
+    host_details, _ = get_cached_host_summary(request)
+    total_switch = sum(1 for h in host_details if h["type"] == "switch")
+    total_mpls = sum(1 for h in host_details if h["type"] == "mpls")
+
+    # Only the first page of each table is rendered; script.js fetches the
+    # rest from host_summary_api as the table is scrolled.
+    summary_kind = (
+        "hosts" if not type_query or type_query in ("switch", "mpls") else "others"
     )
-    for host in other_events:
-        host["reason"] = find_likely_root_cause(host["reasons_list"])
+    summary_page = host_summary_page(request, summary_kind)
 
     context = {
-        "host_details": host_details,
+        "live_after": live_after,
+        "live_retention": int(EventNotification.RETENTION.total_seconds()),
+        "host_details": summary_page["results"] if summary_kind == "hosts" else [],
         "page": page,
         "start_time": start_time,
         "end_time": end_time,
         "pendings": pendings,
         "type_query": type_query,
         "name_query": request.GET.get("name", None),
+        "filter_query": request.GET.urlencode(),
         "type_query_cap": (
             ""
             if not type_query
@@ -159,42 +354,156 @@ def display(request):
         "total_events": total_events,
         "total_switch": total_switch,
         "total_mpls": total_mpls,
-        "other_events": other_events,
+        "other_events": summary_page["results"] if summary_kind == "others" else [],
+        "summary_kind": summary_kind,
+        "summary_total": summary_page["total"],
+        "summary_next_cursor": summary_page["next_cursor"] or "",
     }
     return render(request, "base/index.html", context)
 
 
 def per_host_details(request, pk):
-    decoded_pk = base64.urlsafe_b64decode(pk.encode()).decode()
+    host = get_object_or_404(Host, pk=pk)
     page = "per_host.html"
-    events = get_query(request).filter(name=decoded_pk)
+    events = get_query(request).filter(host_id=host.pk).with_duration()
     return render(
         request,
         "base/per_host.html",
-        {"events": events, "page": page, "pk": pk},
+        {"events": events, "page": page, "pk": host.pk, "host": host},
     )
 
 
-def aggregate_uptime_api(request):
-    start_time, end_time = get_time_range(request)
-    total_seconds = (end_time - start_time).total_seconds()
-    events = get_query(request).filter(
-        Q(type__iexact="switch") | Q(type__iexact="mpls")
+def legacy_host_details(request, encoded_name):
+    """Old host links carried the base64 name; send them to the host's id."""
+    try:
+        name = base64.urlsafe_b64decode(encoded_name.encode()).decode()
+    except (ValueError, UnicodeDecodeError):
+        raise Http404("Unknown host.")
+    host = get_object_or_404(Host, name=name)
+    url = reverse("host-details", kwargs={"pk": host.pk})
+    query = request.GET.urlencode()
+    return redirect(f"{url}?{query}" if query else url, permanent=True)
+
+
+def export_events(request):
+    """
+    Download the filtered events as CSV (default) or XLSX (?format=xlsx).
+    Rows are streamed straight from the database cursor.
+    """
+    return streaming_export(
+        request,
+        [label for _, label in EVENT_EXPORT_COLUMNS],
+        event_rows(get_query(request)),
+        request.GET.get("format", "csv").lower(),
+        "network_events",
+    )
+
+
+def export_host_summary(request):
+    """Download the dashboard's Switch/MPLS host summary as CSV or XLSX."""
+    host_details, _ = get_cached_host_summary(request)
+    return streaming_export(
+        request,
+        HOST_EXPORT_COLUMNS,
+        host_rows(host_details),
+        request.GET.get("format", "csv").lower(),
+        "host_summary",
+    )
+
+
+def live_events(request):
+    """
+    Server-Sent Events stream of outage changes matching the dashboard
+    filters in the query string (see base.live).
+    """
+    response = StreamingHttpResponse(live.event_stream(request), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # Don't let nginx buffer the stream
+    return response
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint: this process's request and ingest metrics."""
+    return HttpResponse(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
+def _rollup_device_downtime(rollups, start_time, end_time):
+    """Downtime seconds and type of each switch and MPLS device, from the daily rollup."""
+    devices = (
+        rollups.filter(
+            Q(type__iexact="switch") | Q(type__iexact="mpls"),
+            day__range=(
+                timezone.localtime(start_time).date(),
+                timezone.localtime(end_time).date(),
+            ),
+        )
+        .values("name")
+        .annotate(seconds=Sum("downtime_seconds"), device_type=Min("type"))
+    )
+    seconds, device_types = {}, {}
+    for device in devices:
+        seconds[device["name"]] = device["seconds"]
+        device_types[device["name"]] = device["device_type"].lower()
+    return seconds, device_types
+
+
+def _device_types(events):
+    return {
+        row["name"]: row["device_type"].lower()
+        for row in events.order_by().values("name").annotate(device_type=Min("type"))
+    }
+
+
+def _open_outage_downtime(outages, start_time, end_time):
+    """
+    Downtime seconds and type of the hosts with an ongoing outage among
+    ``outages``, swept from all their outages: the part the daily rollup,
+    which only holds closed outages, can't answer.
+    """
+    open_outages = outages.filter(
+        host_id__in=outages.filter(up_time__isnull=True).values("host_id")
+    )
+    return (
+        merged_downtime_by_host(open_outages, start_time, end_time),
+        _device_types(open_outages),
     )
 
-    downtime_per_device = defaultdict(timedelta)
-    device_types = {}
 
-    for event in events:
-        downtime_per_device[event.name] += event.duration()
-        if event.name not in device_types:
-            device_types[event.name] = event.type.lower()
+async def aggregate_uptime_data(request):
+    """Average uptime percentage of the switches and of the MPLS links."""
+    filters = await aget_filters(request)
+    start_time, end_time = filters.time_range
+    total_seconds = (end_time - start_time).total_seconds()
+
+    # Outages overlapping the window, also those that began before it
+    events = filters.outages.filter(Q(type__iexact="switch") | Q(type__iexact="mpls"))
+    rollups = filters.rollups
+    if rollups is not None:
+        # One row per device from the daily rollup, limited to the window's
+        # days, and the devices with an ongoing outage swept from the events
+        (downtime_per_device, device_types), (open_downtime, open_types) = (
+            await run_concurrently(
+                partial(_rollup_device_downtime, rollups, start_time, end_time),
+                partial(_open_outage_downtime, events, start_time, end_time),
+            )
+        )
+        downtime_per_device.update(
+            (name, open_downtime.get(name, 0)) for name in open_types
+        )
+        device_types.update(open_types)
+    else:
+        downtime_per_device, device_types = await run_concurrently(
+            partial(merged_downtime_by_host, events, start_time, end_time),
+            partial(_device_types, events),
+        )
 
     switch_uptimes = []
     mpls_uptimes = []
 
-    for device_name, total_downtime in downtime_per_device.items():
-        downtime_percent = (total_downtime.total_seconds() / total_seconds) * 100
+    # Every matching device, also those without downtime in the window
+    for device_name in device_types:
+        downtime_seconds = downtime_per_device.get(device_name, 0)
+        downtime_percent = (downtime_seconds / total_seconds) * 100
         uptime_percent = 100 - downtime_percent
 
         if device_types[device_name] == "switch":
@@ -202,7 +511,7 @@ def aggregate_uptime_api(request):
         elif device_types[device_name] == "mpls":
             mpls_uptimes.append(uptime_percent)
 
-    chart_data = {
+    return {
         "labels": ["Switch", "MPLS"],
         "data": [
             (
@@ -213,20 +522,136 @@ def aggregate_uptime_api(request):
             round(sum(mpls_uptimes) / len(mpls_uptimes), 2) if mpls_uptimes else 0,
         ],
     }
-    return JsonResponse(chart_data)
 
 
-def host_all_charts_api(request, pk):
-    name = base64.urlsafe_b64decode(pk.encode()).decode()
-    start_time, end_time = get_time_range(request)
-    total_minutes = (end_time - start_time).total_seconds() / 60
+@cached_json_view
+async def aggregate_uptime_api(request):
+    return JsonResponse(await aggregate_uptime_data(request))
+
+
+def _host_buckets_from_rollups(days, buckets):
+    """Downtime seconds, event counts and reason counts per bucket, from daily rollup rows."""
+    downtime = [0] * len(buckets)
+    counts = [0] * len(buckets)
+    reasons = [Counter() for _ in range(len(buckets))]
+    for day, event_count, downtime_seconds, day_reasons in days:
+        bucket = buckets.index(day)
+        downtime[bucket] += downtime_seconds
+        counts[bucket] += event_count
+        reasons[bucket].update({r: c for r, c in day_reasons.items() if r})
+    return downtime, counts, reasons
 
-    events = get_query(request).filter(
-        name=name, down_time__range=(start_time, end_time)
+
+def _host_bucket_counts(events, buckets):
+    """
+    Event counts and reason counts per bucket of the events' down times,
+    from one query grouped by bucket and reason.
+    """
+    counts = [0] * len(buckets)
+    reasons = [Counter() for _ in range(len(buckets))]
+    rows = (
+        events.order_by()
+        .values("reason", bucket=buckets.expression("down_time"))
+        .annotate(event_count=Count("id"))
+        .values_list("bucket", "reason", "event_count")
     )
+    for bucket, reason, event_count in rows:
+        counts[bucket] += event_count
+        if reason:
+            reasons[bucket][reason] += event_count
+    return counts, reasons
+
+
+def _host_bucket_downtime(outages, buckets, start_time, end_time):
+    """
+    Downtime seconds per bucket, and in the whole window, of one host's
+    outages. Overlapping outages are merged first and then split at the
+    bucket edges, the way DailyHostDowntime.compute_buckets splits them
+    at midnights. Bucket downtime covers the window's whole days, as the
+    rollup's does; the window total is clipped to the window itself.
+    """
+    now = timezone.now()
+    downtime = [0] * len(buckets)
+    low = max(
+        buckets.edges[0],
+        DailyHostDowntime.day_start(timezone.localtime(start_time).date()),
+    )
+    high = min(
+        buckets.edges[-1],
+        DailyHostDowntime.day_start(timezone.localtime(end_time).date() + timedelta(days=1)),
+    )
+    rows = (
+        outages.filter(down_time__lt=high)
+        .filter(Q(up_time__isnull=True) | Q(up_time__gt=low))
+        .order_by()
+        .values_list("down_time", "up_time")
+    )
+    window_seconds = 0
+    for outage_start, outage_end in merge_intervals(
+        (down_time, up_time or now) for down_time, up_time in rows
+    ):
+        window_seconds += max(
+            (min(outage_end, end_time) - max(outage_start, start_time)).total_seconds(), 0
+        )
+        cursor, outage_end = max(outage_start, low), min(outage_end, high)
+        bucket = buckets.index(cursor)
+        while cursor < outage_end:
+            segment_end = min(outage_end, buckets.edges[bucket + 1])
+            downtime[bucket] += (segment_end - cursor).total_seconds()
+            cursor = segment_end
+            bucket += 1
+    return downtime, window_seconds
+
+
+def _top_reason(reasons):
+    """The most frequent reason; ties go to the alphabetically first one."""
+    if not reasons:
+        return "No Reason"
+    return min(reasons.items(), key=lambda item: (-item[1], item[0]))[0]
+
+
+@cached_json_view
+async def host_all_charts_api(request, pk):
+    """
+    A host's uptime pie, and its downtime bars and outage trend over the
+    window in buckets sized to it (see base.buckets).
+    """
+    host = await aget_object_or_404(Host, pk=pk)
+    filters = await aget_filters(request)
+    start_time, end_time = filters.time_range
+    total_minutes = (end_time - start_time).total_seconds() / 60
+    buckets = buckets_for(start_time, end_time)
+
+    host_outages = filters.outages.filter(host_id=host.pk)
+    use_rollups = filters.rollups is not None and buckets.unit != HOUR
+    if use_rollups:
+        # The rollup only holds closed outages; a host with an ongoing one is swept
+        [ongoing] = await run_concurrently(host_outages.filter(up_time__isnull=True).exists)
+        use_rollups = not ongoing
+    if use_rollups:
+        days = filters.rollups.filter(
+            name=host.name,
+            day__range=(
+                timezone.localtime(start_time).date(),
+                timezone.localtime(end_time).date(),
+            ),
+        ).values_list("day", "event_count", "downtime_seconds", "reasons")
+        [(downtime, counts, reasons)] = await run_concurrently(
+            partial(_host_buckets_from_rollups, days, buckets)
+        )
+        downtime_seconds = sum(downtime)
+    else:
+        events = filters.events.filter(
+            host_id=host.pk, down_time__range=(start_time, end_time)
+        )
+        # Counts by down time, and downtime from the outages overlapping the
+        # window (also those that went down before it), are independent
+        (counts, reasons), (downtime, downtime_seconds) = await run_concurrently(
+            partial(_host_bucket_counts, events, buckets),
+            partial(_host_bucket_downtime, host_outages, buckets, start_time, end_time),
+        )
 
-    total_downtime = sum((e.duration() for e in events), timedelta())
-    downtime_minutes = total_downtime.total_seconds() / 60
+    downtime_minutes = downtime_seconds / 60
     uptime_minutes = total_minutes - downtime_minutes
 
     # Pie Chart
@@ -235,39 +660,22 @@ def host_all_charts_api(request, pk):
         "data": [round(uptime_minutes, 2), round(downtime_minutes, 2)],
     }
 
-    # Daily Bar + Reason
-    daily_downtime = defaultdict(timedelta)
-    daily_reasons = defaultdict(set)
-    for e in events:
-        key = e.down_time.date()
-        daily_downtime[key] += e.duration()
-        if e.reason:
-            daily_reasons[key].add(e.reason)
-
-    bar_labels, bar_data, bar_reasons = [], [], []
-    for date in sorted(daily_downtime):
-        bar_labels.append(date.strftime("%Y-%m-%d"))
-        bar_data.append(round(daily_downtime[date].total_seconds() / 60, 2))
-        bar_reasons.append(next(iter(daily_reasons[date]), "No Reason"))
-
+    # Downtime Bar + most frequent Reason per bucket
     daily_bar = {
-        "labels": bar_labels,
-        "data": bar_data,
-        "reasons": bar_reasons,
+        "labels": buckets.labels,
+        "data": [round(seconds / 60, 2) for seconds in downtime],
+        "reasons": [_top_reason(bucket_reasons) for bucket_reasons in reasons],
     }
 
     # Trend Line
-    trend_counts = defaultdict(int)
-    for e in events:
-        trend_counts[e.down_time.date()] += 1
-
     trend_line = {
-        "labels": [d.strftime("%Y-%m-%d") for d in sorted(trend_counts)],
-        "data": [trend_counts[d] for d in sorted(trend_counts)],
+        "labels": buckets.labels,
+        "data": counts,
     }
 
     return JsonResponse(
         {
+            "bucket": buckets.unit,
             "uptime_pie": uptime_pie,
             "daily_bar": daily_bar,
             "trend_line": trend_line,
@@ -275,27 +683,62 @@ def host_all_charts_api(request, pk):
     )
 
 
-# In your views.py
-def daily_event_trend_api(request):
+def _event_counts_by_day(filters):
+    rollups = filters.rollups
+    if rollups is not None:
+        # Pre-aggregated per host and day; sum the hosts of each day
+        trend_data = (
+            rollups.filter(event_count__gt=0)
+            .values(event_date=F("day"))
+            .annotate(count=Sum("event_count"))
+            .order_by("event_date")
+        )
+    else:
+        # Aggregate the filtered events per day using down_time
+        trend_data = (
+            filters.events.annotate(event_date=TruncDate("down_time"))
+            .values("event_date")
+            .annotate(count=Count("id"))
+            .order_by("event_date")
+        )
+    return list(trend_data)
+
+
+async def daily_event_trend_data(request):
     """
     Calculates the daily trend of network events based on selected filters.
     Counts all matching events per day.
     """
-    # Get filtered queryset (already filtered by name/type/start/end date)
-    queryset = get_query(request)
-
-    # Aggregate per day using down_time
-    trend_data = (
-        queryset.annotate(event_date=TruncDate("down_time"))
-        .values("event_date")
-        .annotate(count=Count("id"))
-        .order_by("event_date")
-    )
+    filters = await aget_filters(request)
+    [trend_data] = await run_concurrently(partial(_event_counts_by_day, filters))
 
     labels = [item["event_date"].strftime("%Y-%m-%d") for item in trend_data]
     data = [item["count"] for item in trend_data]
 
-    return JsonResponse({"labels": labels, "data": data})
+    return {"labels": labels, "data": data}
+
+
+@cached_json_view
+async def daily_event_trend_api(request):
+    return JsonResponse(await daily_event_trend_data(request))
+
+
+@cached_json_view
+async def dashboard_charts_api(request):
+    """
+    The payloads of all the index page's charts in one response, their
+    queries run concurrently.
+    """
+    aggregate_uptime, daily_event_trend = await asyncio.gather(
+        aggregate_uptime_data(request),
+        daily_event_trend_data(request),
+    )
+    return JsonResponse(
+        {
+            "aggregate_uptime": aggregate_uptime,
+            "daily_event_trend": daily_event_trend,
+        }
+    )
 
 
 def sync_page_view(request):
@@ -312,7 +755,8 @@ def sync_page_view(request):
         else:
             summary_str = (
                 f"Sync complete! Created: {summary['created']}, Updated: {summary['updated']}, "
-                f"Duplicates: {summary['duplicates']}, Skipped: {summary['skipped']}."
+                f"Duplicates: {summary['duplicates']}, Skipped: {summary['skipped']}, "
+                f"Unchanged: {summary['unchanged']}."
             )
             messages.success(request, summary_str)
 
@@ -331,60 +775,81 @@ def sync_page_view(request):
 
     return redirect(next_url)
 
+BS_MONTHS = nepali_calendar.MONTH_NAMES
+
+
+def _int_param(request, name):
+    try:
+        return int(request.GET.get(name, ""))
+    except ValueError:
+        return None
+
+
 def monthly_view(request):
-    # Get selected month/day from URL params for initial page load state
-    selected_month = request.GET.get('month')
-    selected_day = request.GET.get('day')
-    
-    # Fetch ALL events
-    all_events = get_query(request).order_by('down_time')   
-    # Process events to extract clean day and month
-    processed_events = []
-    for event in all_events:
-        # Default values in case parsing fails
-        event_day = None
-        event_month = None
-        
-        if event.date and ' ' in str(event.date):
-            # Debug: Print the original date for first few events
-            if len(processed_events) < 5:
-                print(f"Processing date: '{event.date}'")
-            
-            # Splits "12th Ashoj" into ["12th", "Ashoj"]
-            parts = str(event.date).strip().split(' ', 1)
-            
-            if len(parts) >= 2:
-                # Use regex to extract only the numbers from the day part "12th" -> "12"
-                day_match = re.match(r'(\d+)', parts[0])
-                if day_match:
-                    event_day = str(int(day_match.group(1)))  # Convert to string for consistency
-                
-                event_month = parts[1].strip()
-                
-                # Debug output for first few events
-                if len(processed_events) < 5:
-                    print(f"  Extracted - Day: '{event_day}', Month: '{event_month}'")
-        
-        # Add the processed data to the event object itself for easy template access
-        event.data_day = event_day
-        event.data_month = event_month
-        processed_events.append(event)
-    
-    # Note: Fixed typo "Aasar" -> "Asar" to match your data
-    months = ['Baisakh', 'Jestha', 'Aasar', 'Shrawan', 'Bhadra', 'Ashoj', 'Kartik', 'Mangsir', 'Poush', 'Magh', 'Falgun', 'Chaitra']
-    
-    nepali_month_days = {
-        'Baisakh': 31, 'Jestha': 31, 'Aasar': 32, 'Shrawan': 31,
-        'Bhadra': 31, 'Ashoj': 30, 'Kartik': 30, 'Mangsir': 30,
-        'Poush': 29, 'Magh': 29, 'Falgun': 30, 'Chaitra': 30,
+    """
+    Events by Bikram Sambat month and day. Filtering and per-day counts run
+    in SQL on the stored BS date; only the selected month's (or day's)
+    events are sent to the page.
+    """
+    events = get_query(request)
+
+    years = list(
+        events.order_by()
+        .filter(bs_year__isnull=False)
+        .values_list("bs_year", flat=True)
+        .distinct()
+    )
+    years.sort()
+    selected_year = _int_param(request, "year")
+    if selected_year not in years:
+        selected_year = years[-1] if years else bs_date_parts(timezone.now())[0]
+    year_events = events.filter(bs_year=selected_year)
+
+    day_counts = defaultdict(dict)
+    month_totals = Counter()
+    for row in (
+        year_events.order_by()
+        .values("bs_month", "bs_day")
+        .annotate(count=Count("id"))
+    ):
+        month_name = BS_MONTHS[row["bs_month"] - 1]
+        day_counts[month_name][row["bs_day"]] = row["count"]
+        month_totals[month_name] += row["count"]
+
+    # Selected month: ?month=<name>, else the latest month with events
+    month_lookup = {month.lower(): number for number, month in enumerate(BS_MONTHS, 1)}
+    selected_month = month_lookup.get(request.GET.get("month", "").strip().lower())
+    if selected_month is None and month_totals:
+        selected_month = max(BS_MONTHS.index(month) + 1 for month in month_totals)
+    selected_day = _int_param(request, "day")
+
+    month_events = NetworkEvent.objects.none()
+    if selected_month:
+        month_events = year_events.filter(bs_month=selected_month)
+        if selected_day:
+            month_events = month_events.filter(bs_day=selected_day)
+
+    month_days = bs_month_days(selected_year)
+    calendar_data = {
+        "year": selected_year,
+        "month_days": {BS_MONTHS[month - 1]: days for month, days in month_days.items()},
+        "day_counts": day_counts,
     }
-    
+
+    # The other filters (name, type, dates) carried over into the month/day links
+    filter_params = request.GET.copy()
+    for param in ("year", "month", "day"):
+        filter_params.pop(param, None)
+
     context = {
-        'months': months,
-        'events': processed_events,
-        'selected_month_initial': selected_month,
-        'selected_day_initial': selected_day,
-        'nepali_month_days_json': json.dumps(nepali_month_days),
+        "months": [(month, month_totals[month]) for month in BS_MONTHS],
+        "years": years,
+        "selected_year": selected_year,
+        "selected_month": BS_MONTHS[selected_month - 1] if selected_month else "",
+        "selected_day": selected_day or "",
+        "events": month_events,
+        "filter_query": filter_params.urlencode(),
+        "calendar_data": calendar_data,
     }
-    
-    return render(request, 'base/monthwise.html', context)
+
+    return render(request, "base/monthwise.html", context)
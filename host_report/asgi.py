@@ -2,6 +2,8 @@
 ASGI config for host_report project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve the site through it (e.g. ``uvicorn host_report.asgi:application``) so
+the dashboard's live event streams (base.live) run as async generators.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 import os
+import sys
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -46,6 +47,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its timings cover the rest of the stack
+    "base.middleware.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -78,14 +81,64 @@ WSGI_APPLICATION = "host_report.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLite is tuned so the dashboard keeps serving while imports write:
+# - WAL journaling lets readers run alongside the (single) writer;
+# - IMMEDIATE transactions take the write lock up front, so concurrent
+#   writers wait their turn (up to SQLITE_TIMEOUT seconds) instead of
+#   failing with "database is locked" when a read lock can't be upgraded;
+# - the pragmas run on every new connection (WAL itself is persistent).
+# Set SQLITE_WAL=0 to fall back to SQLite's default rollback journal.
+SQLITE_WAL = os.getenv("SQLITE_WAL", "1") != "0"
+
+SQLITE_PRAGMAS = [
+    f"PRAGMA journal_mode={'WAL' if SQLITE_WAL else 'DELETE'}",
+    "PRAGMA synchronous=NORMAL",  # Durable with WAL; fsyncs at checkpoints only
+    "PRAGMA cache_size=-32000",  # 32 MB page cache per connection
+    "PRAGMA mmap_size=268435456",  # Read through a 256 MB memory map
+    "PRAGMA temp_store=MEMORY",
+]
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "OPTIONS": {
+            "timeout": int(os.getenv("SQLITE_TIMEOUT", 20)),
+            "transaction_mode": "IMMEDIATE",
+            "init_command": ";".join(SQLITE_PRAGMAS),
+        },
     }
 }
 
 
+# Cache for the dashboard chart APIs
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# "file" (default) is shared by every process on the host, including the
+# import worker that invalidates it; "locmem" is per process, for development
+# and the default under "manage.py test", which shouldn't write into the checkout.
+
+TESTING = sys.argv[1:2] == ["test"]
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "locmem" if TESTING else "file")
+
+CACHES = {
+    "default": (
+        {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "noc-dashboard",
+        }
+        if CACHE_BACKEND == "locmem"
+        else {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.getenv("CACHE_LOCATION", BASE_DIR / "cache"),
+        }
+    )
+}
+
+# Seconds a cached chart payload is served; data changes invalidate it earlier.
+CHART_CACHE_TIMEOUT = int(os.getenv("CHART_CACHE_TIMEOUT", 300))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -0,0 +1,69 @@
+/**
+ * Live progress for the "Network Event CSV Imports" admin changelist.
+ *
+ * Imports are processed by the `process_imports` worker, so the upload
+ * returns immediately. This script polls the admin progress endpoint while
+ * any listed import is pending or processing and patches the row cells.
+ */
+
+document.addEventListener("DOMContentLoaded", function () {
+  const POLL_INTERVAL_MS = 2000;
+  const ACTIVE_STATES = ["pending", "processing"];
+  const CELL_FIELDS = [
+    "processed_rows",
+    "rows_per_second",
+    "created_events",
+    "updated_events",
+    "duplicate_events",
+  ];
+
+  function activeSpans() {
+    return Array.from(document.querySelectorAll(".import-progress")).filter(
+      (span) => ACTIVE_STATES.includes(span.dataset.status)
+    );
+  }
+
+  function setCell(row, field, value) {
+    const cell = row.querySelector(`.field-${field}`);
+    if (cell) {
+      cell.textContent = value;
+    }
+  }
+
+  function poll() {
+    const spans = activeSpans();
+    if (!spans.length) {
+      return;
+    }
+    const ids = spans.map((span) => span.dataset.importId).join(",");
+
+    fetch(`progress/?ids=${ids}`, { credentials: "same-origin" })
+      .then((response) => response.json())
+      .then((data) => {
+        spans.forEach((span) => {
+          const progress = data[span.dataset.importId];
+          if (!progress) {
+            return;
+          }
+          const row = span.closest("tr");
+          span.dataset.status = progress.status;
+          span.textContent = `${progress.percent}%`;
+          setCell(row, "processing_status", progress.status);
+          setCell(row, "eta_display", progress.eta);
+          CELL_FIELDS.forEach((field) => setCell(row, field, progress[field]));
+        });
+      })
+      .catch((error) => {
+        console.error("Error fetching import progress:", error);
+      })
+      .finally(() => {
+        if (activeSpans().length) {
+          setTimeout(poll, POLL_INTERVAL_MS);
+        }
+      });
+  }
+
+  if (activeSpans().length) {
+    setTimeout(poll, POLL_INTERVAL_MS);
+  }
+});
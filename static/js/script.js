@@ -9,22 +9,28 @@
  */
 
 document.addEventListener("DOMContentLoaded", function() {
+ // The index page's charts are fetched together in one request:
+ // /api/dashboard/ returns the payloads of all of them.
+ const aggregateChartCtx = document.getElementById("aggregateUptimeChart");
+ const dailyTrendChart = document.getElementById("dailyTrendChart");
+ let dashboardCharts = null;
+ if (aggregateChartCtx || dailyTrendChart) {
+  dashboardCharts = fetch(`/api/dashboard/${window.location.search}`).then((response) => {
+    if (!response.ok) {
+      return response.json().then((err) => {
+        throw new Error(err.error || "Server error");
+      });
+    }
+    return response.json();
+  });
+ }
+
  // =====================================================================
  // SECTION 1: LOGIC FOR THE AGGREGATE CHART (runs only on index page)
  // =====================================================================
- const aggregateChartCtx = document.getElementById("aggregateUptimeChart");
 if (aggregateChartCtx) {
-  const apiUrl = `/api/aggregate-uptime/${window.location.search}`;
-
-  fetch(apiUrl)
-    .then((response) => {
-      if (!response.ok) {
-        return response.json().then((err) => {
-          throw new Error(err.error || "Server error");
-        });
-      }
-      return response.json();
-    })
+  dashboardCharts
+    .then((charts) => charts.aggregate_uptime)
     .then((data) => {
       new Chart(aggregateChartCtx, {
         type: "bar",
@@ -187,7 +193,11 @@ if (aggregateChartCtx) {
      plugins: [ChartDataLabels],
     });
 
-    // --- Chart 2: Daily Downtime (Bar Chart) ---
+    // The bars and the trend are bucketed per hour, day, week or BS month,
+    // whichever suits the length of the period
+    const bucketName = { hour: "Hour", day: "Day", week: "Week", bs_month: "Month" }[data.bucket] || "Day";
+
+    // --- Chart 2: Downtime per Bucket (Bar Chart) ---
     const barCtx = document
      .getElementById("dailyBarChart")
      .getContext("2d");
@@ -197,7 +207,7 @@ if (aggregateChartCtx) {
       labels: data.daily_bar.labels,
       datasets: [
        {
-        label: "Daily Downtime (minutes)",
+        label: `Downtime per ${bucketName} (minutes)`,
         data: data.daily_bar.data,
         backgroundColor: "rgba(255, 159, 64, 0.8)",
        },
@@ -218,7 +228,7 @@ if (aggregateChartCtx) {
      },
     });
 
-    // --- Chart 3: Daily Outage Frequency (Line Chart) ---
+    // --- Chart 3: Outage Frequency (Line Chart) ---
     const lineCtx = document
      .getElementById("trendLineChart")
      .getContext("2d");
@@ -228,7 +238,7 @@ if (aggregateChartCtx) {
       labels: data.trend_line.labels,
       datasets: [
        {
-        label: "Daily Outage Count",
+        label: `Outages per ${bucketName}`,
         data: data.trend_line.data,
         borderColor: "rgba(54, 162, 235, 1)",
         backgroundColor: "rgba(54, 162, 235, 0.2)",
@@ -281,13 +291,9 @@ if (aggregateChartCtx) {
  }
 
  // --- Daily Trend Chart ---
- const dailyTrendChart = document.getElementById("dailyTrendChart");
  if (dailyTrendChart) {
-   // Use the working API URL pattern
-   const trendApiURL = `/daily_event_trend_api/${urlQueryString}`;
-
-   fetch(trendApiURL)
-     .then((res) => res.json())
+   dashboardCharts
+     .then((charts) => charts.daily_event_trend)
      .then((data) => {
        new Chart(dailyTrendChart, {
          type: "line",
@@ -332,19 +338,125 @@ window.onclick = function(event) {
   });
 };
 
+// =====================================================================
+// HOST SUMMARY TABLE: keyset-paginated from /api/host-summary/
+// =====================================================================
+// The server renders only the first page. "Show More" fetches the next
+// one, and after that further pages load whenever the button scrolls into
+// view. Clicking a sortable header reloads the table in that order.
 document.addEventListener("DOMContentLoaded", function () {
+  const tbody = document.getElementById("hostSummaryTable");
   const showMoreBtn = document.getElementById("showMoreBtn");
+  if (!tbody || !showMoreBtn || !tbody.dataset.apiUrl) {
+    return;
+  }
+
+  let loading = false;
+  let autoLoad = false;
+
+  function escapeHtml(value) {
+    const div = document.createElement("div");
+    div.textContent = value == null ? "" : String(value);
+    return div.innerHTML;
+  }
+
+  function renderRow(row) {
+    const tr = document.createElement("tr");
+    tr.className = "host-row";
+    if (tbody.dataset.kind === "hosts") {
+      tr.innerHTML = `
+        <td><a href="${escapeHtml(row.url)}">${escapeHtml(row.name)}</a></td>
+        <td>${row.count}</td>
+        <td>${row.duration_seconds ? escapeHtml(row.duration) : "<span>Down</span>"}</td>
+        <td>${escapeHtml(row.reason)}</td>
+        <td>${row.uptime}%</td>`;
+    } else {
+      tr.innerHTML = `
+        <td>${escapeHtml(row.date)}</td>
+        <td>${escapeHtml(row.name)}</td>
+        <td>${escapeHtml(row.down_time)}</td>
+        <td>${escapeHtml(row.up_time)}</td>
+        <td>${escapeHtml(row.duration)}</td>
+        <td>${escapeHtml(row.reason)}</td>`;
+    }
+    return tr;
+  }
 
-  if (showMoreBtn) {
-    showMoreBtn.addEventListener("click", function (e) {
-      e.preventDefault(); // stop form submission
-      const hiddenRows = document.querySelectorAll(".hidden-row");
-      hiddenRows.forEach(row => {
-        row.classList.remove("hidden-row");
+  function loadPage(reset) {
+    if (loading || (!reset && !tbody.dataset.nextCursor)) {
+      return;
+    }
+    loading = true;
+
+    // Keep the dashboard filters (name, type, dates) from the page URL
+    const params = new URLSearchParams(window.location.search);
+    params.set("kind", tbody.dataset.kind);
+    params.set("sort", tbody.dataset.sort);
+    params.set("order", tbody.dataset.order);
+    if (!reset) {
+      params.set("cursor", tbody.dataset.nextCursor);
+    }
+
+    fetch(`${tbody.dataset.apiUrl}?${params.toString()}`)
+      .then((response) => response.json())
+      .then((data) => {
+        if (data.error) {
+          throw new Error(data.error);
+        }
+        if (reset) {
+          tbody.innerHTML = "";
+        }
+        const fragment = document.createDocumentFragment();
+        data.results.forEach((row) => fragment.appendChild(renderRow(row)));
+        tbody.appendChild(fragment);
+        tbody.dataset.nextCursor = data.next_cursor || "";
+        showMoreBtn.style.display = data.next_cursor ? "block" : "none";
+      })
+      .catch((error) => {
+        console.error("Error fetching host summary page:", error);
+        autoLoad = false;
+      })
+      .finally(() => {
+        loading = false;
+        // The observer only fires on changes; keep going while still in view
+        if (autoLoad && buttonInView()) {
+          loadPage(false);
+        }
       });
-      showMoreBtn.style.display = "none"; // hide the button after showing all
-    });
   }
+
+  function buttonInView() {
+    const rect = showMoreBtn.getBoundingClientRect();
+    return rect.height > 0 && rect.top < window.innerHeight && rect.bottom > 0;
+  }
+
+  showMoreBtn.addEventListener("click", function (e) {
+    e.preventDefault(); // stop form submission
+    autoLoad = true;
+    loadPage(false);
+  });
+
+  if ("IntersectionObserver" in window) {
+    new IntersectionObserver((entries) => {
+      if (autoLoad && entries.some((entry) => entry.isIntersecting)) {
+        loadPage(false);
+      }
+    }).observe(showMoreBtn);
+  }
+
+  document.querySelectorAll("th.sortable").forEach((th) => {
+    th.style.cursor = "pointer";
+    th.addEventListener("click", function () {
+      const sort = th.dataset.sort;
+      if (tbody.dataset.sort === sort) {
+        tbody.dataset.order = tbody.dataset.order === "desc" ? "asc" : "desc";
+      } else {
+        tbody.dataset.sort = sort;
+        tbody.dataset.order = "desc";
+      }
+      loadPage(true);
+    });
+  });
 });
 
 document.addEventListener("DOMContentLoaded", function () {
@@ -442,192 +554,168 @@ document.addEventListener('DOMContentLoaded', () => {
     setInterval(updateDurations, 1000);
 });
 
-document.addEventListener('DOMContentLoaded', function() {
-  const nepaliMonthDays = JSON.parse(document.getElementById('nepali-month-data').textContent);
-  const monthSelector = document.querySelector('.month-selector');
-  const dateGridContainer = document.getElementById('date-grid-container');
-  const monthTitle = document.getElementById('month-title');
-  const tableTitle = document.getElementById('table-title');
-  const hostRows = document.querySelectorAll('.host-row');
-  const noEventsRow = document.getElementById('no-events-row');
-
-  const initialUrlParams = new URLSearchParams(window.location.search);
-  const initialMonth = initialUrlParams.get('month');
-  const initialDay = initialUrlParams.get('day');
+// =====================================================================
+// LIVE OUTAGES: Server-Sent Events from /live/events/
+// =====================================================================
+// Imports and sheet syncs publish created, updated and resolved outages;
+// the stream only sends the ones matching this page's filters. Ongoing
+// outages are added to (or refreshed in) the pending table, resolved ones
+// are removed, and the counters follow, without reloading the page.
+document.addEventListener("DOMContentLoaded", function () {
+  const pendingBody = document.getElementById("pendingIssuesTable");
+  if (!pendingBody || !pendingBody.dataset.streamUrl || !("EventSource" in window)) {
+    return;
+  }
+  const pendingTable = document.getElementById("pendingTable");
+  const pendingEmpty = document.getElementById("pendingEmpty");
+  const pendingCount = document.getElementById("pendingCount");
+  const pendingPopups = document.getElementById("pendingPopups");
+  const totalEvents = document.getElementById("totalEvents");
+  const retentionMs = Number(pendingBody.dataset.retention) * 1000;
+
+  function escapeHtml(value) {
+    const div = document.createElement("div");
+    div.textContent = value == null ? "" : String(value);
+    return div.innerHTML;
+  }
 
-  function getOrdinalSuffix(n) {
-    if (!n) return '';
-    const i = parseInt(n, 10);
-    const s = ["th", "st", "nd", "rd"];
-    const v = i % 100;
-    return i + (s[(v - 20) % 10] || s[v] || s[0]);
+  function removePending(id) {
+    const row = pendingBody.querySelector(`tr[data-event-id="${id}"]`);
+    if (row) row.remove();
+    const popup = document.getElementById(`popup-pending-${id}`);
+    if (popup) popup.remove();
   }
 
-  function updateURL(month, day) {
-    const url = new URL(window.location);
-    if (month) {
-      url.searchParams.set('month', month);
-    } else {
-      url.searchParams.delete('month');
-    }
-    
-    if (day) {
-      url.searchParams.set('day', day);
-    } else {
-      url.searchParams.delete('day');
-    }
-    window.history.pushState({}, '', url);
+  function showPending(outage) {
+    removePending(outage.id);
+    const tr = document.createElement("tr");
+    tr.dataset.eventId = outage.id;
+    tr.dataset.downTime = outage.down_time;
+    tr.innerHTML = `
+      <td>${escapeHtml(outage.date)}</td>
+      <td>${escapeHtml(outage.name)}</td>
+      <td>${escapeHtml(outage.down_time_display)}</td>
+      <td><span class="live-duration" data-down-time="${escapeHtml(outage.down_time)}"></span></td>
+      <td>${escapeHtml(outage.reason)}</td>
+      <td>${escapeHtml(outage.type)}</td>
+      <td><button type="button" onclick="openPopup('popup-pending-${outage.id}')">Show</button></td>`;
+
+    // Same order as the server renders: by down time
+    const downTime = new Date(outage.down_time);
+    const next = Array.from(pendingBody.rows).find(
+      (row) => new Date(row.dataset.downTime) > downTime
+    );
+    pendingBody.insertBefore(tr, next || null);
+
+    const popup = document.createElement("div");
+    popup.id = `popup-pending-${outage.id}`;
+    popup.className = "popup-overlay";
+    popup.innerHTML = `
+      <div class="popup">
+        <button class="close-btn" onclick="closePopup('popup-pending-${outage.id}')">×</button>
+        <h3>Remark</h3>
+        <p>${escapeHtml(outage.remarks)}</p>
+      </div>`;
+    pendingPopups.appendChild(popup);
   }
 
-  function generateDateGrid(monthName) {
-    dateGridContainer.innerHTML = '';
-    if (!monthName || !nepaliMonthDays[monthName]) {
-      monthTitle.textContent = '';
-      document.querySelector('.month-dates').style.display = 'none';
-      return;
-    }
-    
-    document.querySelector('.month-dates').style.display = 'block';
-    
-    const daysInMonth = nepaliMonthDays[monthName];
-
-    // Add "All" button first
-    const allBox = document.createElement('a');
-    allBox.className = 'date-box all-dates';
-    allBox.href = `?month=${monthName}`;
-    allBox.dataset.day = 'all';
-    allBox.innerHTML = 'All';
-    dateGridContainer.appendChild(allBox);
-
-    // Then add individual days
-    for (let i = 1; i <= daysInMonth; i++) {
-      const dayBox = document.createElement('a');
-      dayBox.className = 'date-box';
-      dayBox.href = `?month=${monthName}&day=${i}`;
-      dayBox.dataset.day = String(i); // Ensure it's a string
-      dayBox.innerHTML = `${getOrdinalSuffix(i)} <span>${monthName}</span>`;
-      dateGridContainer.appendChild(dayBox);
-    }
+  function refreshCounts() {
+    const count = pendingBody.rows.length;
+    pendingCount.textContent = count;
+    pendingTable.style.display = count ? "" : "none";
+    pendingEmpty.style.display = count ? "none" : "";
   }
 
-  function filterEvents(selectedMonth, selectedDay) {
-    console.log('=== FILTER DEBUG ===');
-    console.log(`Selected Month: "${selectedMonth}"`);
-    console.log(`Selected Day: "${selectedDay}"`);
-    
-    let eventsFound = 0;
-    
-    hostRows.forEach((row, index) => {
-      const rowMonth = row.dataset.month;
-      const rowDay = row.dataset.day;
-      
-      // Debug first few rows
-      if (index < 5) {
-        console.log(`Row ${index}: month="${rowMonth}", day="${rowDay}"`);
-      }
-      
-      let show = false;
-      
-      if (!selectedMonth) {
-        // Show all events
-        show = true;
-      } else if (!selectedDay || selectedDay === 'all') {
-        // Show all events for selected month
-        show = (rowMonth === selectedMonth);
-      } else {
-        // Show events for specific day and month
-        // Convert both to strings for comparison
-        const dayMatch = String(rowDay) === String(selectedDay);
-        const monthMatch = rowMonth === selectedMonth;
-        show = dayMatch && monthMatch;
-        
-        // Debug comparison
-        if (index < 5) {
-          console.log(`  Day comparison: "${rowDay}" === "${selectedDay}" = ${dayMatch}`);
-          console.log(`  Month comparison: "${rowMonth}" === "${selectedMonth}" = ${monthMatch}`);
-          console.log(`  Show: ${show}`);
-        }
-      }
-      
-      row.style.display = show ? '' : 'none';
-      if (show) eventsFound++;
-    });
+  const params = new URLSearchParams(window.location.search);
+  params.set("after", pendingBody.dataset.after);
+  const source = new EventSource(`${pendingBody.dataset.streamUrl}?${params.toString()}`);
+  let lastSeen = Date.now();
 
-    console.log(`Total events shown: ${eventsFound}`);
-    
-    // Update table title
-    if (selectedMonth && selectedDay && selectedDay !== 'all') {
-      tableTitle.textContent = `Events for ${selectedMonth} ${getOrdinalSuffix(selectedDay)}`;
-    } else if (selectedMonth) {
-      tableTitle.textContent = `All Events for ${selectedMonth}`;
+  source.addEventListener("outage", function (message) {
+    lastSeen = Date.now();
+    const outage = JSON.parse(message.data);
+    if (outage.kind === "created" && totalEvents) {
+      totalEvents.textContent = Number(totalEvents.textContent) + 1;
+    }
+    if (outage.up_time) {
+      removePending(outage.id);
     } else {
-      tableTitle.textContent = 'All Events';
+      showPending(outage);
     }
-    
-    noEventsRow.style.display = eventsFound === 0 ? '' : 'none';
-  }
-
-  function updateUI(selectedMonth, selectedDay) {
-    console.log('=== UPDATE UI ===');
-    console.log(`Month: "${selectedMonth}", Day: "${selectedDay}"`);
-    
-    // Update month selection
-    document.querySelectorAll('.month-box').forEach(box => {
-      box.classList.toggle('selected', box.dataset.monthName === selectedMonth);
-    });
+    refreshCounts();
+    updateDurations();
+  });
 
-    // Generate date grid
-    generateDateGrid(selectedMonth);
+  source.addEventListener("ping", function () {
+    lastSeen = Date.now();
+  });
 
-    // Update day selection
-    if (selectedMonth) {
-      document.querySelectorAll('.date-box').forEach(box => {
-        if (selectedDay === 'all' || !selectedDay) {
-          box.classList.toggle('selected', box.dataset.day === 'all');
-        } else {
-          box.classList.toggle('selected', box.dataset.day === String(selectedDay));
-        }
-      });
+  source.addEventListener("open", function () {
+    // Away for longer than the server keeps notifications (a sleeping
+    // laptop, a network outage): changes may be missing, start over.
+    if (Date.now() - lastSeen > retentionMs) {
+      window.location.reload();
     }
+    lastSeen = Date.now();
+  });
+});
 
-    // Filter events
-    filterEvents(selectedMonth, selectedDay);
-    
-    // Update URL
-    if (selectedMonth) {
-      updateURL(selectedMonth, selectedDay === 'all' ? null : selectedDay);
-    }
+// =====================================================================
+// MONTH VIEW: day grid for the selected BS month
+// =====================================================================
+// The server filters the events by BS month/day; this only draws the day
+// links with their event counts from the #nepali-month-data payload.
+document.addEventListener('DOMContentLoaded', function() {
+  const calendarEl = document.getElementById('nepali-month-data');
+  const monthDates = document.querySelector('.month-dates');
+  if (!calendarEl || !monthDates) return;
+
+  const calendar = JSON.parse(calendarEl.textContent);
+  const dateGridContainer = document.getElementById('date-grid-container');
+  const monthTitle = document.getElementById('month-title');
+  const selectedMonth = monthDates.dataset.month;
+  const selectedDay = monthDates.dataset.day;
+  const filterQuery = monthDates.dataset.filterQuery;
+
+  function getOrdinalSuffix(n) {
+    if (!n) return '';
+    const i = parseInt(n, 10);
+    const s = ["th", "st", "nd", "rd"];
+    const v = i % 100;
+    return i + (s[(v - 20) % 10] || s[v] || s[0]);
   }
 
-  // Event listeners
-  monthSelector.addEventListener('click', function(e) {
-    e.preventDefault();
-    const target = e.target.closest('.month-box');
-    if (!target) return;
-    const monthName = target.dataset.monthName;
-    updateUI(monthName, 'all'); // Default to show all days
-  });
+  function monthUrl(day) {
+    const params = new URLSearchParams(filterQuery);
+    params.set('year', calendar.year);
+    params.set('month', selectedMonth);
+    if (day) params.set('day', day);
+    return `?${params.toString()}`;
+  }
 
-  dateGridContainer.addEventListener('click', function(e) {
-    e.preventDefault();
-    const target = e.target.closest('.date-box');
-    if (!target) return;
-    
-    const day = target.dataset.day;
-    const currentMonth = document.querySelector('.month-box.selected')?.dataset.monthName;
-    
-    console.log('Date clicked:', day, 'Month:', currentMonth);
-    updateUI(currentMonth, day);
-  });
-  
-  // Initialization
-  console.log('=== INITIALIZATION ===');
-  console.log(` Initial Day: "${initialDay}",Initial Month: "${initialMonth}"`);
-  
-  if (initialMonth) {
-    updateUI(initialDay, initialMonth || 'all');
-  } else {
-    updateUI(null, null);
+  const daysInMonth = calendar.month_days[selectedMonth];
+  if (!selectedMonth || !daysInMonth) {
+    monthDates.style.display = 'none';
+    return;
+  }
+  monthTitle.textContent = `${selectedMonth} ${calendar.year}`;
+
+  const counts = calendar.day_counts[selectedMonth] || {};
+
+  const allBox = document.createElement('a');
+  allBox.className = 'date-box all-dates' + (selectedDay ? '' : ' selected');
+  allBox.href = monthUrl(null);
+  allBox.textContent = 'All';
+  dateGridContainer.appendChild(allBox);
+
+  for (let i = 1; i <= daysInMonth; i++) {
+    const dayBox = document.createElement('a');
+    dayBox.className = 'date-box' + (String(i) === selectedDay ? ' selected' : '');
+    dayBox.href = monthUrl(i);
+    dayBox.dataset.day = String(i);
+    const count = counts[i] ? ` (${counts[i]})` : '';
+    dayBox.innerHTML = `${getOrdinalSuffix(i)} <span>${selectedMonth}</span>${count}`;
+    dateGridContainer.appendChild(dayBox);
   }
 });
 